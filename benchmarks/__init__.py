@@ -0,0 +1 @@
+"""Benchmarks de HMM Smart Keyboard."""
@@ -0,0 +1,57 @@
+"""
+Recall@k de la generación de candidatos con y sin prior de unigramas.
+
+Para cada palabra con error del corpus ruidoso, ¿aparece la palabra correcta
+entre los k primeros candidatos? Con limit fijo, el prior cambia qué
+candidatos sobreviven al corte.
+
+Uso: python -m benchmarks.candidate_recall
+"""
+
+from wordfreq import top_n_list
+
+from benchmarks.corpus import generate_corpus
+from hmm_smart_keyboard.keyboard_model import KeyboardModel, wordfreq_frequencies
+
+N_SENTENCES = 600
+LIMIT = 20
+KS = (1, 3, 5, 10, 20)
+PRIOR_WEIGHTS = (0.0, 0.1, 0.25, 0.5, 1.0)
+
+
+def recall_at_k(km, pairs):
+    """Fracción de pares cuya palabra correcta queda en el top k, para cada k."""
+    hits = dict.fromkeys(KS, 0)
+    for dirty, clean in pairs:
+        candidates = km.get_candidates(dirty, limit=LIMIT)
+        if clean in candidates:
+            position = candidates.index(clean)
+            for k in KS:
+                hits[k] += position < k
+    return {k: hits[k] / len(pairs) for k in KS}
+
+
+def main():
+    km = KeyboardModel(top_n_list("es", 20000))
+    pairs = [
+        (dirty, clean)
+        for sample in generate_corpus(N_SENTENCES, seed=2)
+        for dirty, clean in zip(sample.noisy.split(), sample.clean.split(), strict=True)
+        if dirty != clean
+    ]
+    print(f"{len(pairs):,} palabras con error (limit={LIMIT})")
+
+    header = " | ".join(f"{f'R@{k}':>6}" for k in KS)
+    print(f"{'prior':>9} | {'peso':>5} | {header}")
+    for source in ("zipf", "wordfreq"):
+        if source == "wordfreq":
+            km.set_unigram_prior(wordfreq_frequencies(km.rank))
+        for weight in PRIOR_WEIGHTS:
+            km.prior_weight = weight
+            recall = recall_at_k(km, pairs)
+            row = " | ".join(f"{recall[k]:>6.1%}" for k in KS)
+            print(f"{source:>9} | {weight:>5} | {row}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+HMM de letras: velocidad por letra y rescate de palabras fuera de vocabulario.
+
+- µs por letra de viterbi y forward_backward.
+- Palabras que el KeyboardModel no conoce (wordfreq más allá de VOCAB_SIZE)
+  con un error de teclado, dentro de una frase: cuántas recupera el
+  decodificador de palabras con y sin char_model.
+- WER sobre frases del vocabulario, para ver que el respaldo no estorba.
+
+Uso: python -m benchmarks.char_hmm
+"""
+
+import random
+import time
+
+from wordfreq import top_n_list
+
+from benchmarks.common import VOCAB_SIZE, build_models, sample_sentences
+from benchmarks.corpus import add_typos, key_neighbours, perturb_word
+from hmm_smart_keyboard.char_hmm import CharHMM
+from hmm_smart_keyboard.evaluation import word_errors
+from hmm_smart_keyboard.viterbi_decoder import ViterbiDecoder
+
+N_WORDS = 500
+N_SENTENCES = 300
+TIMING_REPEATS = 5
+
+
+def oov_words(km, n, seed=0):
+    """`n` palabras alfabéticas de wordfreq que no están en el vocabulario del teclado."""
+    pool = [
+        w for w in top_n_list("es", VOCAB_SIZE * 3)[VOCAB_SIZE:]
+        if w.isalpha() and len(w) >= 5 and w not in km.vocabulary  # noqa: PLR2004
+    ]
+    return random.Random(seed).sample(pool, n)
+
+
+def main():
+    km, lm = build_models()
+    model = CharHMM.from_words(km.rank)
+    neighbours = key_neighbours()
+    rng = random.Random(3)
+
+    targets = oov_words(km, N_WORDS)
+    typed = [perturb_word(w, rng, neighbours) for w in targets]
+    n_chars = sum(len(w) for w in typed)
+
+    for name in ("viterbi", "forward_backward"):
+        method = getattr(model, name)
+        start = time.perf_counter()
+        for _ in range(TIMING_REPEATS):
+            for word in typed:
+                method(word)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>16}: {elapsed / (n_chars * TIMING_REPEATS) * 1e6:.2f} µs/letra")
+
+    recovered = sum(model.viterbi(w)[0] == t for w, t in zip(typed, targets, strict=True))
+    print(f"char_hmm solo: {recovered / N_WORDS:.1%} de {N_WORDS} palabras fuera de vocabulario")
+
+    plain = ViterbiDecoder(language_model=lm, keyboard_model=km)
+    with_chars = ViterbiDecoder(language_model=lm, keyboard_model=km)
+    with_chars.char_model = model
+
+    contexts = sample_sentences(N_WORDS, words_per_sentence=3, seed=4)
+    clean = sample_sentences(N_SENTENCES, seed=5)
+    noisy = [add_typos(s, seed=i, neighbours=neighbours) for i, s in enumerate(clean)]
+    n_ref = sum(len(s.split()) for s in clean)
+
+    print(f"{'decodificador':>14} | {'OOV recuperadas':>15} | {'WER vocab':>9} | {'ms/frase':>8}")
+    for name, decoder in (("sin char_model", plain), ("con char_model", with_chars)):
+        hits = 0
+        for context, word, target in zip(contexts, typed, targets, strict=True):
+            result = decoder.solve(f"{context} {word}", audit=False)
+            hits += result.corrected_words[-1] == target
+
+        errors = 0
+        start = time.perf_counter()
+        for dirty, truth in zip(noisy, clean, strict=True):
+            result = decoder.solve(dirty, audit=False)
+            errors += word_errors(list(result.corrected_words), truth.split())
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"{name:>14} | {hits / N_WORDS:>15.1%} | {errors / n_ref:>9.2%} | "
+            f"{elapsed / N_SENTENCES * 1000:>8.2f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Utilidades compartidas por los benchmarks.
+
+Construye modelos reales sin depender del dump de Wikipedia: el
+LanguageModel se entrena con frases sintéticas muestreadas de wordfreq.
+"""
+
+import random
+import tempfile
+from pathlib import Path
+
+import ujson as json
+from wordfreq import top_n_list, word_frequency
+
+from hmm_smart_keyboard.keyboard_model import KeyboardModel
+from hmm_smart_keyboard.language_model import (
+    LanguageModel,
+    calculate_probabilities,
+    count_frequencies,
+)
+from hmm_smart_keyboard.vocabulary import align_vocabularies
+
+VOCAB_SIZE = 20000
+
+
+def sample_sentences(
+    n_sentences: int,
+    words_per_sentence: int = 8,
+    seed: int = 0,
+    corpus_vocab: int = 3000,
+    lang: str = "es",
+) -> list[str]:
+    """Frases limpias muestreadas según la frecuencia de cada palabra."""
+    rng = random.Random(seed)
+    # Solo palabras alfabéticas, para que cada palabra sea un token de solve
+    words = [w for w in top_n_list(lang, corpus_vocab) if w.isalpha()]
+    weights = [word_frequency(w, lang) for w in words]
+    return [
+        " ".join(rng.choices(words, weights, k=words_per_sentence))
+        for _ in range(n_sentences)
+    ]
+
+
+def build_language_model(sentences: list[str]) -> LanguageModel:
+    """Entrena un LanguageModel de bigramas con el pipeline del proyecto."""
+    tokens = (token for sentence in sentences for token in sentence.split())
+    unigrams, bigrams = count_frequencies(tokens)
+    p_matrix = calculate_probabilities(unigrams, bigrams)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "P_matrix_transicion.json"
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(p_matrix, f, ensure_ascii=False)
+        return LanguageModel(path)
+
+
+def build_models(seed: int = 0, n_sentences: int = 5000):
+    """KeyboardModel sobre wordfreq y LanguageModel sobre frases sintéticas."""
+    km = KeyboardModel(top_n_list("es", VOCAB_SIZE))
+    lm = build_language_model(sample_sentences(n_sentences, seed=seed))
+    align_vocabularies(km, lm)
+    return km, lm
@@ -0,0 +1,139 @@
+"""
+Corpus ruidoso reproducible a partir de la geometría del teclado.
+
+Cada error se genera como lo haría un dedo real sobre keyboard_es.json:
+pulsar una tecla vecina, pulsar además una vecina, saltarse una letra o
+invertir dos letras seguidas. Con la misma semilla se obtiene siempre el
+mismo corpus, así que los resultados de distintos commits son comparables.
+
+Uso: python -m benchmarks.corpus -n 5 --seed 3
+"""
+
+import argparse
+import random
+from typing import NamedTuple
+
+from benchmarks.common import sample_sentences
+from hmm_smart_keyboard.keyboard_layouts import DEFAULT_LAYOUT, compile_layout
+
+# Distancia (en anchos de tecla) hasta la que una tecla se considera vecina
+NEIGHBOUR_RADIUS = 1.5
+
+# Peso relativo de cada tipo de error
+ERROR_WEIGHTS = {
+    "substitution": 0.6,
+    "insertion": 0.15,
+    "deletion": 0.15,
+    "transposition": 0.1,
+}
+
+DEFAULT_ERROR_RATE = 0.2
+
+
+class NoisySentence(NamedTuple):
+    """Frase limpia, su versión con errores y los índices de las palabras alteradas."""
+
+    clean: str
+    noisy: str
+    changed: tuple[int, ...]
+
+
+def key_neighbours(layout: str = DEFAULT_LAYOUT) -> dict[str, list[str]]:
+    """Letras a menos de NEIGHBOUR_RADIUS de cada tecla, según sus coordenadas."""
+    compiled = compile_layout(layout)
+    neighbours = {}
+    for i, key in enumerate(compiled.keys):
+        dist = ((compiled.coords - compiled.coords[i]) ** 2).sum(axis=1) ** 0.5
+        neighbours[key] = [
+            compiled.keys[j]
+            for j in range(len(compiled.keys))
+            if j != i and compiled.keys[j].isalpha() and dist[j] <= NEIGHBOUR_RADIUS
+        ]
+    return neighbours
+
+
+def perturb_word(
+    word: str,
+    rng: random.Random,
+    neighbours: dict[str, list[str]],
+    kind: str = "substitution",
+) -> str:
+    """Aplica a `word` un error de tipo `kind` (ver ERROR_WEIGHTS)."""
+    i = rng.randrange(len(word))
+    options = neighbours.get(word[i])
+
+    if kind == "substitution" and options:
+        return word[:i] + rng.choice(options) + word[i + 1:]
+    if kind == "insertion" and options:
+        return word[:i + 1] + rng.choice(options) + word[i + 1:]
+    if kind == "deletion" and len(word) > 1:
+        return word[:i] + word[i + 1:]
+    if kind == "transposition" and len(word) > 1:
+        i = min(i, len(word) - 2)
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word
+
+
+def add_typos(
+    sentence: str,
+    rate: float = DEFAULT_ERROR_RATE,
+    seed: int = 0,
+    neighbours: dict[str, list[str]] | None = None,
+    kinds: tuple[str, ...] = ("substitution",),
+) -> str:
+    """Introduce un error en una fracción `rate` de las palabras de la frase."""
+    return noisy_sentence(sentence, rate, random.Random(seed), neighbours, kinds).noisy
+
+
+def noisy_sentence(
+    sentence: str,
+    rate: float,
+    rng: random.Random,
+    neighbours: dict[str, list[str]] | None = None,
+    kinds: tuple[str, ...] = tuple(ERROR_WEIGHTS),
+) -> NoisySentence:
+    """Versión con errores de una frase, indicando qué palabras cambiaron."""
+    neighbours = neighbours or key_neighbours()
+    weights = [ERROR_WEIGHTS[k] for k in kinds]
+    noisy = []
+    changed = []
+    for position, word in enumerate(sentence.split()):
+        typed = word
+        if rng.random() < rate:
+            kind = rng.choices(kinds, weights)[0]
+            typed = perturb_word(word, rng, neighbours, kind)
+        if typed != word:
+            changed.append(position)
+        noisy.append(typed)
+    return NoisySentence(sentence, " ".join(noisy), tuple(changed))
+
+
+def generate_corpus(
+    n_sentences: int,
+    rate: float = DEFAULT_ERROR_RATE,
+    seed: int = 0,
+    words_per_sentence: int = 8,
+    layout: str = DEFAULT_LAYOUT,
+) -> list[NoisySentence]:
+    """Frases sintéticas en español con errores de teclado, reproducibles por semilla."""
+    rng = random.Random(seed)
+    neighbours = key_neighbours(layout)
+    return [
+        noisy_sentence(sentence, rate, rng, neighbours)
+        for sentence in sample_sentences(n_sentences, words_per_sentence, seed)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera frases con errores de teclado.")
+    parser.add_argument("-n", "--sentences", type=int, default=10)
+    parser.add_argument("--rate", type=float, default=DEFAULT_ERROR_RATE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for sample in generate_corpus(args.sentences, args.rate, args.seed):
+        print(f"{sample.noisy}\t{sample.clean}")
+
+
+if __name__ == "__main__":
+    main()
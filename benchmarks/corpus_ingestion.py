@@ -0,0 +1,112 @@
+"""
+Ingesta de corpus: velocidad de conteo según el formato y el lector.
+
+Para un corpus sintético en texto plano, gzip, bz2, xz y (si hay soporte)
+zstd compara tres formas de contar unigramas y bigramas:
+
+- por token: count_frequencies sobre un flujo de tokens, leyendo en el
+  mismo hilo (como el pipeline original).
+- por lotes: count_token_batches, leyendo en el mismo hilo.
+- lotes + hilo: count_token_batches con PrefetchReader descomprimiendo
+  en otro hilo.
+
+Uso: python -m benchmarks.corpus_ingestion
+"""
+
+import bz2
+import contextlib
+import gzip
+import io
+import lzma
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import sample_sentences
+from hmm_smart_keyboard.corpus_stream import count_token_batches, text_token_batches
+from hmm_smart_keyboard.language_model import count_frequencies
+
+N_SENTENCES = 300000
+
+COMPRESSORS = {
+    "txt": None,
+    "txt.gz": gzip.open,
+    "txt.bz2": bz2.open,
+    "txt.xz": lzma.open,
+}
+
+
+def zstd_compressor():
+    """Abridor de escritura zstd, o None si no hay soporte."""
+    with contextlib.suppress(ImportError):
+        from compression import zstd  # noqa: PLC0415 (Python 3.14+)
+
+        return zstd.open
+    with contextlib.suppress(ImportError):
+        import zstandard  # noqa: PLC0415
+
+        def open_zstd(path, _mode):
+            return zstandard.ZstdCompressor().stream_writer(Path(path).open("wb"), closefd=True)
+
+        return open_zstd
+    return None
+
+
+def count_per_token(path):
+    tokens = (t for batch in text_token_batches(path, prefetch=False) for t in batch)
+    return count_frequencies(tokens)
+
+
+def count_batched(path):
+    return count_token_batches(text_token_batches(path, prefetch=False))
+
+
+def count_prefetched(path):
+    return count_token_batches(text_token_batches(path))
+
+
+READERS = {
+    "por token": count_per_token,
+    "por lotes": count_batched,
+    "lotes + hilo": count_prefetched,
+}
+
+
+def main():
+    text = "\n".join(sample_sentences(N_SENTENCES, seed=11)) + "\n"
+    data = text.encode("utf-8")
+    n_tokens = len(text.split())
+    zstd_open = zstd_compressor()
+    if zstd_open is not None:
+        COMPRESSORS["txt.zst"] = zstd_open
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"corpus: {len(data) / 2**20:.1f} MB, {n_tokens:,} tokens")
+        print(f"{'formato':>8} | {'MB disco':>8} | " + " | ".join(f"{name:>12}" for name in READERS))
+        for name, opener in COMPRESSORS.items():
+            path = Path(tmp) / f"corpus.{name}"
+            if opener is None:
+                path.write_bytes(data)
+            else:
+                with opener(path, "wb") as f:
+                    f.write(data)
+
+            rates = []
+            for count in READERS.values():
+                # Los mensajes de progreso de los contadores no van a la tabla
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    unigrams, _ = count(path)
+                    elapsed = time.perf_counter() - start
+                assert sum(unigrams.values()) == n_tokens  # noqa: S101
+                rates.append(f"{n_tokens / elapsed / 1e6:>7.2f} Mtok/s")
+
+            size = path.stat().st_size / 2**20
+            print(f"{name:>8} | {size:>8.1f} | " + " | ".join(rates))
+
+        if zstd_open is None:
+            print("\n(zstd omitido: necesita Python 3.14+ o el paquete zstandard)")
+
+
+if __name__ == "__main__":
+    main()
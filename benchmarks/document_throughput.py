@@ -0,0 +1,54 @@
+"""
+Throughput de solve_document según el número de procesos.
+
+Uso: python -m benchmarks.document_throughput
+"""
+
+import os
+import random
+import time
+
+from benchmarks.common import build_models, sample_sentences
+from hmm_smart_keyboard.viterbi_decoder import ViterbiDecoder
+
+N_SENTENCES = 400
+PARAGRAPH_SENTENCES = 8
+
+
+def build_document(n_sentences, seed=0):
+    """Párrafos con puntuación y mayúsculas a partir de frases sintéticas."""
+    rng = random.Random(seed)
+    sentences = sample_sentences(n_sentences, words_per_sentence=12, seed=seed)
+    parts = []
+    for i, sentence in enumerate(sentences):
+        words = sentence.split()
+        words[rng.randrange(2, len(words) - 1)] += ","
+        parts.append(" ".join(words).capitalize() + rng.choice([".", "?", "!"]))
+        parts.append("\n\n" if (i + 1) % PARAGRAPH_SENTENCES == 0 else " ")
+    return "".join(parts)
+
+
+def main():
+    km, lm = build_models()
+    decoder = ViterbiDecoder(language_model=lm, keyboard_model=km)
+    document = build_document(N_SENTENCES)
+    n_words = len(document.split())
+
+    cpus = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cpus} & set(range(1, cpus + 1)))
+
+    print(f"Documento: {n_words:,} palabras")
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        decoder.solve_document(document, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(
+            f"  procesos={workers:>2} | {elapsed:7.2f} s | "
+            f"{n_words / elapsed:9,.0f} palabras/s | x{baseline / elapsed:.2f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
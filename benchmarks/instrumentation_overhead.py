@@ -0,0 +1,53 @@
+"""
+Costo de la instrumentación, apagada y encendida, sobre solve.
+
+Uso: python -m benchmarks.instrumentation_overhead
+"""
+
+import time
+
+from benchmarks.common import build_models
+from benchmarks.corpus import generate_corpus
+from hmm_smart_keyboard.instrumentation import Metrics, instrument
+from hmm_smart_keyboard.viterbi_decoder import ViterbiDecoder
+
+N_SENTENCES = 300
+REPEATS = 3
+
+
+def best_time(decoder, sentences, metrics=None):
+    """Mejor tiempo de REPEATS pasadas sobre todas las frases."""
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        if metrics is None:
+            for sentence in sentences:
+                decoder.solve(sentence, audit=False)
+        else:
+            with instrument(metrics):
+                for sentence in sentences:
+                    decoder.solve(sentence, audit=False)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    km, lm = build_models()
+    decoder = ViterbiDecoder(language_model=lm, keyboard_model=km)
+    sentences = [sample.noisy for sample in generate_corpus(N_SENTENCES, seed=1)]
+
+    # Calentamiento: cachés de buckets y de distribución
+    best_time(decoder, sentences)
+
+    disabled = best_time(decoder, sentences)
+    metrics = Metrics()
+    enabled = best_time(decoder, sentences, metrics)
+
+    print(f"Sin instrumentar: {disabled:.3f} s")
+    print(f"Instrumentado:    {enabled:.3f} s ({enabled / disabled - 1:+.1%})")
+    print()
+    print(metrics.to_prometheus(), end="")
+
+
+if __name__ == "__main__":
+    main()
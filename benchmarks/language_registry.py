@@ -0,0 +1,121 @@
+"""
+Registro de idiomas: costo de carga y tráfico mezclado es/en/pt.
+
+- Compilación de artefactos por idioma, y carga con mmap frente a construir
+  los modelos desde la matriz JSON.
+- Tráfico con la mezcla TRAFFIC: con un presupuesto para todos los idiomas
+  y con uno que solo alcanza para dos (se descarta el menos usado).
+
+Uso: python -m benchmarks.language_registry
+"""
+
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import ujson as json
+from wordfreq import top_n_list
+
+from benchmarks.common import VOCAB_SIZE, sample_sentences
+from benchmarks.corpus import add_typos, key_neighbours
+from hmm_smart_keyboard.keyboard_model import KeyboardModel
+from hmm_smart_keyboard.language_model import (
+    LanguageModel,
+    calculate_probabilities,
+    count_frequencies,
+)
+from hmm_smart_keyboard.language_registry import (
+    LANGUAGES,
+    LanguageRegistry,
+    compile_language,
+    load_language,
+)
+from hmm_smart_keyboard.vocabulary import align_vocabularies
+
+N_SENTENCES = 5000
+N_REQUESTS = 600
+# Fracción del tráfico por idioma
+TRAFFIC = {"es": 0.6, "en": 0.3, "pt": 0.1}
+
+
+def write_matrix(lang, path):
+    """Matriz de transición de frases sintéticas de `lang`, como la de language_model.main."""
+    sentences = sample_sentences(N_SENTENCES, lang=lang)
+    unigrams, bigrams = count_frequencies(t for s in sentences for t in s.split())
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(calculate_probabilities(unigrams, bigrams), f, ensure_ascii=False)
+
+
+def build_from_json(locale, path):
+    """Lo que hacía un proceso sin registro: modelos desde la matriz JSON."""
+    spec = LANGUAGES[locale]
+    km = KeyboardModel(top_n_list(spec.wordfreq_lang, VOCAB_SIZE), layout=spec.layout)
+    lm = LanguageModel(path)
+    align_vocabularies(km, lm)
+    return km, lm
+
+
+def serve(registry, requests):
+    """Milisegundos por petición, incluidas las cargas de idiomas."""
+    start = time.perf_counter()
+    for locale, sentence in requests:
+        registry.decoder(locale).solve(sentence, audit=False)
+    return (time.perf_counter() - start) / len(requests) * 1000
+
+
+def main():
+    neighbours = key_neighbours()
+    rng = random.Random(0)
+    locales = rng.choices(list(TRAFFIC), list(TRAFFIC.values()), k=N_REQUESTS)
+    sentences = {
+        lang: sample_sentences(N_REQUESTS, seed=1, lang=lang) for lang in TRAFFIC
+    }
+    requests = [
+        (lang, add_typos(sentences[lang][i], seed=i, neighbours=neighbours))
+        for i, lang in enumerate(locales)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "languages"
+        sizes = {}
+        print(f"{'idioma':>6} | {'compilar s':>10} | {'desde JSON s':>12} | {'mmap s':>6} | {'MB':>5}")
+        for lang in TRAFFIC:
+            matrix = Path(tmp) / f"P_matrix_transicion.{lang}.json"
+            write_matrix(lang, matrix)
+
+            start = time.perf_counter()
+            compile_language(lang, root, language_model=LanguageModel(matrix))
+            compile_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            build_from_json(lang, matrix)
+            json_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            bundle = load_language(root / lang)
+            mmap_s = time.perf_counter() - start
+            sizes[lang] = bundle.nbytes
+
+            print(
+                f"{lang:>6} | {compile_s:>10.2f} | {json_s:>12.2f} | "
+                f"{mmap_s:>6.2f} | {bundle.nbytes / 2**20:>5.1f}",
+            )
+
+        budgets = {
+            "todos": sum(sizes.values()),
+            "dos idiomas": sum(sorted(sizes.values())[-2:]),
+        }
+        print(f"\n{'presupuesto':>11} | {'ms/petición':>11} | {'cargas':>6} | {'descartes':>9} | {'aciertos':>8}")
+        for name, budget in budgets.items():
+            registry = LanguageRegistry(root, budget, compile_missing=False)
+            ms = serve(registry, requests)
+            report = registry.report()
+            print(
+                f"{name:>11} | {ms:>11.2f} | {report['loads']:>6} | "
+                f"{report['evictions']:>9} | {report['hit_rate']:>8.1%}",
+            )
+
+
+if __name__ == "__main__":
+    main()
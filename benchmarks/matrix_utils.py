@@ -0,0 +1,114 @@
+"""
+Utilidades de probabilidad y validación sobre matrices grandes.
+
+Una matriz de transición CSR de N_ROWS filas (≈ NNZ_PER_ROW bigramas por
+fila), guardada en .npy y abierta con mmap, como las de language_registry:
+
+- validate_probabilities: copia + tres pasadas (la versión anterior)
+  frente a min/max por bloques sin copia.
+- validate_csr_stochastic y segment_log_sum_exp: por bloques frente a la
+  matriz entera de una vez (chunk_rows = N_ROWS).
+- Matriz de distancias: doble bucle (la versión anterior) frente a
+  broadcasting, para las teclas de qwerty_es y para N_POINTS toques.
+
+Se mide tiempo y pico de memoria temporal (tracemalloc ve los arrays de
+NumPy; las páginas mapeadas no cuentan porque no se copian).
+
+Uso: python -m benchmarks.matrix_utils
+"""
+
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from hmm_smart_keyboard.keyboard_layouts import compile_layout
+from hmm_smart_keyboard.utils.distance import euclidean_distance, pairwise_distances
+from hmm_smart_keyboard.utils.probability import segment_log_sum_exp
+from hmm_smart_keyboard.utils.validation import (
+    CSRMatrix,
+    validate_csr_stochastic,
+    validate_probabilities,
+)
+
+N_ROWS = 1_000_000
+NNZ_PER_ROW = 12
+N_POINTS = 500
+
+
+def validate_probabilities_dense(probs):
+    """La versión anterior: copia densa y tres pasadas completas."""
+    probs = np.array(probs)
+    return bool(np.any(probs < 0) or np.any(probs == 0) or np.any(probs > 1))
+
+
+def distance_matrix_loop(points):
+    """La versión anterior de calculate_distance_matrix."""
+    n = len(points)
+    matrix = np.zeros((n, n))
+    for i in range(n):
+        for j in range(n):
+            if i != j:
+                matrix[i, j] = euclidean_distance(points[i], points[j])
+    return matrix
+
+
+def measure(func, *args, **kwargs):
+    """(segundos, MB de pico de memoria temporal)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def build_matrix(directory):
+    """CSR estocástica por filas en .npy; se devuelve abierta con mmap."""
+    rng = np.random.default_rng(0)
+    counts = rng.integers(1, 2 * NNZ_PER_ROW, N_ROWS)
+    indptr = np.zeros(N_ROWS + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    data = rng.random(indptr[-1]) + 1e-3
+    data /= np.repeat(np.add.reduceat(data, indptr[:-1]), counts)
+    indices = rng.integers(0, N_ROWS, indptr[-1], dtype=np.int32)
+
+    arrays = {"data": data, "indices": indices, "indptr": indptr, "log_data": np.log(data)}
+    for name, array in arrays.items():
+        np.save(directory / f"{name}.npy", array)
+    return {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in arrays}
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        arrays = build_matrix(Path(tmp))
+        matrix = CSRMatrix(arrays["data"], arrays["indices"], arrays["indptr"], (N_ROWS, N_ROWS))
+        print(f"CSR {N_ROWS:,} x {N_ROWS:,}, {len(matrix.data):,} valores (mmap)")
+
+        rows = [
+            ("validate_probabilities (copia)", validate_probabilities_dense, (matrix.data,), {}),
+            ("validate_probabilities (bloques)", validate_probabilities, (matrix.data,), {}),
+            ("validate_csr_stochastic (entera)", validate_csr_stochastic, (matrix,), {"chunk_rows": N_ROWS}),
+            ("validate_csr_stochastic (bloques)", validate_csr_stochastic, (matrix,), {}),
+            ("segment_log_sum_exp (entera)", segment_log_sum_exp, (arrays["log_data"], matrix.indptr), {"chunk_rows": N_ROWS}),
+            ("segment_log_sum_exp (bloques)", segment_log_sum_exp, (arrays["log_data"], matrix.indptr), {}),
+        ]
+        print(f"{'operación':>34} | {'s':>6} | {'MB pico':>7}")
+        for name, func, args, kwargs in rows:
+            elapsed, peak = measure(func, *args, **kwargs)
+            print(f"{name:>34} | {elapsed:>6.2f} | {peak:>7.1f}")
+
+    keys = compile_layout().coords
+    touches = np.random.default_rng(1).random((N_POINTS, 2)) * 10
+    print(f"\n{'distancias':>22} | {'bucle ms':>9} | {'broadcast ms':>12}")
+    for name, points in ((f"{len(keys)} teclas", keys), (f"{N_POINTS} toques", touches)):
+        loop_s, _ = measure(distance_matrix_loop, [tuple(p) for p in points])
+        vector_s, _ = measure(pairwise_distances, points)
+        print(f"{name:>22} | {loop_s * 1000:>9.1f} | {vector_s * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
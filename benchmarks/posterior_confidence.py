@@ -0,0 +1,72 @@
+"""
+Confianza por palabra con forward-backward: costo y calibración.
+
+- Latencia de solve con y sin posteriors=True (la meta es <= 2x).
+- Calibración: por tramo de confianza, qué fracción de palabras acertó.
+- Auto-aplicar: si solo se aplican las correcciones con confianza >= umbral,
+  cuántas se aplican y qué fracción de ellas es correcta.
+
+Uso: python -m benchmarks.posterior_confidence
+"""
+
+import time
+
+import numpy as np
+
+from benchmarks.common import build_models
+from benchmarks.corpus import generate_corpus
+from hmm_smart_keyboard.viterbi_decoder import ViterbiDecoder
+
+N_SENTENCES = 300
+BINS = (0.0, 0.5, 0.7, 0.9, 0.99, 1.0)
+THRESHOLDS = (0.5, 0.7, 0.9, 0.99)
+
+
+def main():
+    km, lm = build_models()
+    corpus = generate_corpus(N_SENTENCES, seed=6)
+    decoder = ViterbiDecoder(language_model=lm, keyboard_model=km)
+
+    for posteriors in (False, True):
+        start = time.perf_counter()
+        for sample in corpus:
+            decoder.solve(sample.noisy, audit=False, posteriors=posteriors)
+        elapsed = time.perf_counter() - start
+        label = "con posteriors" if posteriors else "sin posteriors"
+        print(f"{label}: {elapsed / N_SENTENCES * 1000:.2f} ms/frase")
+
+    confidences = []
+    correct = []
+    changed = []
+    for sample in corpus:
+        result = decoder.solve(sample.noisy, audit=False, posteriors=True)
+        for word, typed, truth, confidence in zip(
+            result.corrected_words,
+            sample.noisy.split(),
+            sample.clean.split(),
+            result.confidences,
+            strict=True,
+        ):
+            confidences.append(confidence)
+            correct.append(word == truth)
+            changed.append(word != typed)
+    confidences = np.array(confidences)
+    correct = np.array(correct)
+    changed = np.array(changed)
+
+    print(f"\n{'confianza':>9} | {'palabras':>8} | {'aciertos':>8}")
+    bins = np.digitize(confidences, BINS[1:-1])
+    for b in range(len(BINS) - 1):
+        mask = bins == b
+        if mask.any():
+            print(f"{BINS[b]:>4.2f}-{BINS[b + 1]:<4.2f} | {mask.sum():>8} | {correct[mask].mean():>8.1%}")
+
+    print(f"\n{'umbral':>6} | {'correcciones aplicadas':>22} | {'correctas':>9}")
+    for threshold in THRESHOLDS:
+        applied = changed & (confidences >= threshold)
+        precision = correct[applied].mean() if applied.any() else 0.0
+        print(f"{threshold:>6.2f} | {applied.sum():>10} de {changed.sum():>9} | {precision:>9.1%}")
+
+
+if __name__ == "__main__":
+    main()
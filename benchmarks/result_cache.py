@@ -0,0 +1,100 @@
+"""
+Caché de frases y de columnas sobre tráfico de mensajería.
+
+El tráfico sale de un repertorio de N_PHRASES frases cortas con errores,
+pedidas con frecuencias de Zipf (unas pocas se repiten muchísimo), con
+variantes de mayúsculas y puntuación, y continuaciones que comparten el
+principio de una frase del repertorio. Se compara ms por petición y tasa
+de aciertos sin caché, con cada caché y con ambas, comprobando que las
+correcciones no cambian.
+
+Uso: python -m benchmarks.result_cache
+"""
+
+import random
+import time
+
+from benchmarks.common import build_models, sample_sentences
+from benchmarks.corpus import add_typos, key_neighbours
+from hmm_smart_keyboard.result_cache import ResultCache
+from hmm_smart_keyboard.viterbi_decoder import ViterbiDecoder
+
+N_PHRASES = 400
+N_REQUESTS = 3000
+ZIPF_EXPONENT = 1.1
+# Fracción de peticiones que continúan una frase del repertorio
+CONTINUATION_RATE = 0.3
+
+
+def build_traffic(seed=0):
+    """Peticiones de mensajería: frases repetidas, variantes y continuaciones."""
+    rng = random.Random(seed)
+    neighbours = key_neighbours()
+    phrases = [
+        add_typos(phrase, seed=i, neighbours=neighbours)
+        for i, phrase in enumerate(
+            " ".join(s.split()[:rng.randint(2, 4)])
+            for s in sample_sentences(N_PHRASES, seed=seed)
+        )
+    ]
+    tails = sample_sentences(N_REQUESTS, words_per_sentence=3, seed=seed + 1)
+    weights = [1 / (rank + 1) ** ZIPF_EXPONENT for rank in range(N_PHRASES)]
+
+    requests = []
+    for i, phrase in enumerate(rng.choices(phrases, weights, k=N_REQUESTS)):
+        request = phrase
+        if rng.random() < CONTINUATION_RATE:
+            request = f"{phrase} {add_typos(tails[i], seed=i, neighbours=neighbours)}"
+        elif rng.random() < 0.5:  # noqa: PLR2004
+            request = phrase.capitalize() + rng.choice(("!", "?", "."))
+        requests.append(request)
+    return requests
+
+
+def main():
+    km, lm = build_models()
+    requests = build_traffic()
+
+    configs = {
+        "sin caché": (None, None),
+        "columnas": (None, ResultCache()),
+        "frases": (ResultCache(), None),
+        "frases + columnas": (ResultCache(), ResultCache()),
+    }
+
+    reference = None
+    print(f"{'caché':>18} | {'ms/petición':>11} | {'aciertos frases':>15} | {'aciertos columnas':>17} | {'KB':>6}")
+    for name, (sentences, columns) in configs.items():
+        decoder = ViterbiDecoder(language_model=lm, keyboard_model=km)
+        decoder.result_cache = sentences
+        decoder.column_cache = columns
+
+        start = time.perf_counter()
+        corrected = [decoder.solve(r, audit=False).corrected_text for r in requests]
+        ms = (time.perf_counter() - start) / N_REQUESTS * 1000
+
+        reference = reference or corrected
+        assert corrected == reference, name  # noqa: S101
+
+        def rate(cache):
+            return "-" if cache is None else f"{cache.report()['hit_rate']:.1%}"
+
+        kb = sum(c.nbytes for c in (sentences, columns) if c is not None) / 1024
+        print(f"{name:>18} | {ms:>11.3f} | {rate(sentences):>15} | {rate(columns):>17} | {kb:>6.0f}")
+
+    # Con un presupuesto pequeño el LRU descarta y la tasa de aciertos baja
+    print(f"\n{'max_bytes':>10} | {'entradas':>8} | {'descartes':>9} | {'aciertos':>8}")
+    for max_bytes in (16 * 1024, 64 * 1024, 256 * 1024):
+        decoder = ViterbiDecoder(language_model=lm, keyboard_model=km)
+        decoder.result_cache = ResultCache(max_bytes=max_bytes)
+        for r in requests:
+            decoder.solve(r, audit=False)
+        report = decoder.result_cache.report()
+        print(
+            f"{max_bytes // 1024:>7} KB | {report['entries']:>8} | "
+            f"{report['evictions']:>9} | {report['hit_rate']:>8.1%}",
+        )
+
+
+if __name__ == "__main__":
+    main()
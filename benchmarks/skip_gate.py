@@ -0,0 +1,56 @@
+"""
+Efecto de la compuerta de confianza en throughput y exactitud.
+
+Uso: python -m benchmarks.skip_gate
+"""
+
+import time
+
+from benchmarks.common import build_models, sample_sentences
+from benchmarks.corpus import add_typos, key_neighbours
+from hmm_smart_keyboard.viterbi_decoder import ViterbiDecoder
+
+N_SENTENCES = 300
+
+# (rango máximo, contexto mínimo); None desactiva la compuerta
+GATE_SETTINGS = (
+    (None, None),
+    (200, -4.0),
+    (1000, -6.0),
+    (5000, -8.0),
+)
+
+
+def main():
+    km, lm = build_models()
+    clean = sample_sentences(N_SENTENCES, seed=1)
+    neighbours = key_neighbours()
+    noisy = [add_typos(s, seed=i, neighbours=neighbours) for i, s in enumerate(clean)]
+    n_words = sum(len(s.split()) for s in clean)
+
+    print(f"{n_words:,} palabras en {N_SENTENCES} frases")
+    print(f"{'rango':>6} | {'ctx':>5} | {'saltadas':>8} | {'palabras/s':>10} | {'exactitud':>9}")
+    for max_rank, min_context in GATE_SETTINGS:
+        decoder = ViterbiDecoder(language_model=lm, keyboard_model=km)
+        decoder.skip_max_rank = max_rank
+        if min_context is not None:
+            decoder.skip_min_context = min_context
+
+        correct = 0
+        start = time.perf_counter()
+        for dirty, truth in zip(noisy, clean, strict=True):
+            result = decoder.solve(dirty, audit=False)
+            correct += sum(
+                a == b for a, b in zip(result.corrected_words, truth.split(), strict=True)
+            )
+        elapsed = time.perf_counter() - start
+
+        report = decoder.gate_report()
+        print(
+            f"{max_rank!s:>6} | {min_context!s:>5} | {report['skip_rate']:>8.1%} | "
+            f"{n_words / elapsed:>10,.0f} | {correct / n_words:>9.2%}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Espacios de más y de menos: ViterbiDecoder vs. LatticeDecoder.
+
+Sobre frases con errores de teclado se une un par de palabras vecinas o se
+parte una palabra en dos (con probabilidad SPACE_ERROR_RATE por frase) y se
+compara el WER y la latencia de ambos decodificadores. Las frases sin
+errores de espacio miden cuánto cuesta el retículo cuando no hace falta.
+
+Uso: python -m benchmarks.space_errors
+"""
+
+import random
+import time
+
+import numpy as np
+
+from benchmarks.common import build_models, sample_sentences
+from benchmarks.corpus import add_typos, key_neighbours
+from hmm_smart_keyboard.evaluation import word_errors
+from hmm_smart_keyboard.lattice_decoder import LatticeDecoder
+from hmm_smart_keyboard.viterbi_decoder import ViterbiDecoder
+
+N_SENTENCES = 300
+SPACE_ERROR_RATE = 0.5
+SPACE_PENALTIES = (2.0, 4.0, 6.0)
+
+
+def add_space_error(sentence: str, rng: random.Random) -> str:
+    """Une dos palabras vecinas o parte una palabra de 4+ letras en dos."""
+    words = sentence.split()
+    long_words = [i for i, w in enumerate(words) if len(w) >= 4]  # noqa: PLR2004
+    if long_words and rng.random() < 0.5:  # noqa: PLR2004
+        i = rng.choice(long_words)
+        cut = rng.randrange(2, len(words[i]) - 1)
+        words[i:i + 1] = [words[i][:cut], words[i][cut:]]
+    elif len(words) > 1:
+        i = rng.randrange(len(words) - 1)
+        words[i:i + 2] = [words[i] + words[i + 1]]
+    return " ".join(words)
+
+
+def run(solve, corpus):
+    """WER, latencia media y p99 (ms) de `solve` sobre pares (con errores, correcta)."""
+    errors = 0
+    n_words = 0
+    latencies = []
+    for noisy, clean in corpus:
+        start = time.perf_counter()
+        result = solve(noisy)
+        latencies.append(time.perf_counter() - start)
+        reference = clean.split()
+        errors += word_errors(list(result.corrected_words), reference)
+        n_words += len(reference)
+    latencies_ms = np.asarray(latencies) * 1000
+    return errors / n_words, latencies_ms.mean(), np.percentile(latencies_ms, 99)
+
+
+def main():
+    km, lm = build_models()
+    clean = sample_sentences(N_SENTENCES, seed=2)
+    neighbours = key_neighbours()
+    rng = random.Random(2)
+
+    typos = [add_typos(s, seed=i, neighbours=neighbours) for i, s in enumerate(clean)]
+    spaced = [
+        add_space_error(s, rng) if rng.random() < SPACE_ERROR_RATE else s for s in typos
+    ]
+    corpora = {
+        "solo teclado": list(zip(typos, clean, strict=True)),
+        "con espacios": list(zip(spaced, clean, strict=True)),
+    }
+
+    decoder = ViterbiDecoder(language_model=lm, keyboard_model=km)
+    solvers = {"viterbi": lambda s: decoder.solve(s, audit=False)}
+    for penalty in SPACE_PENALTIES:
+        solvers[f"lattice {penalty:g}"] = LatticeDecoder(decoder, space_penalty=penalty).solve
+
+    print(f"{'decodificador':>13} | {'corpus':>12} | {'WER':>7} | {'media ms':>8} | {'p99 ms':>8}")
+    for name, solve in solvers.items():
+        for corpus_name, corpus in corpora.items():
+            wer, mean_ms, p99_ms = run(solve, corpus)
+            print(f"{name:>13} | {corpus_name:>12} | {wer:>7.2%} | {mean_ms:>8.2f} | {p99_ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
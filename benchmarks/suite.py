@@ -0,0 +1,192 @@
+"""
+Suite de benchmarks del decodificador completo.
+
+Mide cada etapa por separado sobre el mismo corpus ruidoso reproducible
+(generación de candidatos, emisión, transiciones) y después solve de punta
+a punta: latencia por frase (percentiles), throughput, exactitud y pico de
+memoria. Guarda los resultados en JSON para comparar entre commits.
+
+Uso:
+    python -m benchmarks.suite                      # guarda en benchmarks/results/
+    python -m benchmarks.suite --compare base.json  # y muestra la diferencia
+"""
+
+import argparse
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import UTC, datetime
+from pathlib import Path
+
+import numpy as np
+import ujson as json
+
+from benchmarks.common import build_models
+from benchmarks.corpus import generate_corpus
+from hmm_smart_keyboard.viterbi_decoder import ViterbiDecoder
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+DEFAULT_SENTENCES = 300
+DEFAULT_SEED = 1
+PERCENTILES = (50, 90, 99)
+
+
+def latency_summary(samples_s: list[float]) -> dict[str, float]:
+    """Media y percentiles en milisegundos."""
+    samples_ms = np.asarray(samples_s) * 1000
+    summary = {"mean_ms": float(samples_ms.mean())}
+    for p, value in zip(PERCENTILES, np.percentile(samples_ms, PERCENTILES), strict=True):
+        summary[f"p{p}_ms"] = float(value)
+    return summary
+
+
+def time_each(func, items) -> list[float]:
+    """Tiempo de func(item) para cada elemento, en segundos."""
+    timings = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_candidates(km, pairs):
+    timings = time_each(lambda pair: km.get_scored_candidates(pair[0], use_cache=False), pairs)
+    return latency_summary(timings) | {"calls": len(pairs)}
+
+
+def bench_emissions(km, pairs):
+    timings = time_each(lambda pair: km.get_emission_log_prob(*pair), pairs)
+    return latency_summary(timings) | {"calls": len(pairs)}
+
+
+def bench_transitions(lm, bigrams):
+    start = time.perf_counter()
+    for prev, cur in bigrams:
+        lm.get_transition_log_prob(prev, cur)
+    elapsed = time.perf_counter() - start
+    return {
+        "calls": len(bigrams),
+        "mean_us": elapsed / len(bigrams) * 1e6,
+        "lookups_per_s": len(bigrams) / elapsed,
+    }
+
+
+def bench_solve(decoder, corpus):
+    timings = []
+    correct = 0
+    n_words = 0
+    for sample in corpus:
+        start = time.perf_counter()
+        result = decoder.solve(sample.noisy, audit=False)
+        timings.append(time.perf_counter() - start)
+
+        truth = sample.clean.split()
+        n_words += len(truth)
+        correct += sum(a == b for a, b in zip(result.corrected_words, truth, strict=False))
+
+    # Pico de memoria en una pasada aparte: tracemalloc distorsiona los tiempos
+    tracemalloc.start()
+    for sample in corpus:
+        decoder.solve(sample.noisy, audit=False)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = sum(timings)
+    return latency_summary(timings) | {
+        "sentences": len(corpus),
+        "words": n_words,
+        "words_per_s": n_words / total,
+        "word_accuracy": correct / n_words,
+        "peak_memory_bytes": peak,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(n_sentences=DEFAULT_SENTENCES, seed=DEFAULT_SEED) -> dict:
+    """Ejecuta todas las etapas y devuelve los resultados como dict."""
+    km, lm = build_models()
+    decoder = ViterbiDecoder(language_model=lm, keyboard_model=km)
+    corpus = generate_corpus(n_sentences, seed=seed)
+
+    pairs = [
+        (dirty, clean)
+        for sample in corpus
+        for dirty, clean in zip(sample.noisy.split(), sample.clean.split(), strict=True)
+    ]
+    bigrams = [
+        (prev, cur)
+        for sample in corpus
+        for prev, cur in zip(sample.clean.split(), sample.clean.split()[1:], strict=False)
+    ]
+
+    return {
+        "revision": git_revision(),
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "corpus": {"sentences": n_sentences, "seed": seed, "words": len(pairs)},
+        "candidates": bench_candidates(km, pairs),
+        "emission": bench_emissions(km, pairs),
+        "transitions": bench_transitions(lm, bigrams),
+        "solve": bench_solve(decoder, corpus),
+    }
+
+
+def compare(current: dict, baseline: dict) -> None:
+    """Imprime el cambio relativo de cada métrica numérica respecto a la base."""
+    print(f"\nComparación con {baseline.get('revision', '?')}:")
+    for stage in ("candidates", "emission", "transitions", "solve"):
+        for metric, value in current[stage].items():
+            old = baseline.get(stage, {}).get(metric)
+            if not old or not isinstance(value, int | float):
+                continue
+            print(f"  {stage:>11}.{metric:<18} {old:>14.4f} -> {value:>14.4f} ({value / old - 1:+.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks del decodificador.")
+    parser.add_argument("-n", "--sentences", type=int, default=DEFAULT_SENTENCES)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("-o", "--output", help="archivo JSON de salida")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior")
+    args = parser.parse_args()
+
+    results = run(args.sentences, args.seed)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{results['revision']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    solve = results["solve"]
+    print(f"Candidatos: {results['candidates']['mean_ms']:.3f} ms/palabra")
+    print(f"Emisión:    {results['emission']['mean_ms']:.4f} ms/par")
+    print(f"Transición: {results['transitions']['mean_us']:.3f} µs/consulta")
+    print(
+        f"solve:      p50 {solve['p50_ms']:.2f} ms | p90 {solve['p90_ms']:.2f} ms | "
+        f"p99 {solve['p99_ms']:.2f} ms | {solve['words_per_s']:,.0f} palabras/s | "
+        f"exactitud {solve['word_accuracy']:.2%} | pico {solve['peak_memory_bytes']:,} B",
+    )
+    print(f"✅ Resultados guardados en: {output}")
+
+    if args.compare:
+        with Path(args.compare).open("r", encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
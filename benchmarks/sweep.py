@@ -0,0 +1,70 @@
+"""
+Barrido de hiperparámetros sobre el corpus ruidoso sintético.
+
+Uso: python -m benchmarks.sweep [--random 20] [--workers 4]
+"""
+
+import argparse
+
+import ujson as json
+
+from benchmarks.common import build_models
+from benchmarks.corpus import generate_corpus
+from benchmarks.suite import RESULTS_DIR, git_revision
+from hmm_smart_keyboard.evaluation import (
+    DEFAULT_GRID,
+    evaluate,
+    grid_configs,
+    pareto_frontier,
+    print_results,
+    random_configs,
+    sweep,
+)
+from hmm_smart_keyboard.viterbi_decoder import ViterbiDecoder
+
+N_SENTENCES = 150
+
+
+def check_punctuation(decoder, corpus):
+    """La puntuación y las mayúsculas de la referencia no cuentan como errores."""
+    punctuated = [
+        (f"{noisy.capitalize()}, ¿vale?", f"{clean.capitalize()}, ¿vale?")
+        for noisy, clean in corpus
+    ]
+    plain = [(f"{noisy} vale", f"{clean} vale") for noisy, clean in corpus]
+    expected = evaluate(decoder, plain)
+    found = evaluate(decoder, punctuated)
+    for metric in ("wer", "sentence_accuracy"):
+        assert found[metric] == expected[metric], (metric, found, expected)  # noqa: S101
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Barrido sobre el corpus sintético.")
+    parser.add_argument("-n", "--sentences", type=int, default=N_SENTENCES)
+    parser.add_argument("--random", type=int, help="evaluar solo N configuraciones al azar")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    km, lm = build_models()
+    decoder = ViterbiDecoder(language_model=lm, keyboard_model=km)
+    corpus = [(s.noisy, s.clean) for s in generate_corpus(args.sentences, seed=1)]
+    check_punctuation(decoder, corpus[:20])
+
+    if args.random:
+        configs = random_configs(DEFAULT_GRID, args.random)
+    else:
+        configs = grid_configs(DEFAULT_GRID)
+
+    results = sweep(decoder, corpus, configs, args.workers)
+    frontier = pareto_frontier(results)
+    print_results(results, frontier)
+
+    output = RESULTS_DIR / f"sweep-{git_revision()}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w", encoding="utf-8") as f:
+        json.dump({"results": results, "pareto": frontier}, f, indent=2)
+    print(f"✅ Resultados guardados en: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Escalado de solve_many con la cantidad de hilos.
+
+Decodifica N_SENTENCES frases con errores con 1, 2, 4 y 8 hilos sobre los
+mismos modelos congelados y compara frases por segundo contra el bucle
+secuencial, comprobando que las correcciones no cambian. También mide el
+pool de procesos de solve_document, que copia los modelos a cada worker.
+
+En el Python sin GIL (3.13t, sys._is_gil_enabled() == False) los hilos
+deberían escalar hasta la cantidad de núcleos; con GIL solo se solapan las
+partes de NumPy que lo sueltan y lo esperable es ~1x.
+
+Uso: python -m benchmarks.thread_scaling
+"""
+
+import os
+import sys
+import time
+
+from benchmarks.common import build_models, sample_sentences
+from benchmarks.corpus import add_typos, key_neighbours
+from hmm_smart_keyboard.viterbi_decoder import ViterbiDecoder
+
+N_SENTENCES = 400
+THREADS = (1, 2, 4, 8)
+
+
+def gil_status():
+    """'activado', 'desactivado' o 'activado (build estándar)'."""
+    is_enabled = getattr(sys, "_is_gil_enabled", None)
+    if is_enabled is None:
+        return "activado (build estándar)"
+    return "activado" if is_enabled() else "desactivado"
+
+
+def main():
+    km, lm = build_models()
+    neighbours = key_neighbours()
+    sentences = [
+        add_typos(s, seed=i, neighbours=neighbours)
+        for i, s in enumerate(sample_sentences(N_SENTENCES, seed=5))
+    ]
+    decoder = ViterbiDecoder(language_model=lm, keyboard_model=km).freeze()
+
+    print(f"Python {sys.version.split()[0]}, GIL {gil_status()}, {os.cpu_count()} CPU")
+    start = time.perf_counter()
+    reference = [decoder.solve(s, audit=False).corrected_text for s in sentences]
+    sequential = N_SENTENCES / (time.perf_counter() - start)
+    print(f"{'secuencial':>14} | {sequential:>8.1f} frases/s")
+
+    print(f"\n{'hilos':>14} | {'frases/s':>8} | {'speedup':>7}")
+    for threads in THREADS:
+        start = time.perf_counter()
+        results = decoder.solve_many(sentences, max_workers=threads)
+        rate = N_SENTENCES / (time.perf_counter() - start)
+        assert [r.corrected_text for r in results] == reference, threads  # noqa: S101
+        print(f"{threads:>14} | {rate:>8.1f} | {rate / sequential:>6.2f}x")
+
+    document = "\n".join(sentences)
+    print(f"\n{'procesos':>14} | {'frases/s':>8} | {'speedup':>7}")
+    for workers in THREADS[1:]:
+        start = time.perf_counter()
+        decoder.solve_document(document, max_workers=workers)
+        rate = N_SENTENCES / (time.perf_counter() - start)
+        print(f"{workers:>14} | {rate:>8.1f} | {rate / sequential:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Throughput del Tokenizer frente al tokenize() de siempre.
+
+Uso: python -m benchmarks.tokenizer_throughput
+"""
+
+import time
+
+from benchmarks.document_throughput import build_document
+from hmm_smart_keyboard.utils.text_processing import TOKENIZER, tokenize
+
+N_SENTENCES = 20000
+REPEATS = 5
+
+
+def measure(func, text):
+    """Mejor tiempo de REPEATS ejecuciones y el número de tokens producidos."""
+    best = float("inf")
+    n_tokens = 0
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        n_tokens = len(func(text))
+        best = min(best, time.perf_counter() - start)
+    return best, n_tokens
+
+
+def main():
+    document = build_document(N_SENTENCES)
+    megabytes = len(document.encode("utf-8")) / 1e6
+    print(f"Texto: {megabytes:.1f} MB")
+
+    for name, func in (
+        ("tokenize (solo palabras)", tokenize),
+        ("Tokenizer.tokenize", TOKENIZER.tokenize),
+        ("Tokenizer.words", TOKENIZER.words),
+    ):
+        elapsed, n_tokens = measure(func, document)
+        print(
+            f"  {name:<26} | {elapsed:6.3f} s | {megabytes / elapsed:6.1f} MB/s | "
+            f"{n_tokens / elapsed:11,.0f} tokens/s",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Memoria por frase decodificada para entradas del largo de un párrafo.
+
+Uso: python -m benchmarks.trellis_memory
+"""
+
+import tracemalloc
+
+from benchmarks.common import build_models, sample_sentences
+from hmm_smart_keyboard.viterbi_decoder import ViterbiDecoder
+
+PARAGRAPH_LENGTHS = (50, 100, 300, 600)
+
+
+def measure(decoder, text, audit):
+    """(bytes del trellis, pico de memoria de solve) para un texto."""
+    tracemalloc.start()
+    result = decoder.solve(text, audit=audit)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result.trellis_nbytes, peak
+
+
+def main():
+    km, lm = build_models()
+    decoder = ViterbiDecoder(language_model=lm, keyboard_model=km)
+
+    print(f"{'palabras':>8} | {'audit':>5} | {'trellis':>12} | {'pico solve':>12} | {'B/palabra':>9}")
+    for n_words in PARAGRAPH_LENGTHS:
+        text = sample_sentences(1, words_per_sentence=n_words, seed=n_words)[0]
+        for audit in (False, True):
+            trellis_bytes, peak = measure(decoder, text, audit)
+            print(
+                f"{n_words:>8} | {audit!s:>5} | {trellis_bytes:>12,} | "
+                f"{peak:>12,} | {trellis_bytes // n_words:>9,}",
+            )
+
+
+if __name__ == "__main__":
+    main()
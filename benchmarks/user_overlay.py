@@ -0,0 +1,79 @@
+"""
+Costo del modelo de usuario sobre los modelos base.
+
+- Latencia de solve con los modelos base, con el overlay vacío y con un
+  usuario que ya aceptó N_ACCEPTED frases (la meta es <= 10% extra).
+- µs por actualización con el log en disco, y tiempo de una compactación.
+
+Uso: python -m benchmarks.user_overlay
+"""
+
+import tempfile
+import time
+
+from benchmarks.common import build_models, sample_sentences
+from benchmarks.corpus import add_typos, key_neighbours
+from hmm_smart_keyboard.user_model import UserModel, personalize
+from hmm_smart_keyboard.viterbi_decoder import ViterbiDecoder
+
+N_SENTENCES = 300
+N_ACCEPTED = 500
+REPEATS = 3
+
+
+def time_solve(decoder, sentences):
+    """Mejor de REPEATS pasadas, en ms por frase."""
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for sentence in sentences:
+            decoder.solve(sentence, audit=False)
+        best = min(best, time.perf_counter() - start)
+    return best / len(sentences) * 1000
+
+
+def main():
+    km, lm = build_models()
+    clean = sample_sentences(N_SENTENCES, seed=7)
+    neighbours = key_neighbours()
+    noisy = [add_typos(s, seed=i, neighbours=neighbours) for i, s in enumerate(clean)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        user = UserModel(tmp)
+        accepted = sample_sentences(N_ACCEPTED, seed=8)
+
+        start = time.perf_counter()
+        for sentence in accepted:
+            user.accept(sentence.split())
+        n_updates = sum(len(s.split()) for s in accepted)
+        update_us = (time.perf_counter() - start) / n_updates * 1e6
+
+        start = time.perf_counter()
+        user.compact()
+        compact_ms = (time.perf_counter() - start) * 1000
+        user.close()
+
+        empty_km, empty_lm = personalize(km, lm, UserModel())
+        user_km, user_lm = personalize(km, lm, user)
+        decoders = {
+            "base": ViterbiDecoder(language_model=lm, keyboard_model=km),
+            "overlay vacío": ViterbiDecoder(language_model=empty_lm, keyboard_model=empty_km),
+            f"usuario ({len(user)} palabras)": ViterbiDecoder(
+                language_model=user_lm,
+                keyboard_model=user_km,
+            ),
+        }
+
+        baseline = None
+        print(f"{'modelos':>24} | {'ms/frase':>8} | {'extra':>6}")
+        for name, decoder in decoders.items():
+            ms = time_solve(decoder, noisy)
+            baseline = baseline or ms
+            print(f"{name:>24} | {ms:>8.3f} | {ms / baseline - 1:>6.1%}")
+
+        print(f"\nactualización con log: {update_us:.1f} µs")
+        print(f"compactación ({n_updates:,} actualizaciones): {compact_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
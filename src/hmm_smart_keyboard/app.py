@@ -3,6 +3,7 @@ from wordfreq import top_n_list
 from hmm_smart_keyboard.keyboard_model import KeyboardModel
 from hmm_smart_keyboard.language_model import LanguageModel
 from hmm_smart_keyboard.viterbi_decoder import ViterbiDecoder
+from hmm_smart_keyboard.vocabulary import align_vocabularies
 
 
 def main():
@@ -10,10 +11,16 @@ def main():
     vocab = top_n_list("es", 20000)
     km = KeyboardModel(vocab)
     lm = LanguageModel()  # usa data/P_matrix_transicion.json
+    vocabulary = align_vocabularies(km, lm)  # IDs enteros compartidos entre ambos modelos
 
     decoder = ViterbiDecoder(language_model=lm, keyboard_model=km)
 
     print("=== HMM Smart Keyboard ===")
+    coverage = vocabulary.coverage
+    print(
+        f"Vocabulario: {coverage['total_words']:,} palabras; "
+        f"el LM conoce el {coverage['keyboard_coverage']:.1%} de los candidatos.",
+    )
     print("Escribe una frase con errores y la corregimos.")
     print("Escribe 'salir' para terminar.\n")
 
@@ -29,10 +36,10 @@ def main():
 
         print("\n--- Resultado ---")
         print("Original:  ", sentence)
-        print("Corregida: ", result["corrected_text"])
-        print("Score:     ", result["best_score"])
+        print("Corregida: ", result.corrected_text)
+        print("Score:     ", result.best_score)
 
-        audit = result["audit_data"]
+        audit = result.audit_data
 
         # Compatibilidad: `audit` puede ser un dict (caso single-word)
         # o una lista con una entrada por palabra (nuevo comportamiento).
@@ -0,0 +1,182 @@
+"""
+Caché precalculada de candidatos para los errores más frecuentes.
+
+Un pase offline toma las N palabras sucias más vistas en los logs, calcula
+su lista completa de candidatos con su emisión y la guarda en un .npz
+compacto (arrays planos de cadenas, offsets y float32). KeyboardModel
+responde esas palabras con una sola búsqueda en un dict y puntúa en vivo
+todo lo demás.
+
+La caché lleva la versión del artefacto (vocabulario + distribución) con la
+que se construyó; si el modelo cambia, KeyboardModel la rechaza.
+"""
+
+import argparse
+import threading
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+from wordfreq import top_n_list
+
+from hmm_smart_keyboard.keyboard_model import KeyboardModel
+from hmm_smart_keyboard.utils.text_processing import tokenize
+
+DEFAULT_TOP_N = 10000
+
+
+class CandidateCache:
+    """Candidatos [(palabra, emisión)] por palabra sucia, con contadores de uso."""
+
+    def __init__(self, entries, version: str, layout: str, limit: int):
+        self.entries: dict[str, list[tuple[str, float]]] = entries
+        self.version = version
+        self.layout = layout
+        self.limit = limit
+        self.hits = 0
+        self.misses = 0
+        # Solo protege los contadores: `entries` no cambia después de construir
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, dirty_word: str):
+        """Lista de candidatos de `dirty_word` o None si no está precalculada."""
+        found = self.entries.get(dirty_word)
+        with self._lock:
+            if found is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return found
+
+    def report(self) -> dict:
+        """Resumen de aciertos para monitorizar la utilidad de la caché."""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "version": self.version,
+            "layout": self.layout,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def __getstate__(self):
+        # El lock no se puede serializar (el KeyboardModel viaja a otros procesos)
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def save(self, path: str | Path) -> None:
+        """Guarda la caché como arrays planos (sin pickle)."""
+        keys = list(self.entries)
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        words = []
+        scores = []
+        for i, key in enumerate(keys):
+            candidates = self.entries[key]
+            offsets[i + 1] = offsets[i] + len(candidates)
+            words.extend(w for w, _ in candidates)
+            scores.extend(s for _, s in candidates)
+
+        np.savez_compressed(
+            path,
+            keys=np.array(keys, dtype=str),
+            offsets=offsets,
+            words=np.array(words, dtype=str),
+            scores=np.array(scores, dtype=np.float32),
+            meta=np.array([self.version, self.layout, str(self.limit)]),
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "CandidateCache":
+        with np.load(path) as data:
+            keys = data["keys"].tolist()
+            offsets = data["offsets"].tolist()
+            words = data["words"].tolist()
+            scores = data["scores"].tolist()
+            version, layout, limit = data["meta"].tolist()
+
+        entries = {
+            key: list(zip(
+                words[offsets[i]:offsets[i + 1]],
+                scores[offsets[i]:offsets[i + 1]],
+                strict=True,
+            ))
+            for i, key in enumerate(keys)
+        }
+        return cls(entries, version, layout, int(limit))
+
+
+def count_dirty_tokens(paths: Iterable[str | Path]) -> Counter:
+    """
+    Cuenta las palabras tecleadas en los logs.
+
+    Si una línea tiene tabuladores (formato de confusion_model) solo se usa
+    la primera columna, que es lo que el usuario tecleó.
+    """
+    counts = Counter()
+    for path in paths:
+        with Path(path).open("r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                counts.update(tokenize(line.split("\t", 1)[0]))
+    return counts
+
+
+def build_candidate_cache(
+    keyboard_model,
+    token_counts: Counter,
+    top_n: int = DEFAULT_TOP_N,
+    limit: int = 20,
+    layout=None,
+) -> CandidateCache:
+    """Precalcula los candidatos de las `top_n` palabras sucias más frecuentes."""
+    compiled = keyboard_model.resolve_layout(layout)
+    entries = {
+        word: keyboard_model.get_scored_candidates(
+            word,
+            limit,
+            compiled,
+            use_cache=False,
+        )
+        for word, _ in token_counts.most_common(top_n)
+    }
+    return CandidateCache(
+        entries,
+        keyboard_model.artifact_version(compiled),
+        compiled.name,
+        limit,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precalcula candidatos para las palabras sucias más frecuentes.",
+    )
+    parser.add_argument("logs", nargs="+", help="archivos de texto tecleado")
+    parser.add_argument("-o", "--output", required=True, help="archivo .npz de salida")
+    parser.add_argument("--top-n", type=int, default=DEFAULT_TOP_N)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    km = KeyboardModel(top_n_list("es", 20000))
+    counts = count_dirty_tokens(args.logs)
+    cache = build_candidate_cache(km, counts, args.top_n, args.limit)
+    cache.save(args.output)
+
+    covered = sum(counts[w] for w in cache.entries)
+    total = sum(counts.values())
+    print(f"✅ {len(cache):,} palabras precalculadas (versión {cache.version}).")
+    if total:
+        print(f"  - Cobertura esperada del tráfico: {covered / total:.1%}")
+
+
+if __name__ == "__main__":
+    main()
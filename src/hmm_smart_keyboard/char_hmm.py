@@ -0,0 +1,247 @@
+"""
+HMM a nivel de letras, como lo describe el marco teórico del README.
+
+- Estados ocultos: la letra que se quería escribir.
+- Evidencia: la tecla que se detectó.
+- Transiciones: bigramas de letras de un corpus de palabras (la
+  probabilidad de que 'u' siga a 'q'), más la probabilidad de empezar y de
+  terminar una palabra en cada letra.
+- Sensor: acertar la tecla con probabilidad hit_prob; los fallos se
+  reparten entre las demás teclas con la gaussiana de la distribución
+  (keyboard_layouts).
+
+Todas las tablas son matrices densas (alfabeto x alfabeto) de NumPy, así
+que cada paso de Viterbi o de forward-backward es una sola operación
+vectorizada sobre el alfabeto. No necesita diccionario: sirve de respaldo
+para palabras que ningún candidato explica (nombres, términos técnicos).
+"""
+
+from collections.abc import Iterable, Mapping
+
+import numpy as np
+import numpy.typing as npt
+
+from hmm_smart_keyboard.keyboard_layouts import DEFAULT_LAYOUT, compile_layout
+
+# Conteo que se suma a cada bigrama de letras (suavizado de Laplace)
+DEFAULT_SMOOTHING = 0.1
+
+# Probabilidad de pulsar justo la tecla que se quería
+DEFAULT_HIT_PROB = 0.95
+
+# Dispersión de los fallos entre teclas. Es más estrecha que la del modelo
+# de palabras: aquí no hay diccionario que descarte letras imposibles
+DEFAULT_CHAR_SIGMA = 0.7
+
+
+class CharHMM:
+    """HMM de letras con transiciones de un corpus y emisiones del teclado."""
+
+    def __init__(
+        self,
+        alphabet: tuple[str, ...],
+        log_start: npt.NDArray[np.float64],
+        log_trans: npt.NDArray[np.float64],
+        log_end: npt.NDArray[np.float64],
+        log_emission: npt.NDArray[np.float64],
+    ):
+        """
+        :param alphabet: letras (estados y también teclas observables)
+        :param log_start: (A,) log P(primera letra)
+        :param log_trans: (A, A) log P(letra siguiente | letra)
+        :param log_end: (A,) log P(fin de palabra | última letra)
+        :param log_emission: (A, A) log P(tecla detectada | letra)
+        """
+        n = len(alphabet)
+        self.alphabet = alphabet
+        self.char_index = {c: i for i, c in enumerate(alphabet)}
+        self.log_start = log_start
+        self.log_trans = log_trans
+        self.log_end = log_end
+
+        # Columna extra (índice A) para teclas fuera del alfabeto: emisión
+        # uniforme, así no aportan evidencia y se dejan tal cual
+        self.log_emission = np.zeros((n, n + 1))
+        self.log_emission[:, :n] = log_emission
+
+        # Las mismas tablas en probabilidad, para forward-backward
+        self.start = np.exp(log_start)
+        self.trans = np.exp(log_trans)
+        self.end = np.exp(log_end)
+
+    @classmethod
+    def from_words(
+        cls,
+        words: Iterable[str],
+        counts: Mapping[str, float] | None = None,
+        *,
+        layout: str = DEFAULT_LAYOUT,
+        sigma: float = DEFAULT_CHAR_SIGMA,
+        hit_prob: float = DEFAULT_HIT_PROB,
+        smoothing: float = DEFAULT_SMOOTHING,
+    ) -> "CharHMM":
+        """
+        Estima el modelo a partir de un corpus de palabras.
+
+        :param words: palabras del corpus (p. ej. el vocabulario del teclado)
+        :param counts: palabra -> frecuencia; si es None cada palabra cuenta 1
+        :param layout: distribución de teclado de la que salen las emisiones
+        :param sigma: dispersión de los fallos (en anchos de tecla)
+        :param hit_prob: probabilidad de pulsar la tecla correcta
+        :param smoothing: conteo que se suma a cada transición posible
+        """
+        compiled = compile_layout(layout, sigma)
+        keys = [i for i, k in enumerate(compiled.keys) if k.isalpha()]
+        alphabet = tuple(compiled.keys[i] for i in keys)
+        index = {c: i for i, c in enumerate(alphabet)}
+        n = len(alphabet)
+
+        corpus = []
+        for word in words:
+            letters = [index.get(c) for c in word.lower()]
+            if letters and None not in letters:
+                corpus.append((letters, 1.0 if counts is None else counts.get(word, 0.0)))
+
+        # Frecuencias relativas (wordfreq) o conteos: se reescalan para que
+        # la palabra media pese 1 y el suavizado signifique lo mismo
+        total_weight = sum(weight for _, weight in corpus)
+        scale = len(corpus) / total_weight if total_weight > 0 else 1.0
+
+        start = np.full(n, smoothing)
+        trans = np.full((n, n), smoothing)
+        end = np.full(n, smoothing)
+        for letters, weight in corpus:
+            start[letters[0]] += weight * scale
+            end[letters[-1]] += weight * scale
+            np.add.at(trans, (letters[:-1], letters[1:]), weight * scale)
+
+        # La probabilidad de terminar compite con la de seguir escribiendo
+        total = trans.sum(axis=1) + end
+        log_trans = np.log(trans) - np.log(total)[:, None]
+        log_end = np.log(end) - np.log(total)
+        log_start = np.log(start) - np.log(start.sum())
+
+        # sub_log_prob[i, j] = log P(teclear i | se quería j). Las vocales con
+        # tilde comparten coordenadas con la vocal sin tilde, así que acertar
+        # la tecla tiene su propia probabilidad y la gaussiana solo reparte
+        # los fallos entre las demás teclas
+        miss = compiled.sub_log_prob[np.ix_(keys, keys)].T.copy()
+        np.fill_diagonal(miss, -np.inf)
+        miss -= np.logaddexp.reduce(miss, axis=1, keepdims=True)
+        log_emission = np.log1p(-hit_prob) + miss
+        np.fill_diagonal(log_emission, np.log(hit_prob))
+
+        return cls(alphabet, log_start, log_trans, log_end, log_emission)
+
+    def encode(self, word: str) -> npt.NDArray[np.intp]:
+        """Índice de cada tecla; len(alphabet) para las que no son letras."""
+        unknown = len(self.alphabet)
+        return np.array([self.char_index.get(c, unknown) for c in word.lower()], dtype=np.intp)
+
+    def viterbi(self, word: str) -> tuple[str, float]:
+        """
+        Secuencia de letras más probable para las teclas de `word`.
+
+        :return: (palabra corregida en minúsculas, log P(letras, teclas));
+                 los caracteres que no son letras se copian sin cambios
+        """
+        if not word:
+            return "", 0.0
+
+        observed = self.encode(word)
+        emissions = self.log_emission[:, observed].T  # (T, A)
+        n_steps, n_states = emissions.shape
+        columns = np.arange(n_states)
+
+        backpointers = np.empty((n_steps, n_states), dtype=np.intp)
+        delta = self.log_start + emissions[0]
+        for t in range(1, n_steps):
+            scores = delta[:, None] + self.log_trans
+            backpointers[t] = scores.argmax(axis=0)
+            delta = scores[backpointers[t], columns] + emissions[t]
+        delta += self.log_end
+
+        state = int(delta.argmax())
+        best_score = float(delta[state])
+        states = [state]
+        for t in range(n_steps - 1, 0, -1):
+            state = int(backpointers[t, state])
+            states.append(state)
+        states.reverse()
+
+        raw = word.lower()
+        unknown = len(self.alphabet)
+        letters = [
+            raw[t] if observed[t] == unknown else self.alphabet[s]
+            for t, s in enumerate(states)
+        ]
+        return "".join(letters), best_score
+
+    def forward_backward(self, word: str) -> tuple[npt.NDArray[np.float64], float]:
+        """
+        Probabilidad posterior de cada letra en cada posición.
+
+        Forward y backward van en probabilidad con un factor de escala por
+        paso (un producto matriz-vector cada uno), no en log-espacio.
+
+        :return: (posteriores (T, A) con filas que suman 1, log P(teclas))
+        """
+        if not word:
+            return np.zeros((0, len(self.alphabet))), 0.0
+
+        log_em = self.log_emission[:, self.encode(word)].T
+        offsets = log_em.max(axis=1)
+        emissions = np.exp(log_em - offsets[:, None])
+        n_steps = emissions.shape[0]
+
+        forward = np.empty_like(emissions)
+        scales = np.empty(n_steps)
+        current = self.start * emissions[0]
+        for t in range(n_steps):
+            if t:
+                current = (forward[t - 1] @ self.trans) * emissions[t]
+            scales[t] = current.sum()
+            forward[t] = current / scales[t]
+
+        backward = np.empty_like(emissions)
+        backward[-1] = self.end
+        for t in range(n_steps - 2, -1, -1):
+            backward[t] = self.trans @ (emissions[t + 1] * backward[t + 1]) / scales[t + 1]
+
+        posteriors = forward * backward
+        total_end = float(posteriors[-1].sum())
+        posteriors /= posteriors.sum(axis=1, keepdims=True)
+        log_likelihood = float(np.log(scales).sum() + offsets.sum() + np.log(total_end))
+        return posteriors, log_likelihood
+
+    def predict_next(self, prefix: str) -> npt.NDArray[np.float64]:
+        """
+        P(siguiente letra | teclas de `prefix`), el paso de predicción del HMM.
+
+        :return: (A,) distribución sobre alphabet (sin contar el fin de palabra)
+        """
+        if not prefix:
+            return self.start.copy()
+
+        log_em = self.log_emission[:, self.encode(prefix)].T
+        current = self.start * np.exp(log_em[0] - log_em[0].max())
+        current /= current.sum()
+        for t in range(1, len(log_em)):
+            current = (current @ self.trans) * np.exp(log_em[t] - log_em[t].max())
+            current /= current.sum()
+        following = current @ self.trans
+        return following / following.sum()
+
+
+if __name__ == "__main__":
+    from wordfreq import top_n_list
+
+    model = CharHMM.from_words(top_n_list("es", 20000))
+
+    for dirty in ("qieso", "twcnología", "kubernetes"):
+        corrected, score = model.viterbi(dirty)
+        posteriors, _ = model.forward_backward(dirty)
+        print(f"{dirty} -> {corrected} (score {score:.2f}, confianza {posteriors.max(axis=1).min():.2f})")
+
+    following = model.predict_next("q")
+    print("Después de 'q':", model.alphabet[int(following.argmax())])
@@ -0,0 +1,222 @@
+"""
+Entrenamiento de la matriz de confusión del teclado a partir de logs.
+
+Los logs son archivos de texto con un par por línea, separado por tabulador:
+
+    imqgen<TAB>imagen
+
+El pipeline recorre los pares en streaming, alinea cada uno a nivel de
+carácter y acumula conteos de sustitución, inserción y borrado en arrays de
+NumPy de tamaño fijo (memoria acotada sin importar cuántos pares haya).
+Al final exporta tablas de log-probabilidad suavizadas que KeyboardModel
+puede cargar en lugar de la fórmula de distancia (ver
+KeyboardModel.load_emission_tables).
+"""
+
+import argparse
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from hmm_smart_keyboard.keyboard_layouts import DEFAULT_LAYOUT, compile_layout
+
+# Cantidad de índices que se acumulan antes de volcarlos a los arrays
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+DEFAULT_SMOOTHING = 0.5
+
+
+def iter_typing_pairs(paths: Iterable[str | Path]) -> Iterator[tuple[str, str]]:
+    """Produce pares (tecleado, intención) en minúsculas, línea por línea."""
+    for path in paths:
+        with Path(path).open("r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) < 2 or not parts[0] or not parts[1]:  # noqa: PLR2004
+                    continue
+                yield parts[0].strip().lower(), parts[1].strip().lower()
+
+
+def align_pair(typed: str, intended: str) -> list[tuple[str | None, str | None]]:
+    """
+    Alinea dos palabras con distancia de Levenshtein (coste unitario).
+
+    :return: operaciones (tecleado, intención); None en tecleado es un
+             borrado y None en intención es una inserción
+    """
+    # Camino rápido: sin inserciones ni borrados posibles
+    if len(typed) == len(intended):
+        return list(zip(typed, intended, strict=True))
+
+    rows, cols = len(typed) + 1, len(intended) + 1
+    dist = [[0] * cols for _ in range(rows)]
+    for i in range(rows):
+        dist[i][0] = i
+    for j in range(cols):
+        dist[0][j] = j
+
+    for i in range(1, rows):
+        for j in range(1, cols):
+            cost = 0 if typed[i - 1] == intended[j - 1] else 1
+            dist[i][j] = min(
+                dist[i - 1][j - 1] + cost,
+                dist[i - 1][j] + 1,
+                dist[i][j - 1] + 1,
+            )
+
+    # Backtrace prefiriendo la sustitución en caso de empate
+    ops = []
+    i, j = rows - 1, cols - 1
+    while i > 0 or j > 0:
+        if i > 0 and j > 0:
+            cost = 0 if typed[i - 1] == intended[j - 1] else 1
+            if dist[i][j] == dist[i - 1][j - 1] + cost:
+                ops.append((typed[i - 1], intended[j - 1]))
+                i, j = i - 1, j - 1
+                continue
+        if i > 0 and dist[i][j] == dist[i - 1][j] + 1:
+            ops.append((typed[i - 1], None))
+            i -= 1
+        else:
+            ops.append((None, intended[j - 1]))
+            j -= 1
+
+    ops.reverse()
+    return ops
+
+
+class ConfusionCounts:
+    """
+    Conteos de errores por tecla sobre el alfabeto de una distribución.
+
+    - sub[i, j]: veces que se tecleó keys[i] queriendo keys[j]
+    - ins[i]: veces que se tecleó keys[i] de más
+    - dele[j]: veces que se omitió keys[j]
+
+    El último índice de cada eje agrupa los caracteres desconocidos.
+    """
+
+    def __init__(self, keys: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.keys = tuple(keys)
+        self.char_index = {k: i for i, k in enumerate(self.keys)}
+        self.unknown = len(self.keys)
+        size = self.unknown + 1
+
+        self.sub = np.zeros((size, size), dtype=np.int64)
+        self.ins = np.zeros(size, dtype=np.int64)
+        self.dele = np.zeros(size, dtype=np.int64)
+        self.n_pairs = 0
+
+        self.chunk_size = chunk_size
+        self._sub_buf: list[int] = []
+        self._ins_buf: list[int] = []
+        self._del_buf: list[int] = []
+
+    def add_pair(self, typed: str, intended: str) -> None:
+        """Alinea un par y acumula sus operaciones."""
+        index = self.char_index.get
+        unknown = self.unknown
+        size = unknown + 1
+
+        for typed_char, intended_char in align_pair(typed, intended):
+            if typed_char is None:
+                self._del_buf.append(index(intended_char, unknown))
+            elif intended_char is None:
+                self._ins_buf.append(index(typed_char, unknown))
+            else:
+                self._sub_buf.append(
+                    index(typed_char, unknown) * size + index(intended_char, unknown),
+                )
+
+        self.n_pairs += 1
+        if len(self._sub_buf) >= self.chunk_size:
+            self.flush()
+
+    def add_pairs(self, pairs: Iterable[tuple[str, str]]) -> None:
+        for n, (typed, intended) in enumerate(pairs, start=1):
+            self.add_pair(typed, intended)
+            if n % 1000000 == 0:
+                print(f"  -> {n // 1000000} millones de pares procesados.")
+        self.flush()
+
+    def flush(self) -> None:
+        """Vuelca los índices pendientes a los arrays de conteo."""
+        size = self.unknown + 1
+        if self._sub_buf:
+            flat = np.bincount(np.asarray(self._sub_buf), minlength=size * size)
+            self.sub += flat.reshape(size, size)
+            self._sub_buf.clear()
+        if self._ins_buf:
+            self.ins += np.bincount(np.asarray(self._ins_buf), minlength=size)
+            self._ins_buf.clear()
+        if self._del_buf:
+            self.dele += np.bincount(np.asarray(self._del_buf), minlength=size)
+            self._del_buf.clear()
+
+    def to_log_prob_tables(
+        self,
+        smoothing: float = DEFAULT_SMOOTHING,
+    ) -> dict[str, npt.NDArray]:
+        """
+        Tablas de log-probabilidad con suavizado aditivo.
+
+        - sub_log_prob[i, j] = log P(teclear keys[i] | se quería keys[j])
+        - del_log_prob[j] = log P(omitir keys[j] | se quería keys[j])
+        - ins_log_prob[i] = log P(teclear keys[i] de más)
+        """
+        self.flush()
+        n = self.unknown
+        sub = self.sub[:n, :n].astype(np.float64) + smoothing
+        dele = self.dele[:n].astype(np.float64) + smoothing
+        ins = self.ins[:n].astype(np.float64) + smoothing
+
+        # Cada letra que se quería termina tecleada como alguna tecla o borrada
+        intended_totals = sub.sum(axis=0) + dele
+        typed_total = self.sub.sum() + self.ins.sum() + smoothing * n
+
+        return {
+            "keys": np.array(self.keys),
+            "sub_log_prob": np.log(sub / intended_totals[None, :]),
+            "del_log_prob": np.log(dele / intended_totals),
+            "ins_log_prob": np.log(ins / typed_total),
+        }
+
+    def save(self, path: str | Path, smoothing: float = DEFAULT_SMOOTHING) -> None:
+        """Exporta las tablas suavizadas en un .npz comprimido."""
+        np.savez_compressed(path, **self.to_log_prob_tables(smoothing))
+
+
+def train(
+    paths: Iterable[str | Path],
+    layout: str = DEFAULT_LAYOUT,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ConfusionCounts:
+    """Entrena los conteos de confusión de `layout` a partir de archivos de log."""
+    counts = ConfusionCounts(compile_layout(layout).keys, chunk_size)
+    counts.add_pairs(iter_typing_pairs(paths))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Entrena la matriz de confusión del teclado desde logs.",
+    )
+    parser.add_argument("logs", nargs="+", help="archivos tecleado<TAB>intención")
+    parser.add_argument("-o", "--output", required=True, help="archivo .npz de salida")
+    parser.add_argument("--layout", default=DEFAULT_LAYOUT)
+    parser.add_argument("--smoothing", type=float, default=DEFAULT_SMOOTHING)
+    args = parser.parse_args()
+
+    counts = train(args.logs, args.layout)
+    if counts.n_pairs == 0:
+        print("❌ Error: No se encontraron pares en los logs.")
+        return
+
+    counts.save(args.output, args.smoothing)
+    print(f"✅ {counts.n_pairs:,} pares procesados. Tablas guardadas en: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Lectura en streaming de corpus de texto para entrenar el LanguageModel.
+
+Acepta un archivo o un directorio (se recorre recursivamente, en orden) de
+texto plano o comprimido: .gz, .bz2, .xz/.lzma y .zst/.zstd. Zstandard
+usa compression.zstd (Python 3.14+) o, si no está, el paquete zstandard.
+
+La descompresión corre en un hilo aparte (PrefetchReader) que lee bloques
+grandes y los deja en una cola acotada; gzip, bz2, lzma y zstd sueltan el
+GIL mientras descomprimen, así que el bucle de conteo casi nunca espera a
+la E/S. Los tokens salen por lotes (uno por bloque) y el conteo trabaja
+con IDs enteros y NumPy en lugar de un bucle por token.
+"""
+
+import bz2
+import codecs
+import contextlib
+import gzip
+import io
+import lzma
+import queue
+import re
+import threading
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+
+# Tamaño de cada lectura del hilo de descompresión
+CHUNK_SIZE = 1 << 20
+
+# Bloques que el hilo puede adelantar antes de esperar al consumidor
+PREFETCH_DEPTH = 8
+
+# Claves de bigrama pendientes antes de fundirlas con los conteos acumulados
+MERGE_EVERY = 1 << 22
+
+# Palabras: letras Unicode (sin dígitos ni "_"), así sirve para cualquier idioma
+_WORD_RE = re.compile(r"[^\W\d_]+")
+
+_OPENERS = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+    ".lzma": lzma.open,
+}
+_ZSTD_SUFFIXES = {".zst", ".zstd"}
+
+
+def _open_zstd(path: Path) -> BinaryIO:
+    try:
+        from compression import zstd  # noqa: PLC0415 (Python 3.14+)
+    except ImportError:
+        pass
+    else:
+        return zstd.open(path, "rb")
+
+    try:
+        import zstandard  # noqa: PLC0415
+    except ImportError as e:
+        msg = f"Leer {path.name} necesita Python 3.14+ o el paquete zstandard"
+        raise ImportError(msg) from e
+    return zstandard.ZstdDecompressor().stream_reader(path.open("rb"), closefd=True)
+
+
+def open_corpus(path: Path | str) -> BinaryIO:
+    """Abre `path` en binario, descomprimiendo según su extensión."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix in _ZSTD_SUFFIXES:
+        return _open_zstd(path)
+    opener = _OPENERS.get(suffix)
+    if opener is not None:
+        return opener(path, "rb")
+    return path.open("rb")
+
+
+def iter_corpus_files(source: Path | str) -> list[Path]:
+    """`source` si es un archivo; si es un directorio, sus archivos no ocultos en orden."""
+    source = Path(source)
+    if not source.is_dir():
+        return [source]
+    return sorted(
+        path
+        for path in source.rglob("*")
+        if path.is_file() and not any(part.startswith(".") for part in path.relative_to(source).parts)
+    )
+
+
+class PrefetchReader(io.RawIOBase):
+    """
+    Archivo de solo lectura que descomprime por adelantado en otro hilo.
+
+    Se usa como cualquier archivo binario (read, readinto; mwxml lo acepta)
+    o, sin copias intermedias, con chunks(). Un error del hilo se relanza en
+    la siguiente lectura.
+    """
+
+    def __init__(self, raw: BinaryIO, chunk_size: int = CHUNK_SIZE, depth: int = PREFETCH_DEPTH):
+        super().__init__()
+        self._raw = raw
+        self._chunk_size = chunk_size
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._pending = memoryview(b"")
+        self._eof = False
+        self._thread = threading.Thread(target=self._fill, name="corpus-prefetch", daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        # Con timeout, para poder salir si close() llega con la cola llena
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            return
+
+    def _fill(self):
+        try:
+            while not self._stop.is_set():
+                chunk = self._raw.read(self._chunk_size)
+                self._put(chunk)
+                if not chunk:
+                    return
+        except Exception as e:  # noqa: BLE001 (se relanza en el consumidor)
+            self._put(e)
+
+    def _next_chunk(self) -> bytes:
+        if self._eof:
+            return b""
+        item = self._queue.get()
+        if isinstance(item, Exception):
+            self._eof = True
+            raise item
+        if not item:
+            self._eof = True
+        return item
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self._pending:
+            self._pending = memoryview(self._next_chunk())
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def chunks(self) -> Iterator[bytes]:
+        """Los bloques tal como los leyó el hilo, hasta el final del archivo."""
+        if self._pending:
+            yield bytes(self._pending)
+            self._pending = memoryview(b"")
+        while chunk := self._next_chunk():
+            yield chunk
+
+    def close(self):
+        if self.closed:
+            return
+        self._stop.set()
+        # Vaciar la cola desbloquea al hilo si estaba esperando sitio
+        while self._thread.is_alive():
+            with contextlib.suppress(queue.Empty):
+                self._queue.get(timeout=0.1)
+        self._raw.close()
+        super().close()
+
+
+def read_chunks(path: Path | str, chunk_size: int = CHUNK_SIZE, *, prefetch: bool = True) -> Iterator[bytes]:
+    """Bloques descomprimidos de `path`; con prefetch=False se lee en el mismo hilo."""
+    raw = open_corpus(path)
+    if not prefetch:
+        with raw:
+            while chunk := raw.read(chunk_size):
+                yield chunk
+        return
+
+    with PrefetchReader(raw, chunk_size) as reader:
+        yield from reader.chunks()
+
+
+def text_token_batches(path: Path | str, chunk_size: int = CHUNK_SIZE, *, prefetch: bool = True) -> Iterator[list[str]]:
+    """
+    Tokens en minúsculas de un archivo de texto, un lote por bloque leído.
+
+    Un bloque puede cortar una palabra o un carácter UTF-8: el decodificador
+    incremental guarda los bytes sueltos y la palabra cortada pasa al bloque
+    siguiente.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    tail = ""
+    for chunk in read_chunks(path, chunk_size, prefetch=prefetch):
+        text = tail + decoder.decode(chunk)
+        cut = max(text.rfind(" "), text.rfind("\n"))
+        if cut < 0:
+            tail = text
+            continue
+        tail = text[cut + 1:]
+        yield _WORD_RE.findall(text[:cut].lower())
+
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield _WORD_RE.findall(tail.lower())
+
+
+def count_token_batches(batches: Iterable[list[str]]) -> tuple[Counter, Counter]:
+    """
+    Como language_model.count_frequencies, pero por lotes de tokens.
+
+    Cada lote se pasa a IDs enteros y sus bigramas se cuentan como claves
+    prev_id * 2**32 + id con np.unique; los conteos parciales se funden de
+    vez en cuando y solo al final se vuelven a pasar a strings. El bigrama
+    entre el último token de un lote y el primero del siguiente también se
+    cuenta, igual que con un único flujo de tokens.
+    """
+    print("Iniciando el conteo de frecuencias (esto puede tardar horas)...")
+    ids: dict[str, int] = {}
+    unigrams = np.zeros(0, dtype=np.int64)
+    keys = np.zeros(0, dtype=np.int64)
+    counts = np.zeros(0, dtype=np.int64)
+    pending_keys = []
+    pending_counts = []
+    n_pending = 0
+    prev_id = -1
+    total_tokens = 0
+
+    for batch in batches:
+        if not batch:
+            continue
+        encoded = np.array([ids.setdefault(w, len(ids)) for w in batch], dtype=np.int64)
+        batch_unigrams = np.bincount(encoded)
+        if len(batch_unigrams) > len(unigrams):
+            unigrams = np.pad(unigrams, (0, len(batch_unigrams) - len(unigrams)))
+        unigrams[:len(batch_unigrams)] += batch_unigrams
+
+        sequence = encoded if prev_id < 0 else np.concatenate(([prev_id], encoded))
+        prev_id = int(encoded[-1])
+        batch_keys, batch_counts = np.unique((sequence[:-1] << 32) | sequence[1:], return_counts=True)
+        pending_keys.append(batch_keys)
+        pending_counts.append(batch_counts)
+        n_pending += len(batch_keys)
+        if n_pending > MERGE_EVERY:
+            keys, counts = _merge_counts([keys, *pending_keys], [counts, *pending_counts])
+            pending_keys, pending_counts, n_pending = [], [], 0
+
+        millions = total_tokens // 1000000
+        total_tokens += len(batch)
+        if total_tokens // 1000000 > millions:
+            print(f"  -> {total_tokens // 1000000} millones de tokens procesados.")
+
+    keys, counts = _merge_counts([keys, *pending_keys], [counts, *pending_counts])
+    words = list(ids)
+    unigram_counts = Counter(dict(zip(words, unigrams.tolist(), strict=True)))
+    bigram_counts = Counter({
+        (words[k >> 32], words[k & 0xFFFFFFFF]): c
+        for k, c in zip(keys.tolist(), counts.tolist(), strict=True)
+    })
+    return unigram_counts, bigram_counts
+
+
+def _merge_counts(keys, counts):
+    keys, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+    return keys, np.bincount(inverse, weights=np.concatenate(counts)).astype(np.int64)
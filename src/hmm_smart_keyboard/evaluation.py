@@ -0,0 +1,242 @@
+"""
+Evaluación exactitud vs. latencia y barrido de hiperparámetros.
+
+Sobre un corpus etiquetado (frase con errores<TAB>frase correcta, un par por
+línea) se mide, para cada configuración de
+alpha, beta, sigma, candidate_limit, unk_log_prob y prior_weight:
+
+- WER: distancia de edición entre palabras / palabras de referencia
+- exactitud por frase
+- latencia media y p99 de solve
+
+Las configuraciones se reparten entre procesos (cada uno recibe el
+decodificador una sola vez) y al final se extrae la frontera de Pareto
+entre WER y latencia p99: las configuraciones que ninguna otra mejora en
+ambas cosas a la vez.
+"""
+
+import argparse
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import ujson as json
+from wordfreq import top_n_list
+
+from hmm_smart_keyboard.confusion_model import iter_typing_pairs
+from hmm_smart_keyboard.keyboard_model import KeyboardModel
+from hmm_smart_keyboard.language_model import LanguageModel
+from hmm_smart_keyboard.utils.text_processing import TOKENIZER
+from hmm_smart_keyboard.viterbi_decoder import ViterbiDecoder
+from hmm_smart_keyboard.vocabulary import align_vocabularies
+
+# Valores a barrer por defecto para cada hiperparámetro
+DEFAULT_GRID = {
+    "alpha": [0.25, 0.5, 1.0],
+    "beta": [1.0, 2.0, 4.0],
+    "sigma": [1.5, 2.0, 2.5],
+    "candidate_limit": [5, 10, 20],
+    "unk_log_prob": [-20.0, -15.0, -10.0],
+    "prior_weight": [0.0, 0.1, 0.5],
+}
+
+LATENCY_PERCENTILE = 99
+
+# Claves que evaluate agrega a cada resultado (el resto son hiperparámetros)
+METRICS = ("wer", "sentence_accuracy", "mean_ms", "p99_ms")
+
+
+def word_errors(hypothesis: list[str], reference: list[str]) -> int:
+    """Sustituciones + inserciones + borrados entre dos listas de palabras."""
+    prev = list(range(len(reference) + 1))
+    for i, hyp_word in enumerate(hypothesis, start=1):
+        cur = [i]
+        for j, ref_word in enumerate(reference, start=1):
+            cur.append(min(
+                prev[j - 1] + (hyp_word != ref_word),
+                prev[j] + 1,
+                cur[j - 1] + 1,
+            ))
+        prev = cur
+    return prev[-1]
+
+
+def apply_config(decoder: ViterbiDecoder, config: dict) -> None:
+    """Aplica al decodificador (y a sus modelos) los valores de `config`."""
+    if "alpha" in config:
+        decoder.alpha = config["alpha"]
+    if "beta" in config:
+        decoder.beta = config["beta"]
+    if "candidate_limit" in config:
+        decoder.candidate_limit = config["candidate_limit"]
+    if "unk_log_prob" in config:
+        decoder.lm.unk_log_prob = config["unk_log_prob"]
+    if "sigma" in config:
+        decoder.km.set_layout(decoder.km.layout.name, config["sigma"])
+    if "prior_weight" in config:
+        decoder.km.prior_weight = config["prior_weight"]
+
+
+def evaluate(decoder: ViterbiDecoder, corpus: list[tuple[str, str]]) -> dict:
+    """
+    Decodifica cada frase con errores y la compara con su referencia.
+
+    :param corpus: pares (frase con errores, frase correcta)
+    :return: wer, sentence_accuracy, mean_ms y p99_ms
+    """
+    errors = 0
+    n_words = 0
+    exact = 0
+    latencies = []
+
+    for noisy, clean in corpus:
+        start = time.perf_counter()
+        result = decoder.solve(noisy, audit=False)
+        latencies.append(time.perf_counter() - start)
+
+        # La referencia se tokeniza igual que solve: sin puntuación, en minúsculas
+        reference = [token.text.lower() for token in TOKENIZER.words(clean)]
+        hypothesis = list(result.corrected_words)
+        errors += word_errors(hypothesis, reference)
+        n_words += len(reference)
+        exact += hypothesis == reference
+
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        "wer": errors / n_words if n_words else 0.0,
+        "sentence_accuracy": exact / len(corpus) if corpus else 0.0,
+        "mean_ms": float(latencies_ms.mean()) if corpus else 0.0,
+        "p99_ms": float(np.percentile(latencies_ms, LATENCY_PERCENTILE)) if corpus else 0.0,
+    }
+
+
+def grid_configs(grid: dict[str, list]) -> list[dict]:
+    """Todas las combinaciones de la rejilla."""
+    names = list(grid)
+    return [dict(zip(names, values, strict=True)) for values in itertools.product(*grid.values())]
+
+
+def random_configs(grid: dict[str, list], n: int, seed: int = 0) -> list[dict]:
+    """`n` combinaciones distintas elegidas al azar de la rejilla."""
+    configs = grid_configs(grid)
+    if n >= len(configs):
+        return configs
+    return random.Random(seed).sample(configs, n)
+
+
+def pareto_frontier(results: list[dict], latency_key: str = "p99_ms") -> list[dict]:
+    """
+    Resultados no dominados en (WER, latencia): ordenados de más rápido a más lento.
+
+    Un resultado queda fuera si otro tiene WER y latencia menores o iguales
+    y al menos una de las dos estrictamente menor.
+    """
+    frontier = []
+    best_wer = float("inf")
+    for result in sorted(results, key=lambda r: (r[latency_key], r["wer"])):
+        if result["wer"] < best_wer:
+            frontier.append(result)
+            best_wer = result["wer"]
+    return frontier
+
+
+# --- Evaluación en procesos ---
+
+_worker_state = None
+
+
+def _init_worker(decoder, corpus) -> None:
+    """Recibe el decodificador y el corpus una sola vez por proceso."""
+    global _worker_state  # noqa: PLW0603
+    _worker_state = (decoder, corpus)
+
+
+def _evaluate_config(config: dict) -> dict:
+    decoder, corpus = _worker_state
+    apply_config(decoder, config)
+    return config | evaluate(decoder, corpus)
+
+
+def sweep(
+    decoder: ViterbiDecoder,
+    corpus: list[tuple[str, str]],
+    configs: list[dict],
+    max_workers: int | None = None,
+) -> list[dict]:
+    """
+    Evalúa cada configuración sobre el corpus completo.
+
+    :param max_workers: procesos a usar (None => os.cpu_count()); con 1 se
+                        evalúa en el proceso actual y `decoder` queda con la
+                        última configuración
+    :return: un dict por configuración con sus valores y sus métricas
+    """
+    workers = min(max_workers or os.cpu_count() or 1, len(configs))
+    if workers <= 1:
+        _init_worker(decoder, corpus)
+        return [_evaluate_config(config) for config in configs]
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(decoder, corpus),
+    ) as pool:
+        return list(pool.map(_evaluate_config, configs))
+
+
+def print_results(results: list[dict], frontier: list[dict]) -> None:
+    names = [key for key in results[0] if key not in METRICS]
+    header = " | ".join(f"{name:>15}" for name in names)
+    print(f"{header} | {'WER':>7} | {'frase':>7} | {'media ms':>8} | {'p99 ms':>8} | Pareto")
+    for result in sorted(results, key=lambda r: r["wer"]):
+        values = " | ".join(f"{result[name]!s:>15}" for name in names)
+        print(
+            f"{values} | {result['wer']:>7.2%} | {result['sentence_accuracy']:>7.2%} | "
+            f"{result['mean_ms']:>8.2f} | {result['p99_ms']:>8.2f} | "
+            f"{'*' if result in frontier else ''}",
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Barrido de hiperparámetros: exactitud vs. latencia.",
+    )
+    parser.add_argument("corpus", nargs="+", help="archivos con_errores<TAB>correcta")
+    parser.add_argument("-o", "--output", help="archivo JSON con todos los resultados")
+    parser.add_argument("--random", type=int, help="evaluar solo N configuraciones al azar")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    corpus = list(iter_typing_pairs(args.corpus))
+    if not corpus:
+        print("❌ Error: El corpus etiquetado está vacío.")
+        return
+
+    km = KeyboardModel(top_n_list("es", 20000))
+    lm = LanguageModel()
+    align_vocabularies(km, lm)
+    decoder = ViterbiDecoder(language_model=lm, keyboard_model=km)
+
+    if args.random:
+        configs = random_configs(DEFAULT_GRID, args.random, args.seed)
+    else:
+        configs = grid_configs(DEFAULT_GRID)
+
+    print(f"Evaluando {len(configs)} configuraciones sobre {len(corpus):,} frases...")
+    results = sweep(decoder, corpus, configs, args.workers)
+    frontier = pareto_frontier(results)
+    print_results(results, frontier)
+
+    if args.output:
+        with Path(args.output).open("w", encoding="utf-8") as f:
+            json.dump({"results": results, "pareto": frontier}, f, indent=2)
+        print(f"✅ Resultados guardados en: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Modelos de solo lectura para compartir entre hilos.
+
+KeyboardModel y LanguageModel se construyen una vez y luego solo se leen
+al decodificar. freeze() lo hace explícito: marca sus arrays de NumPy como
+no escribibles (una escritura accidental lanza ValueError en lugar de
+corromper lo que ven otros hilos) y prohíbe reasignar atributos. Así un
+mismo modelo se puede usar desde varios hilos sin locks, también en el
+Python sin GIL (3.13t): el estado de cada decodificación (trellis,
+columnas, puntajes) vive en variables locales de la llamada.
+
+El congelado es superficial: los dicts y listas (KeyboardModel.rank, los
+buckets por longitud, CompiledLayout.lookup, los bigramas en strings) no
+se convierten en vistas de solo lectura, porque el modelo tiene que seguir
+pudiéndose serializar para los procesos de solve_document. No tocarlos
+después de freeze() es una convención. Las memorias perezosas que solo
+agregan entradas idempotentes (p. ej. KeyboardModel._bucket_index_cache)
+siguen siendo mutables a propósito: si dos hilos calculan la misma entrada
+a la vez, las dos son iguales.
+
+Congelar es decisión de quien comparte el modelo (ViterbiDecoder.freeze,
+LanguageRegistry); un modelo congelado no se descongela.
+"""
+
+import numpy as np
+
+
+class FrozenModelError(AttributeError):
+    """Se intentó modificar un modelo congelado."""
+
+
+class Freezable:
+    """
+    Mixin: freeze() congela los arrays de _frozen_arrays() y los atributos.
+
+    Las subclases devuelven en _frozen_arrays() los arrays que leen al
+    decodificar. Deserializar (pickle, para ProcessPoolExecutor) no pasa por
+    __setattr__ y vuelve a congelar los arrays si el modelo lo estaba.
+    """
+
+    _frozen = False
+
+    def _frozen_arrays(self):
+        return ()
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
+    def freeze(self):
+        """Deja el modelo de solo lectura (si no lo estaba); devuelve el propio modelo."""
+        if not self._frozen:
+            self._lock_arrays()
+            object.__setattr__(self, "_frozen", True)
+        return self
+
+    def _lock_arrays(self):
+        for array in self._frozen_arrays():
+            if isinstance(array, np.ndarray):
+                array.setflags(write=False)
+
+    def __setattr__(self, name, value):
+        if self._frozen:
+            msg = f"{type(self).__name__} está congelado: no se puede cambiar {name!r}"
+            raise FrozenModelError(msg)
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        if self._frozen:
+            msg = f"{type(self).__name__} está congelado: no se puede borrar {name!r}"
+            raise FrozenModelError(msg)
+        object.__delattr__(self, name)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self._frozen:
+            self._lock_arrays()
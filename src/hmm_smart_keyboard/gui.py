@@ -1,6 +1,7 @@
 import sys
+from collections import deque
 
-from PyQt5.QtCore import QSize, Qt
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QSize, Qt
 from PyQt5.QtGui import QFont
 from PyQt5.QtWidgets import *
 from wordfreq import top_n_list
@@ -9,6 +10,72 @@ from hmm_smart_keyboard.GUI.layout_colorwidget import Color
 from hmm_smart_keyboard.keyboard_model import KeyboardModel
 from hmm_smart_keyboard.language_model import LanguageModel
 from hmm_smart_keyboard.viterbi_decoder import ViterbiDecoder
+from hmm_smart_keyboard.vocabulary import align_vocabularies
+
+# Resultados que guarda el historial; al llenarse se descarta el más viejo
+HISTORIAL_MAXIMO = 1000
+
+
+class HistorialModel(QAbstractListModel):
+    """
+    Historial de resultados para un QListView.
+
+    Los resultados van en un buffer circular (deque con maxlen) y en un dict
+    id -> resultado para buscarlos sin recorrer la lista. La vista solo pide
+    el texto de las filas visibles, así que no hay un widget por resultado.
+    """
+
+    def __init__(self, maximo=HISTORIAL_MAXIMO, parent=None):
+        super().__init__(parent)
+        self.resultados = deque(maxlen=maximo)
+        self.por_id = {}
+
+    def rowCount(self, parent=None):  # noqa: N802 (método de Qt)
+        if parent is not None and parent.isValid():
+            return 0
+        return len(self.resultados)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        resultado = self.resultados[index.row()]
+        if role == Qt.DisplayRole:
+            return (
+                f"{resultado.id} - {resultado.original_text[:20]} - "
+                f"{resultado.corrected_text[:20]} - {round(resultado.best_score, 3)}"
+            )
+        if role == Qt.UserRole:
+            return resultado.id
+        return None
+
+    def agregar(self, resultado):
+        """Agrega `resultado` al final, descartando el más viejo si no cabe."""
+        if len(self.resultados) == self.resultados.maxlen:
+            self.beginRemoveRows(QModelIndex(), 0, 0)
+            viejo = self.resultados.popleft()
+            del self.por_id[viejo.id]
+            self.endRemoveRows()
+
+        fila = len(self.resultados)
+        self.beginInsertRows(QModelIndex(), fila, fila)
+        self.resultados.append(resultado)
+        self.por_id[resultado.id] = resultado
+        self.endInsertRows()
+
+    def buscar(self, id_buscado):
+        """El resultado con ese id, o None si no está (o ya se descartó)."""
+        return self.por_id.get(id_buscado)
+
+
+def formatear_ranking(ranking):
+    """Texto del ranking de cada palabra, armado en una sola pasada."""
+    return "".join(
+        "".join(
+            f"{palabra} CTX:{round(ctx, 3)} KBD:{round(kbd, 3)} TOTAL:{total}\n"
+            for palabra, ctx, kbd, total in posicion
+        ) + "\n\n"
+        for posicion in ranking
+    )
 
 
 class MainWindow(QMainWindow):
@@ -25,7 +92,7 @@ class MainWindow(QMainWindow):
             "best_score": 00000,
             "audit_data": [],
         }
-        self.historial = []
+        self.historial = HistorialModel()
 
         # Objetos
         ## Campop de entrada
@@ -36,7 +103,9 @@ class MainWindow(QMainWindow):
         botonenviar = QPushButton("Enviar")
 
         ## Hitorial
-        listahistorico = QListWidget()
+        listahistorico = QListView()
+        listahistorico.setModel(self.historial)
+        listahistorico.setUniformItemSizes(True)
 
         ## LCD Panel
         lcdpanel = QLCDNumber()
@@ -78,13 +147,12 @@ class MainWindow(QMainWindow):
 
             # Enviar texto a modelo de lenguaje
             # Aca falta tomar el dato dado por el modelo y pasarlo a objeto Resultado
-            self.results = decoder.solve(texto)
-            self.results["original_text"] = texto
+            decodificado = decoder.solve(texto)
             resultado = Resultado(
-                self.results["corrected_text"],
-                self.results["original_text"],
-                self.results["best_score"],
-                self.results["audit_data"],
+                decodificado.corrected_text,
+                texto,
+                decodificado.best_score,
+                decodificado.audit_data,
             )
 
             actualizar_resultados(resultado)
@@ -96,26 +164,9 @@ class MainWindow(QMainWindow):
             entrada.setText("")
 
         def actualizar_resultados(resultado):
-            """Actualiza elementos de interfaz."""
-            self.historial.append(resultado)
-            ficharesultado = QLabel()
-            temp = (
-                resultado.original_text[:20]
-                if len(resultado.original_text) > 20
-                else resultado.original_text
-            )
-            temp2 = (
-                resultado.corrected_text[:20]
-                if len(resultado.corrected_text) > 20
-                else resultado.corrected_text
-            )
-            ficharesultado.setText(
-                f"{resultado.id} - {temp} - {temp2} - {round(resultado.best_score,3)}"
-            )
-            item = QListWidgetItem()
-            item.setSizeHint(ficharesultado.sizeHint())
-            listahistorico.addItem(item)
-            listahistorico.setItemWidget(item, ficharesultado)
+            """Agrega el resultado al historial y muestra la última fila."""
+            self.historial.agregar(resultado)
+            listahistorico.scrollToBottom()
 
         def actualizar_interfaz(resultado):
             """Actualiza elementos de interfaz."""
@@ -130,33 +181,15 @@ class MainWindow(QMainWindow):
             lcdpanel.display(round(score,3))
             mostrarranking(ranking)
 
-        def itemclicked(item):
-            widget = listahistorico.itemWidget(item)
-            resultadoid = widget.text().split(" - ")[0]
-            resultadoid = buscar_por_id(int(resultadoid))
-            actualizar_interfaz(resultadoid)
-
-        listahistorico.itemClicked.connect(itemclicked)
-
-        def buscar_por_id(id_buscado):
-            """
-            Busca un resultado por su id.
+        def itemclicked(index):
+            resultado = self.historial.buscar(index.data(Qt.UserRole))
+            if resultado is not None:
+                actualizar_interfaz(resultado)
 
-            :param lista_objetos: lista de objetos que tienen un atributo 'id'
-            :param id_buscado: id que se quiere buscar
-            :return: el objeto que coincide o None si no se encuentra
-            """
-            for obj in self.historial:
-                if obj.id == id_buscado:
-                    return obj
-            return None
+        listahistorico.clicked.connect(itemclicked)
 
         def mostrarranking(ranking):
-            texto = ""
-            for item in ranking:
-                for a in item:
-                    texto += f"{a['palabra']} CTX:{round(a['ctx'],3)} KBD:{round(a['kbd'],3)} TOTAL:{a['total']}\n"
-                texto += "\n\n"
+            texto = formatear_ranking(ranking)
             consola.setPlainText(texto)
             return texto
 
@@ -202,6 +235,8 @@ class Resultado:
     # Variable de clase (compartida entre todas las instancias)
     _id_counter = 1
 
+    __slots__ = ("best_score", "corrected_text", "id", "original_text", "ranking")
+
     def __init__(self, corrected_text, original_text, best_score, audit_data):
         self.id = Resultado._id_counter  # asigna el ID actual
         Resultado._id_counter += 1  # aumenta para la próxima instancia
@@ -209,18 +244,21 @@ class Resultado:
         self.corrected_text = corrected_text
         self.original_text = original_text
         self.best_score = best_score
-        self.original_text = original_text
-        self.ranking = []
-        if isinstance(audit_data, list):
-            for a in audit_data:
-                self.ranking.append(a["ranking"])
-        else:
-            self.ranking.append(audit_data["ranking"])
+
+        # Solo lo que muestra la consola: por palabra, tuplas
+        # (palabra, ctx, kbd, total) en lugar de los dicts de la auditoría
+        if not isinstance(audit_data, list):
+            audit_data = [audit_data]
+        self.ranking = tuple(
+            tuple((a["palabra"], a["ctx"], a["kbd"], a["total"]) for a in entrada["ranking"])
+            for entrada in audit_data
+        )
 
 # 1. Inicializar modelo
 vocab = top_n_list("es", 20000)
 km = KeyboardModel(vocab)
 lm = LanguageModel()  # usa data/P_matrix_transicion.json
+align_vocabularies(km, lm)  # IDs enteros compartidos entre ambos modelos
 
 decoder = ViterbiDecoder(language_model=lm, keyboard_model=km)
 
@@ -0,0 +1,148 @@
+"""
+Instrumentación opcional del camino caliente del decodificador.
+
+Por defecto está apagada: cada punto instrumentado hace una sola lectura de
+un ContextVar y, si no hay métricas activas, sigue sin medir nada. Para
+medir una petición (o un lote) se envuelve en `instrument()`:
+
+    with instrument() as metrics:
+        decoder.solve("la imqgen de la bqndera")
+    print(metrics.to_prometheus())
+
+Etapas medidas (segundos): candidates, emission, transitions, viterbi, audit.
+Contadores: words, candidates, trellis_cells, cache_hits, cache_misses,
+gate_skipped.
+
+Al ser un ContextVar, cada hilo o tarea asyncio ve sus propias métricas.
+"""
+
+import json
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROMETHEUS_PREFIX = "hmm_keyboard"
+
+_active: ContextVar["Metrics | None"] = ContextVar("hmm_keyboard_metrics", default=None)
+
+
+class Metrics:
+    """Tiempos por etapa (llamadas, total, máximo) y contadores."""
+
+    __slots__ = ("counters", "timers")
+
+    def __init__(self):
+        self.timers: dict[str, list[float]] = {}  # etapa -> [llamadas, total_s, max_s]
+        self.counters: dict[str, int] = {}
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        timer = self.timers.get(stage)
+        if timer is None:
+            self.timers[stage] = [1, seconds, seconds]
+        else:
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def timed(self, stage: str, func):
+        """Envuelve `func` para que cada llamada sume su tiempo a `stage`."""
+
+        def wrapper(*args, **kwargs):
+            with self.timer(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def merge(self, other: "Metrics") -> None:
+        """Suma las métricas de `other` (p. ej. las de otro hilo)."""
+        for stage, (calls, total, longest) in other.timers.items():
+            timer = self.timers.setdefault(stage, [0, 0.0, 0.0])
+            timer[0] += calls
+            timer[1] += total
+            timer[2] = max(timer[2], longest)
+        for name, n in other.counters.items():
+            self.count(name, n)
+
+    def records(self) -> list[dict]:
+        """Una entrada por etapa y una por contador, listas para un log estructurado."""
+        entries = [
+            {
+                "stage": stage,
+                "calls": int(calls),
+                "total_s": total,
+                "mean_s": total / calls if calls else 0.0,
+                "max_s": longest,
+            }
+            for stage, (calls, total, longest) in self.timers.items()
+        ]
+        entries.extend(
+            {"counter": name, "value": value} for name, value in self.counters.items()
+        )
+        return entries
+
+    def log(self, level: int = logging.INFO, target: logging.Logger | None = None) -> None:
+        """Emite cada registro como una línea JSON (y en extra["metrics"])."""
+        target = target or logger
+        for record in self.records():
+            target.log(level, json.dumps(record), extra={"metrics": record})
+
+    def to_prometheus(self, prefix: str = DEFAULT_PROMETHEUS_PREFIX) -> str:
+        """Métricas en el formato de texto de Prometheus."""
+        lines = []
+        if self.timers:
+            name = f"{prefix}_stage_seconds"
+            lines.append(f"# HELP {name} Tiempo acumulado por etapa del decodificador.")
+            lines.append(f"# TYPE {name} summary")
+            for stage, (calls, total, _) in self.timers.items():
+                lines.append(f'{name}_sum{{stage="{stage}"}} {total:.9f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {int(calls)}')
+
+            name = f"{prefix}_stage_max_seconds"
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(
+                f'{name}{{stage="{stage}"}} {longest:.9f}'
+                for stage, (_, _, longest) in self.timers.items()
+            )
+
+        for counter, value in self.counters.items():
+            name = f"{prefix}_{counter}_total"
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def active() -> Metrics | None:
+    """Métricas de la petición actual, o None si la instrumentación está apagada."""
+    return _active.get()
+
+
+@contextmanager
+def instrument(metrics: Metrics | None = None) -> Iterator[Metrics]:
+    """
+    Activa la instrumentación dentro del bloque.
+
+    :param metrics: acumulador a usar (p. ej. uno compartido entre peticiones);
+                    si es None se crea uno nuevo
+    """
+    metrics = Metrics() if metrics is None else metrics
+    token = _active.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _active.reset(token)
@@ -0,0 +1,266 @@
+"""
+Registro de distribuciones de teclado.
+
+Cada distribución se compila una sola vez en su tabla de emisión
+(log P(tecla_sucia | tecla_real) para cada par de teclas) y queda en caché,
+de modo que un mismo KeyboardModel puede cambiar de teclado por petición
+sin volver a construir su vocabulario.
+"""
+
+import json
+from dataclasses import dataclass
+from functools import cache, cached_property
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+
+DEFAULT_LAYOUT = "qwerty_es"
+
+# Penalización por cada letra insertada o borrada (diferencia de longitudes)
+DEFAULT_LENGTH_PENALTY = 2.0
+
+# Log-probabilidad de un carácter que no existe en la distribución
+UNKNOWN_CHAR_LOG_PROB = -50.0
+
+
+@dataclass(frozen=True)
+class LayoutSpec:
+    """
+    Descripción de una distribución.
+
+    - sigma: dispersión del error entre teclas (evidencia = letra).
+    - touch_sigma: dispersión (x, y) de un toque alrededor del centro de la
+      tecla (evidencia = coordenada de pantalla).
+    - tables: .npz con tablas aprendidas (ver confusion_model); si se da,
+      reemplaza la gaussiana de sigma.
+    """
+
+    filename: str
+    sigma: float = 2.0
+    touch_sigma: tuple[float, float] = (0.5, 0.5)
+    tables: str | None = None
+
+
+# Distribuciones conocidas. Las coordenadas están en unidades de ancho de tecla.
+LAYOUTS: dict[str, LayoutSpec] = {
+    "qwerty_es": LayoutSpec("keyboard_es.json"),
+    "qwerty_us": LayoutSpec("keyboard_us.json"),
+    "azerty": LayoutSpec("keyboard_azerty.json"),
+    # En vertical las teclas son estrechas: el dedo cubre más teclas vecinas
+    # Las filas están más separadas que las columnas, así que el toque
+    # se dispersa más en vertical que en horizontal
+    "mobile_portrait": LayoutSpec(
+        "keyboard_mobile_portrait.json",
+        sigma=2.5,
+        touch_sigma=(0.45, 0.7),
+    ),
+    "mobile_landscape": LayoutSpec(
+        "keyboard_mobile_landscape.json",
+        touch_sigma=(0.5, 0.4),
+    ),
+}
+
+
+@dataclass(frozen=True)
+class CompiledLayout:
+    """
+    Distribución de teclado compilada a su tabla de emisión.
+
+    - keys[i] es la tecla de la fila/columna i de sub_log_prob.
+    - sub_log_prob[i, j] = log P(teclear keys[i] | se quería keys[j]).
+    - lookup[c1][c2] es la misma tabla como diccionarios, para el camino escalar.
+    - ins_lookup / del_lookup: log-probabilidad de insertar / borrar cada tecla.
+      Con la gaussiana son None y se usa length_penalty por letra.
+    """
+
+    name: str
+    sigma: float
+    keyboard_map: dict[str, dict[str, float]]
+    keys: tuple[str, ...]
+    char_index: dict[str, int]
+    coords: npt.NDArray[np.float64]
+    sub_log_prob: npt.NDArray[np.float64]
+    lookup: dict[str, dict[str, float]]
+    touch_sigma: tuple[float, float] = (0.5, 0.5)
+    length_penalty: float = DEFAULT_LENGTH_PENALTY
+    ins_lookup: dict[str, float] | None = None
+    del_lookup: dict[str, float] | None = None
+
+    @property
+    def variance(self) -> float:
+        return self.sigma ** 2
+
+    def encode(self, word: str) -> list[int]:
+        """Índices de tecla de una palabra; len(keys) marca un carácter desconocido."""
+        unknown = len(self.keys)
+        return [self.char_index.get(c, unknown) for c in word.lower()]
+
+    @cached_property
+    def alignment_tables(self):
+        """
+        Tablas (sub, ins, del) para la alineación vectorizada, con una fila y
+        columna extra (índice len(keys)) para caracteres desconocidos.
+        """
+        n = len(self.keys)
+        sub = np.full((n + 1, n + 1), UNKNOWN_CHAR_LOG_PROB)
+        sub[:n, :n] = self.sub_log_prob
+
+        ins = np.full(n + 1, UNKNOWN_CHAR_LOG_PROB)
+        dele = np.full(n + 1, UNKNOWN_CHAR_LOG_PROB)
+        if self.ins_lookup is None:
+            ins[:n] = -self.length_penalty
+            dele[:n] = -self.length_penalty
+        else:
+            ins[:n] = [self.ins_lookup[k] for k in self.keys]
+            dele[:n] = [self.del_lookup[k] for k in self.keys]
+
+        for table in (sub, ins, dele):
+            table.setflags(write=False)
+        return sub, ins, dele
+
+    def touch_log_probs(
+        self,
+        points: npt.ArrayLike,
+    ) -> npt.NDArray[np.float64]:
+        """
+        Puntúa cada toque contra el centro de todas las teclas a la vez.
+
+        :param points: array (n, 2) con las coordenadas (x, y) de n toques
+        :return: array (n, len(keys)) con log P(toque | tecla), gaussiana
+                 anisotrópica sin constante de normalización
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        scaled = (points[:, None, :] - self.coords[None, :, :]) / self.touch_sigma
+        return -0.5 * np.sum(scaled ** 2, axis=-1)
+
+
+def register_layout(
+    name: str,
+    path: Path | str,
+    sigma: float = 2.0,
+    touch_sigma: tuple[float, float] = (0.5, 0.5),
+    tables: Path | str | None = None,
+) -> None:
+    """Registra (o reemplaza) una distribución a partir de un archivo JSON."""
+    LAYOUTS[name] = LayoutSpec(
+        str(path),
+        sigma,
+        tuple(touch_sigma),
+        None if tables is None else str(tables),
+    )
+    compile_layout.cache_clear()
+
+
+def load_keyboard_map(filename: str) -> dict[str, dict[str, float]]:
+    """Lee un archivo {tecla: {"x": ..., "y": ...}} desde data/ o una ruta."""
+    file_path = Path(filename)
+    if not file_path.is_absolute():
+        file_path = DATA_DIR / file_path
+
+    with file_path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@cache
+def compile_layout(name: str = DEFAULT_LAYOUT, sigma: float | None = None) -> CompiledLayout:
+    """
+    Compila la distribución `name` en su tabla de emisión gaussiana.
+
+    El resultado se guarda en caché por (name, sigma): todas las instancias
+    que usan el mismo teclado comparten la misma tabla.
+    """
+    if name not in LAYOUTS:
+        msg = f"Distribución de teclado desconocida: {name!r}"
+        raise KeyError(msg)
+
+    spec = LAYOUTS[name]
+    sigma = spec.sigma if sigma is None else float(sigma)
+    keyboard_map = load_keyboard_map(spec.filename)
+
+    keys = tuple(keyboard_map)
+    coords = np.array(
+        [(float(keyboard_map[k]["x"]), float(keyboard_map[k]["y"])) for k in keys],
+        dtype=np.float64,
+    )
+
+    if spec.tables is not None:
+        return _compile_learned(name, sigma, keyboard_map, spec)
+
+    # Distancias al cuadrado entre todas las teclas de una sola vez
+    diff = coords[:, None, :] - coords[None, :, :]
+    dist_sq = np.sum(diff ** 2, axis=-1)
+
+    # Error gaussiano (sin constante de normalización, para ranking basta)
+    sub_log_prob = -dist_sq / (2 * sigma ** 2)
+    sub_log_prob.setflags(write=False)
+    coords.setflags(write=False)
+
+    rows = sub_log_prob.tolist()
+    lookup = {
+        k1: dict(zip(keys, row, strict=True))
+        for k1, row in zip(keys, rows, strict=True)
+    }
+
+    return CompiledLayout(
+        name=name,
+        sigma=sigma,
+        keyboard_map=keyboard_map,
+        keys=keys,
+        char_index={k: i for i, k in enumerate(keys)},
+        coords=coords,
+        sub_log_prob=sub_log_prob,
+        lookup=lookup,
+        touch_sigma=spec.touch_sigma,
+    )
+
+
+def _compile_learned(name, sigma, keyboard_map, spec):
+    """
+    Compila una distribución con las tablas aprendidas de spec.tables.
+
+    Las coordenadas siguen saliendo del JSON (las usa el modo táctil); las
+    teclas que no aparecen en las tablas quedan como desconocidas.
+    """
+    with np.load(spec.tables) as data:
+        table_keys = tuple(str(k) for k in data["keys"])
+        sub = data["sub_log_prob"]
+        ins = data["ins_log_prob"]
+        dele = data["del_log_prob"]
+
+    table_index = {k: i for i, k in enumerate(table_keys)}
+    common = [k for k in keyboard_map if k in table_index]
+    rows = [table_index[k] for k in common]
+
+    sub_log_prob = sub[np.ix_(rows, rows)]
+    sub_log_prob.setflags(write=False)
+    sub_rows = sub_log_prob.tolist()
+
+    coords = np.array(
+        [(float(keyboard_map[k]["x"]), float(keyboard_map[k]["y"])) for k in common],
+        dtype=np.float64,
+    )
+    coords.setflags(write=False)
+
+    # Para el modo táctil, la penalización media por letra de más o de menos
+    length_penalty = -float(np.mean(np.concatenate([ins[rows], dele[rows]])))
+
+    return CompiledLayout(
+        name=name,
+        sigma=sigma,
+        keyboard_map={k: keyboard_map[k] for k in common},
+        keys=tuple(common),
+        char_index={k: i for i, k in enumerate(common)},
+        coords=coords,
+        sub_log_prob=sub_log_prob,
+        lookup={
+            k1: dict(zip(common, row, strict=True))
+            for k1, row in zip(common, sub_rows, strict=True)
+        },
+        touch_sigma=spec.touch_sigma,
+        length_penalty=length_penalty,
+        ins_lookup={k: float(ins[table_index[k]]) for k in common},
+        del_lookup={k: float(dele[table_index[k]]) for k in common},
+    )
@@ -1,28 +1,134 @@
-import json
+import hashlib
+import math
+import time
 from pathlib import Path
 
-from wordfreq import top_n_list
-
-from hmm_smart_keyboard.utils import distance
-
-
-class KeyboardModel:
-
-    def __init__(self, vocab):
-        dir_path = Path(__file__).resolve().parent
-        file_path = dir_path / "data" / "keyboard_es.json"
-
-        self.vocabulary = set(vocab)
+import numpy as np
+from wordfreq import top_n_list, word_frequency
+
+from hmm_smart_keyboard.frozen import Freezable
+from hmm_smart_keyboard.instrumentation import active
+from hmm_smart_keyboard.keyboard_layouts import (
+    DEFAULT_LAYOUT,
+    LAYOUTS,
+    UNKNOWN_CHAR_LOG_PROB,
+    CompiledLayout,
+    compile_layout,
+    register_layout,
+)
+
+# Máxima distancia |i - j| entre posiciones alineadas (además de la
+# diferencia de longitudes, que siempre se permite)
+DEFAULT_ALIGNMENT_BAND = 2
+
+# Un toque puede ser la primera letra de la palabra si su score queda a
+# menos de este margen del de la tecla más cercana
+FIRST_KEY_MARGIN = 2.0
+
+# Peso de log P(palabra) al ordenar candidatos (0 => solo la emisión)
+DEFAULT_PRIOR_WEIGHT = 0.1
+
+# Frecuencia mínima para palabras sin conteo en set_unigram_prior
+MIN_UNIGRAM_FREQUENCY = 1e-9
+
+
+def zipf_log_prior(size: int) -> np.ndarray:
+    """
+    Prior log P(palabra) de la ley de Zipf a partir del rango (0 = la más frecuente).
+
+    Sirve de prior cuando solo se conoce el orden del vocabulario.
+    """
+    log_ranks = np.log(np.arange(1, size + 1, dtype=np.float64))
+    return -log_ranks - np.log(np.sum(1.0 / np.arange(1, size + 1)))
+
+
+def wordfreq_frequencies(words, lang="es") -> dict[str, float]:
+    """Frecuencias de wordfreq para `words`, listas para set_unigram_prior."""
+    return {word: word_frequency(word, lang) for word in words}
+
+
+def banded_alignment(sub_scores, ins_scores, del_scores, band=DEFAULT_ALIGNMENT_BAND):
+    """
+    Puntaje de la mejor alineación (Needleman-Wunsch en log-probabilidad)
+    de una evidencia de n posiciones contra m palabras de longitud L.
+
+    La DP avanza fila a fila (una por posición de la evidencia) y cada fila
+    se resuelve para las m palabras a la vez: diagonal y vertical dependen
+    solo de la fila anterior, y la cadena de borrados horizontales se
+    resuelve con un máximo acumulado sobre los prefijos de borrado.
+
+    :param sub_scores: (n, m, L) log P(evidencia i | letra j de la palabra)
+    :param ins_scores: (n,) log-probabilidad de que la posición i sobre
+    :param del_scores: (m, L) log-probabilidad de omitir la letra j
+    :param band: solo se consideran celdas con |i - j| <= band
+    :return: (m,) log P(evidencia | palabra)
+    """
+    n, m, length = sub_scores.shape
+    band = max(band, abs(n - length))
+
+    # prefix[:, j] = coste de omitir las j primeras letras
+    prefix = np.zeros((m, length + 1))
+    np.cumsum(del_scores, axis=1, out=prefix[:, 1:])
+
+    prev = prefix.copy()
+    prev[:, band + 1:] = -np.inf
+
+    for i in range(1, n + 1):
+        cur = np.empty((m, length + 1))
+        cur[:, 0] = prev[:, 0] + ins_scores[i - 1]
+        np.maximum(
+            prev[:, :-1] + sub_scores[i - 1],
+            prev[:, 1:] + ins_scores[i - 1],
+            out=cur[:, 1:],
+        )
+        cur[:, :max(0, i - band)] = -np.inf
+
+        # cur[j] = max(cur[j], cur[j-1] + del[j-1]) para todo j a la vez
+        cur -= prefix
+        np.maximum.accumulate(cur, axis=1, out=cur)
+        cur += prefix
+        cur[:, i + band + 1:] = -np.inf
+
+        prev = cur
+
+    return prev[:, length]
+
+
+class KeyboardModel(Freezable):
+
+    def __init__(
+        self,
+        vocab,
+        layout=DEFAULT_LAYOUT,
+        sigma=None,
+        band=DEFAULT_ALIGNMENT_BAND,
+        prior_weight=DEFAULT_PRIOR_WEIGHT,
+    ):
+        """
+        :param vocab: palabras del diccionario, de la más a la menos frecuente
+                      (como top_n_list); el orden da el rango de frecuencia.
+        :param layout: nombre de la distribución por defecto (ver keyboard_layouts.LAYOUTS).
+        :param sigma: si se da, reemplaza el sigma registrado para la distribución.
+        :param band: ancho de banda de la alineación entre palabras.
+        :param prior_weight: peso de log P(palabra) al ordenar candidatos.
+        """
+        # Rango de frecuencia de cada palabra (0 = la más frecuente)
+        self.rank = {}
+        for i, word in enumerate(vocab):
+            self.rank.setdefault(word, i)
 
-        with file_path.open("r", encoding="utf-8") as f:
-            self.keyboard_map = json.load(f)
+        self.vocabulary = set(self.rank)
+        self.band = band
 
-        self.sigma = 2
-        self.variance = self.sigma ** 2
+        # Sube con cada cambio de distribución o de prior (ver
+        # ViterbiDecoder.cache_config)
+        self.revision = 0
+        self.set_layout(layout, sigma)
 
-        # Buckets por (primera_letra, longitud)
+        # Buckets por (primera_letra, longitud), en orden de frecuencia para que
+        # los empates se resuelvan igual en cada ejecución
         self.buckets = {}
-        for word in self.vocabulary:
+        for word in self.rank:
             if not word:
                 continue
             key = (word[0].lower(), len(word))
@@ -30,67 +136,275 @@ class KeyboardModel:
                 self.buckets[key] = []
             self.buckets[key].append(word)
 
-    def get_emission_log_prob(self, dirty_word: str, intended_word: str):
+        # (teclas de la distribución, bucket) -> (palabras, índices de teclas),
+        # bajo demanda
+        self._bucket_index_cache = {}
+
+        # Prior de unigramas indexado por ID (= rango) y los IDs de cada bucket,
+        # para sumarlo a la emisión al ordenar sin tocar strings
+        self.prior_weight = prior_weight
+        self.log_prior = zipf_log_prior(len(self.rank))
+        self.bucket_ids = {
+            key: np.array([self.rank[w] for w in words], dtype=np.intp)
+            for key, words in self.buckets.items()
+        }
+
+        # Candidatos precalculados (candidate_cache), si se adjunta una caché,
+        # y si sirve para cada distribución: (id, revision, band, prior_weight)
+        # -> (distribución, artifact_version coincide)
+        self.candidate_cache = None
+        self._candidate_cache_checks = {}
+        self._vocab_digest = None
+
+    def freeze(self):
         """
-        Retorna log P(dirty | intended) basado en la distancia euclidiana
-        entre teclas. Valores cercanos a 0 => error muy plausible.
-        Valores muy negativos => error raro.
+        Deja el modelo de solo lectura para compartirlo entre hilos (ver frozen).
+
+        La huella de artifact_version se calcula antes, porque es perezosa.
         """
-        if not dirty_word or not intended_word:
-            return -1e9  # casi imposible
+        if self._vocab_digest is None:
+            self.artifact_version()
+        return super().freeze()
+
+    def _frozen_arrays(self):
+        return [self.log_prior, *self.bucket_ids.values()]
+
+    def set_layout(self, layout, sigma=None):
+        """Cambia la distribución por defecto sin tocar el vocabulario."""
+        self.layout = compile_layout(layout, sigma)
+        self.keyboard_map = self.layout.keyboard_map
+        self.sigma = self.layout.sigma
+        self.variance = self.layout.variance
+        self.revision += 1
+
+    def load_emission_tables(self, tables_path, name=None):
+        """
+        Usa tablas aprendidas (confusion_model) en lugar de la gaussiana.
 
-        log_prob_total = 0.0
+        Registra una distribución nueva con las coordenadas de la actual y la
+        deja por defecto; sigue pudiéndose elegir cualquier otra por petición.
+        """
+        base = LAYOUTS[self.layout.name]
+        if name is None:
+            name = f"{self.layout.name}+{Path(tables_path).stem}"
+
+        register_layout(
+            name,
+            base.filename,
+            base.sigma,
+            base.touch_sigma,
+            tables=tables_path,
+        )
+        self.set_layout(name)
+
+    def set_unigram_prior(self, frequencies, weight=None):
+        """
+        Reemplaza el prior de Zipf por frecuencias reales.
 
-        for dirty_char, intended_char in zip(
-            dirty_word,
-            intended_word,
-            strict=False,
-        ):
-            c1 = dirty_char.lower()
-            c2 = intended_char.lower()
+        :param frequencies: palabra -> frecuencia o conteo (wordfreq_frequencies,
+                            o los unigramas de language_model.count_frequencies);
+                            las palabras sin valor reciben MIN_UNIGRAM_FREQUENCY
+        :param weight: si se da, reemplaza prior_weight
+        """
+        counts = np.array(
+            [frequencies.get(word, 0.0) for word in self.rank],
+            dtype=np.float64,
+        )
+        total = counts.sum()
+        probs = counts / total if total > 0 else counts
+        self.log_prior = np.log(np.maximum(probs, MIN_UNIGRAM_FREQUENCY))
+        if weight is not None:
+            self.prior_weight = weight
+        self.revision += 1
+
+    def _rank_candidates(self, words, scores, ids, limit):
+        """
+        Top `limit` de [(palabra, emisión)], ordenando por emisión + prior.
 
-            # Si no conocemos alguno de los caracteres, penalizamos fuerte
-            if c1 not in self.keyboard_map or c2 not in self.keyboard_map:
-                return -50.0
+        El prior solo decide qué candidatos pasan el corte; el puntaje que se
+        devuelve sigue siendo la emisión pura que usa el decodificador.
+        """
+        scores = np.concatenate(scores)
+        ranking = scores
+        if self.prior_weight:
+            ranking = scores + self.prior_weight * self.log_prior[np.concatenate(ids)]
+        top = np.argsort(-ranking, kind="stable")[:limit]
+        return [(words[i], float(scores[i])) for i in top]
+
+    def artifact_version(self, layout=None) -> str:
+        """
+        Huella del vocabulario y de la distribución: cambia si cambia
+        cualquiera de los dos, e invalida las cachés construidas con ellos.
+        """
+        compiled = self.resolve_layout(layout)
+
+        if self._vocab_digest is None:
+            vocab_hash = hashlib.blake2b(digest_size=8)
+            for word in sorted(self.vocabulary):
+                vocab_hash.update(word.encode("utf-8") + b"\n")
+            self._vocab_digest = vocab_hash.digest()
+
+        digest = hashlib.blake2b(self._vocab_digest, digest_size=8)
+        digest.update(compiled.name.encode("utf-8"))
+        digest.update(str(self.band).encode("utf-8"))
+        digest.update(str(self.prior_weight).encode("utf-8"))
+        digest.update(self.log_prior.tobytes())
+        for table in compiled.alignment_tables:
+            digest.update(table.tobytes())
+        return digest.hexdigest()
+
+    def attach_candidate_cache(self, cache):
+        """
+        Responde con `cache` las palabras que tenga precalculadas.
 
-            c1_coords = self.keyboard_map[c1]
-            c2_coords = self.keyboard_map[c2]
+        :raises ValueError: si la caché se construyó con otro vocabulario o
+                            distribución (versión de artefacto distinta)
+        """
+        # Con la distribución del propio modelo (que puede tener otro sigma
+        # que la registrada con ese nombre) si la caché es para ella
+        compiled = self.layout if cache.layout == self.layout.name else self.resolve_layout(cache.layout)
+        expected = self.artifact_version(compiled)
+        if cache.version != expected:
+            msg = (
+                f"Caché de candidatos obsoleta: versión {cache.version}, "
+                f"el modelo espera {expected}"
+            )
+            raise ValueError(msg)
+        self.candidate_cache = cache
+        self._candidate_cache_checks.clear()
 
-            x1, y1 = float(c1_coords["x"]), float(c1_coords["y"])
-            x2, y2 = float(c2_coords["x"]), float(c2_coords["y"])
+    def _candidate_cache_matches(self, compiled: CompiledLayout) -> bool:
+        """
+        Si la caché adjunta se construyó con este modelo y `compiled`.
 
-            dist = distance.euclidean_distance(
-                (x1, y1),
-                (x2, y2),
-            )
+        artifact_version es cara, así que se recuerda por distribución y
+        estado del modelo; cambiar distribución, prior o band la recalcula.
+        """
+        key = (id(compiled), self.revision, self.band, self.prior_weight)
+        checked = self._candidate_cache_checks.get(key)
+        if checked is None or checked[0] is not compiled:
+            checked = (compiled, self.artifact_version(compiled) == self.candidate_cache.version)
+            self._candidate_cache_checks[key] = checked
+        return checked[1]
+
+    def attach_vocabulary(self, vocabulary):
+        """
+        Comprueba que el vocabulario compartido con el LM cubre el teclado.
+
+        El teclado sigue trabajando con strings (rank, buckets); los IDs los
+        usa el LM: el trellis codifica cada columna de candidatos con el
+        vocabulario del LM y las transiciones se buscan por ID.
 
-            # Error gaussiano (sin constante de normalización, para ranking basta)
-            char_log_prob = - (dist ** 2) / (2 * self.variance)
-            log_prob_total += char_log_prob
+        :raises ValueError: si alguna palabra del teclado no está en `vocabulary`
+        """
+        missing = [w for w in self.rank if w not in vocabulary]
+        if missing:
+            msg = f"{len(missing)} palabras del teclado no están en el vocabulario, ej: {missing[0]!r}"
+            raise ValueError(msg)
+
+    def resolve_layout(self, layout) -> CompiledLayout:
+        """Distribución a usar en una petición: la por defecto o una del registro."""
+        if layout is None:
+            return self.layout
+        if isinstance(layout, CompiledLayout):
+            return layout
+        return compile_layout(layout)
+
+    def get_emission_log_prob(self, dirty_word: str, intended_word: str, layout=None):
+        """
+        Retorna log P(dirty | intended) como la mejor alineación entre ambas
+        palabras: Levenshtein ponderado donde sustituir cuesta según la
+        distancia entre teclas y cada letra de más o de menos según la tabla
+        de la distribución. Valores cercanos a 0 => error muy plausible.
+        Valores muy negativos => error raro.
 
-        # Penalizar diferencia de longitudes (inserciones/borrados)
-        len_diff = abs(len(dirty_word) - len(intended_word))
-        if len_diff > 0:
-            log_prob_total -= 2.0 * len_diff
+        :param layout: distribución para esta petición (None => la por defecto).
+        """
+        if not dirty_word or not intended_word:
+            return -1e9  # casi imposible
 
-        return log_prob_total
+        compiled = self.resolve_layout(layout)
+        return self._align(dirty_word.lower(), intended_word.lower(), compiled)
 
-    def get_candidates(self, dirty_word, limit=20):
+    def _align(self, dirty, intended, compiled: CompiledLayout):
         """
-        Retorna una lista de palabras reales del diccionario que podrían ser
-        lo que el usuario quiso decir.
+        Versión escalar de banded_alignment para un solo par de palabras.
 
-        - Filtra por longitud similar (L, L+1, L-1) y misma primera letra.
-        - Usa get_emission_log_prob para puntuar y se queda con las top `limit`.
+        Es más rápida que NumPy cuando solo hay una palabra que puntuar.
+        """
+        lookup = compiled.lookup
+        if compiled.ins_lookup is None:
+            gap = -compiled.length_penalty
+            ins = [gap if c in lookup else UNKNOWN_CHAR_LOG_PROB for c in dirty]
+            dele = [gap if c in lookup else UNKNOWN_CHAR_LOG_PROB for c in intended]
+        else:
+            ins = [compiled.ins_lookup.get(c, UNKNOWN_CHAR_LOG_PROB) for c in dirty]
+            dele = [compiled.del_lookup.get(c, UNKNOWN_CHAR_LOG_PROB) for c in intended]
+
+        n, length = len(dirty), len(intended)
+        band = max(self.band, abs(n - length))
+
+        # Fila 0: solo borrados
+        prev = [0.0] + [-math.inf] * length
+        for j in range(1, min(length, band) + 1):
+            prev[j] = prev[j - 1] + dele[j - 1]
+
+        for i in range(1, n + 1):
+            row = lookup.get(dirty[i - 1])
+            cur = [-math.inf] * (length + 1)
+            if i <= band:
+                cur[0] = prev[0] + ins[i - 1]
+
+            for j in range(max(1, i - band), min(length, i + band) + 1):
+                sub = UNKNOWN_CHAR_LOG_PROB if row is None else row.get(
+                    intended[j - 1],
+                    UNKNOWN_CHAR_LOG_PROB,
+                )
+                cur[j] = max(
+                    prev[j - 1] + sub,          # Sustitución (o acierto)
+                    prev[j] + ins[i - 1],       # Letra de más
+                    cur[j - 1] + dele[j - 1],   # Letra omitida
+                )
+            prev = cur
+
+        return prev[length]
+
+    def get_scored_candidates(self, dirty_word, limit=20, layout=None, use_cache=True):
+        """
+        Como get_candidates, pero devuelve [(palabra, emisión)], ordenada por
+        emisión + prior_weight * log P(palabra).
+
+        Si hay una caché de candidatos adjunta y tiene la palabra, se responde
+        con una búsqueda; si no, cada bucket se puntúa de una vez con
+        banded_alignment.
         """
         if not dirty_word:
             return []
 
+        compiled = self.resolve_layout(layout)
         dirty_word = dirty_word.lower()
+        metrics = active()
+
+        cache = self.candidate_cache
+        if (
+            use_cache
+            and cache is not None
+            and limit <= cache.limit
+            and self._candidate_cache_matches(compiled)
+        ):
+            cached = cache.lookup(dirty_word)
+            if metrics is not None:
+                metrics.count("cache_misses" if cached is None else "cache_hits")
+            if cached is not None:
+                return cached[:limit]
+
+        if metrics is not None:
+            start = time.perf_counter()
+
+        sub_table, ins_table, del_table = compiled.alignment_tables
         first_char = dirty_word[0]
         length = len(dirty_word)
-
-        candidates_raw = []
+        dirty_index = np.asarray(compiled.encode(dirty_word), dtype=np.intp)
 
         target_keys = [
             (first_char, length),      # Misma longitud
@@ -98,29 +412,156 @@ class KeyboardModel:
             (first_char, length - 1),  # Puso una letra de más
         ]
 
+        words = []
+        scores = []
+        ids = []
         for key in target_keys:
-            if key in self.buckets:
-                candidates_raw.extend(self.buckets[key])
+            if key not in self.buckets:
+                continue
+            bucket_words, index = self._bucket_index(compiled, key)
+            words.extend(bucket_words)
+            ids.append(self.bucket_ids[key])
+            scores.append(
+                banded_alignment(
+                    sub_table[dirty_index[:, None, None], index[None, :, :]],
+                    ins_table[dirty_index],
+                    del_table[index],
+                    self.band,
+                ),
+            )
 
-        # Quitar duplicados
-        candidates_raw = list(set(candidates_raw))
+        if metrics is not None:
+            metrics.add_time("emission", time.perf_counter() - start)
 
         # Si no hay nada, devolvemos al menos la palabra original
-        if not candidates_raw:
-            return [dirty_word]
-
-        # Puntuar con el modelo de teclado
-        scored = []
-        for w in candidates_raw:
-            score = self.get_emission_log_prob(dirty_word, w)
-            scored.append((w, score))
+        if not words:
+            return [(dirty_word, self._align(dirty_word, dirty_word, compiled))]
 
         # Ordenar por score (de mayor a menor: menos negativo => más probable)
-        scored.sort(key=lambda x: x[1], reverse=True)
+        return self._rank_candidates(words, scores, ids, limit)
+
+    def get_candidates(self, dirty_word, limit=20, layout=None):
+        """
+        Retorna una lista de palabras reales del diccionario que podrían ser
+        lo que el usuario quiso decir.
 
-        # Devolver solo las palabras, respetando el límite
-        top_words = [w for (w, _) in scored[:limit]]
-        return top_words
+        - Filtra por longitud similar (L, L+1, L-1) y misma primera letra.
+        - Puntúa con la alineación de get_emission_log_prob, suma el prior de
+          unigramas (ver set_unigram_prior) y se queda con las top `limit`.
+        - `layout` elige la distribución de teclado para esta petición.
+        """
+        return [w for w, _ in self.get_scored_candidates(dirty_word, limit, layout)]
+
+    def _bucket_index(self, compiled: CompiledLayout, key):
+        """
+        Palabras de un bucket y su matriz (m, L) de índices de tecla.
+
+        Los caracteres que no existen en la distribución apuntan a una
+        columna extra (len(keys)) con UNKNOWN_CHAR_LOG_PROB.
+        """
+        # Por el orden de las teclas, no por el nombre: register_layout puede
+        # reemplazar una distribución con el mismo nombre y otro orden
+        cache_key = (compiled.keys, key)
+        cached = self._bucket_index_cache.get(cache_key)
+        if cached is None:
+            words = self.buckets[key]
+            index = np.array(
+                [compiled.encode(w) for w in words],
+                dtype=np.intp,
+            ).reshape(len(words), key[1])
+            # setdefault: si otro hilo la calculó a la vez, todos usan la misma
+            cached = self._bucket_index_cache.setdefault(cache_key, (words, index))
+        return cached
+
+    @staticmethod
+    def _touch_log_prob_table(touches, compiled: CompiledLayout):
+        """Tabla log P(toque | tecla) de cada toque, con la columna de "desconocido"."""
+        table = compiled.touch_log_probs(touches)
+        unknown = np.full((table.shape[0], 1), UNKNOWN_CHAR_LOG_PROB)
+        return np.concatenate([table, unknown], axis=1)
+
+    def _score_touch_index(self, table, index, compiled: CompiledLayout):
+        """Emisión de todas las palabras de `index` (m, L) con banded_alignment."""
+        n_touches = table.shape[0]
+        return banded_alignment(
+            table[np.arange(n_touches)[:, None, None], index[None, :, :]],
+            np.full(n_touches, -compiled.length_penalty),
+            compiled.alignment_tables[2][index],
+            self.band,
+        )
+
+    def snap_touches(self, touches, layout=None) -> str:
+        """Convierte cada toque en la tecla más cercana (pierde información)."""
+        compiled = self.resolve_layout(layout)
+        nearest = compiled.touch_log_probs(touches).argmax(axis=1)
+        return "".join(compiled.keys[i] for i in nearest)
+
+    def get_touch_emission_log_prob(self, touches, intended_word: str, layout=None):
+        """
+        Retorna log P(toques | intended) con la gaussiana anisotrópica de la
+        distribución, sin pasar por la letra más cercana.
+
+        :param touches: array (n, 2) con las coordenadas (x, y) de cada toque
+        """
+        if len(touches) == 0 or not intended_word:
+            return -1e9  # casi imposible
+
+        compiled = self.resolve_layout(layout)
+        index = np.array([compiled.encode(intended_word)], dtype=np.intp)
+        table = self._touch_log_prob_table(touches, compiled)
+        return float(self._score_touch_index(table, index, compiled)[0])
+
+    def get_touch_scored_candidates(self, touches, limit=20, layout=None):
+        """
+        Como get_candidates, pero a partir de coordenadas de pantalla.
+
+        - La primera letra puede ser cualquier tecla cercana al primer toque.
+        - Cada bucket se puntúa con una sola operación de NumPy.
+
+        :return: lista [(palabra, log P(toques | palabra))], ordenada como
+                 get_scored_candidates (emisión + prior)
+        """
+        if len(touches) == 0:
+            return []
+
+        compiled = self.resolve_layout(layout)
+        table = self._touch_log_prob_table(touches, compiled)
+        length = table.shape[0]
+
+        first_scores = table[0, :-1]
+        first_keys = [
+            compiled.keys[i]
+            for i in np.flatnonzero(first_scores >= first_scores.max() - FIRST_KEY_MARGIN)
+            if not compiled.keys[i].isspace()
+        ]
+
+        words = []
+        scores = []
+        ids = []
+        for first_char in first_keys:
+            for key in (
+                (first_char, length),      # Misma longitud
+                (first_char, length + 1),  # Se comió una letra
+                (first_char, length - 1),  # Puso una letra de más
+            ):
+                if key not in self.buckets:
+                    continue
+                bucket_words, index = self._bucket_index(compiled, key)
+                words.extend(bucket_words)
+                ids.append(self.bucket_ids[key])
+                scores.append(self._score_touch_index(table, index, compiled))
+
+        # Si no hay nada, devolvemos al menos las teclas más cercanas
+        if not words:
+            return [(self.snap_touches(touches, compiled), float(table.max(axis=1).sum()))]
+
+        return self._rank_candidates(words, scores, ids, limit)
+
+    def get_touch_candidates(self, touches, limit=20, layout=None):
+        """Palabras candidatas para una secuencia de toques (x, y)."""
+        return [
+            w for w, _ in self.get_touch_scored_candidates(touches, limit, layout)
+        ]
 
 
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
-import bz2
+import argparse
+import io
 import math
 import re
 from collections import Counter
@@ -6,10 +7,21 @@ from collections.abc import Iterator
 from pathlib import Path
 
 import mwxml
+import numpy as np
 import ujson as json
 
 from hmm_smart_keyboard.constants import START_TOKEN
+from hmm_smart_keyboard.corpus_stream import (
+    CHUNK_SIZE,
+    PrefetchReader,
+    count_token_batches,
+    iter_corpus_files,
+    open_corpus,
+    text_token_batches,
+)
+from hmm_smart_keyboard.frozen import Freezable
 from hmm_smart_keyboard.utils.text_processing import normalize_text, tokenize
+from hmm_smart_keyboard.vocabulary import START_ID
 
 # --- 1. CONFIGURACIÓN Y ARCHIVOS ---
 
@@ -23,6 +35,22 @@ current_dir = Path(__file__).parent
 data_dir = current_dir / "data"
 OUTPUT_FILENAME = data_dir / "P_matrix_transicion.json"
 
+# Archivos de los arrays de bigramas (ver LanguageModel.save_arrays)
+BIGRAM_KEYS_FILENAME = "bigram_keys.npy"
+BIGRAM_VALUES_FILENAME = "bigram_values.npy"
+
+
+def dump_path(locale: str = "es") -> Path:
+    """Dump de Wikipedia del idioma `locale` (p. ej. enwiki-... para "en")."""
+    return BASE_DIR / f"{locale}wiki-latest-pages-articles-multistream.xml.bz2"
+
+
+def matrix_path(locale: str = "es") -> Path:
+    """Matriz de transición del idioma `locale`; la de "es" es OUTPUT_FILENAME."""
+    if locale == "es":
+        return OUTPUT_FILENAME
+    return data_dir / f"P_matrix_transicion.{locale}.json"
+
 
 # --- 2. PRE-PROCESAMIENTO Y LIMPIEZA ---
 
@@ -40,20 +68,28 @@ def clean_wiki_markup(text: str) -> str:
     return text
 
 
-def extract_and_clean_tokens(dump_path: str | Path) -> Iterator[str]:
-    """Usa mwxml para extraer texto, lo limpia y produce un flujo de tokens."""
+def is_wiki_dump(path: str | Path) -> bool:
+    """True para dumps XML de MediaWiki (.xml, .xml.bz2, .xml.gz...)."""
+    return ".xml" in Path(path).suffixes
+
+
+def extract_wiki_token_batches(dump_path: str | Path) -> Iterator[list[str]]:
+    """
+    Usa mwxml para extraer texto, lo limpia y produce los tokens de cada artículo.
+
+    El dump se descomprime en otro hilo (corpus_stream.PrefetchReader), así
+    que el parseo no espera a bz2.
+    """
     dump_path = Path(dump_path)
 
     print(f"Iniciando el parseo del dump: {dump_path}")
 
     try:
-        # Solución para el AttributeError y manejo del bz2
-        with bz2.open(dump_path, "rb") as f:
-            # mwxml ahora recibe el objeto de archivo abierto y descomprimido
+        with PrefetchReader(open_corpus(dump_path)) as raw, io.BufferedReader(raw, CHUNK_SIZE) as f:
+            # mwxml recibe el objeto de archivo abierto y descomprimido
             for page in mwxml.Dump.from_file(f).pages:
                 # Solo procesar artículos (namespace 0) y que tengan contenido
                 if page.namespace == 0 and page.redirect is None:
-                    # ⬇️ CORRECCIÓN: Iterar sobre page directamente
                     # mwxml.Page es un iterable de revisiones.
 
                     for revision in page:
@@ -67,14 +103,10 @@ def extract_and_clean_tokens(dump_path: str | Path) -> Iterator[str]:
                             clean_text = normalize_text(clean_text)
 
                             # 3. Eliminar caracteres que no sean alfabéticos/espacios
-                            # Corregido: Se reemplaza por un espacio ' ' (Sintaxis de re.sub)
                             clean_text = re.sub(r"[^a-záéíóúüñ\s]", " ", clean_text)
 
                             # 4. Tokenización
-                            tokens = tokenize(clean_text)
-
-                            # Usar yield para devolver tokens uno por uno
-                            yield from tokens
+                            yield tokenize(clean_text)
                             break  # Salir del bucle de revisión después de la primera (actual)
 
         print("Finalizado el procesamiento de artículos.")
@@ -90,6 +122,24 @@ def extract_and_clean_tokens(dump_path: str | Path) -> Iterator[str]:
         )
 
 
+def extract_and_clean_tokens(dump_path: str | Path) -> Iterator[str]:
+    """Flujo de tokens de un dump de MediaWiki (ver extract_wiki_token_batches)."""
+    for tokens in extract_wiki_token_batches(dump_path):
+        yield from tokens
+
+
+def iter_token_batches(source: str | Path) -> Iterator[list[str]]:
+    """
+    Lotes de tokens de un corpus: dumps de MediaWiki, texto plano o
+    comprimido, o un directorio con cualquier mezcla de ellos.
+    """
+    for path in iter_corpus_files(source):
+        if is_wiki_dump(path):
+            yield from extract_wiki_token_batches(path)
+        else:
+            yield from text_token_batches(path)
+
+
 # --- 3. CONTEO DE FRECUENCIAS ---
 
 
@@ -152,13 +202,22 @@ def calculate_probabilities(
 # --- 5. ORQUESTACIÓN Y GUARDADO ---
 
 
-def main():
+def main(
+    locale: str = "es",
+    source: str | Path | None = None,
+    output_filename: str | Path | None = None,
+):
+    """
+    :param source: corpus (ver iter_token_batches); por defecto el dump de `locale`
+    :param output_filename: por defecto matrix_path(locale)
+    """
     # 1. Pipeline de Extracción y Conteo
-    token_stream = extract_and_clean_tokens(DUMP_PATH)
+    token_batches = iter_token_batches(dump_path(locale) if source is None else source)
+    output_filename = Path(matrix_path(locale) if output_filename is None else output_filename)
 
     # Manejar el caso donde el generador no produce tokens (ej. error en el parseo)
     try:
-        unigrams, bigrams = count_frequencies(token_stream)
+        unigrams, bigrams = count_token_batches(token_batches)
     except (OSError, ValueError, AttributeError, KeyError):
         # Si el error ocurrió dentro de extract_and_clean_tokens, ya se imprimió un error crítico.
         # Salimos de main.
@@ -180,19 +239,19 @@ def main():
     # 3. Guardado en Disco (UJSON para archivos grandes)
     print(f"Guardando la matriz de {len(p_matrix)} entradas...")
 
-    # Crear el directorio data si no existe
-    data_dir.mkdir(parents=True, exist_ok=True)
+    # Crear el directorio de salida si no existe
+    output_filename.parent.mkdir(parents=True, exist_ok=True)
 
     try:
-        with OUTPUT_FILENAME.open("w", encoding="utf-8") as f:
+        with output_filename.open("w", encoding="utf-8") as f:
             # indent=4 para legibilidad; si la matriz es gigante, quítalo
             json.dump(p_matrix, f, ensure_ascii=False, indent=4)
-        print(f"✅ ¡Proceso completado! Matriz guardada en: {OUTPUT_FILENAME}")
+        print(f"✅ ¡Proceso completado! Matriz guardada en: {output_filename}")
     except OSError as e:
         print(f"Error al guardar el archivo: {e}")
 
 
-class LanguageModel:
+class LanguageModel(Freezable):
     """
     Carga la matriz P_matrix_transicion.json y expone
     get_transition_log_prob(prev, curr) que devuelve log P(curr | prev).
@@ -250,6 +309,14 @@ class LanguageModel:
             self.bigram_log_probs[clean_prev_word] = inner
 
         self.vocab = vocab
+
+        # Vocabulario compartido (ver attach_vocabulary); mientras sea None
+        # las consultas usan los diccionarios de strings
+        self.vocabulary = None
+        self._bigram_keys = None
+        self._bigram_values = None
+        self._stride = 0
+
         # Distribución inicial aproximada para <START>: uniforme sobre el vocabulario
         if self.vocab:
             self.start_log_prob = -math.log(len(self.vocab))
@@ -264,13 +331,22 @@ class LanguageModel:
         - Si el bigrama existe en la matriz: devolvemos log(p) cargado.
         - Si no existe: devolvemos unk_log_prob (backoff muy bajo).
         """
-        prev_word = prev_word.strip().lower()
-        curr_word = curr_word.strip().lower()
+        prev_word = prev_word.strip()
 
-        # Caso especial: inicio de frase
+        # Caso especial: inicio de frase (antes de pasar a minúsculas, que
+        # convertiría <START> en <start>)
         if prev_word == self.START_TOKEN:
             return self.start_log_prob
 
+        prev_word = prev_word.lower()
+        curr_word = curr_word.strip().lower()
+
+        if self.vocabulary is not None:
+            return self.transition_log_prob_ids(
+                self.vocabulary.id(prev_word),
+                self.vocabulary.id(curr_word),
+            )
+
         # Bigrama observado
         if prev_word in self.bigram_log_probs:
             inner = self.bigram_log_probs[prev_word]
@@ -280,7 +356,164 @@ class LanguageModel:
         # Bigrama no visto
         return self.unk_log_prob
 
+    def attach_vocabulary(self, vocabulary) -> None:
+        """
+        Pasa los bigramas a arrays indexados por los IDs de `vocabulary`.
+
+        Cada bigrama (prev, curr) se guarda como la clave entera
+        prev_id * (len(vocabulary) + 1) + curr_id + 1 en un array ordenado,
+        junto a su log-probabilidad; los diccionarios de strings se liberan.
+        El +1 hace que un ID desconocido (-1) nunca coincida con una clave.
+
+        :raises ValueError: si alguna palabra del LM no está en `vocabulary`
+        """
+        missing = [w for w in self.vocab if w not in vocabulary]
+        if missing:
+            msg = f"{len(missing)} palabras del LM no están en el vocabulario, ej: {missing[0]!r}"
+            raise ValueError(msg)
+
+        stride = len(vocabulary) + 1
+        ids = vocabulary.ids
+        keys = []
+        values = []
+        for prev_word, inner in self._iter_bigram_rows():
+            base = ids[prev_word] * stride + 1
+            keys.extend(base + ids[w] for w in inner)
+            values.extend(inner.values())
+
+        # Centinela al final: searchsorted nunca se sale del array
+        keys.append(np.iinfo(np.int64).max)
+        values.append(self.unk_log_prob)
+
+        keys = np.array(keys, dtype=np.int64)
+        order = np.argsort(keys)
+        self.attach_arrays(vocabulary, keys[order], np.array(values, dtype=np.float64)[order])
+
+    def attach_arrays(self, vocabulary, keys, values) -> None:
+        """
+        Adopta arrays de bigramas ya construidos (los de attach_vocabulary).
+
+        :param keys: claves ordenadas, con el centinela al final
+        :param values: log-probabilidad de cada clave
+        """
+        self._bigram_keys = keys
+        self._bigram_values = values
+        self._stride = len(vocabulary) + 1
+        self.vocabulary = vocabulary
+        self.bigram_log_probs = {}
+
+    def save_arrays(self, directory: Path | str) -> None:
+        """
+        Guarda los arrays de bigramas como .npy, para abrirlos con from_arrays.
+
+        :raises ValueError: si todavía no se llamó a attach_vocabulary
+        """
+        if self.vocabulary is None:
+            msg = "save_arrays necesita un vocabulario adjunto (attach_vocabulary)"
+            raise ValueError(msg)
+        directory = Path(directory)
+        np.save(directory / BIGRAM_KEYS_FILENAME, self._bigram_keys)
+        np.save(directory / BIGRAM_VALUES_FILENAME, self._bigram_values)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        directory: Path | str,
+        vocabulary,
+        *,
+        start_log_prob: float,
+        unk_log_prob: float = -15.0,
+        mmap_mode: str | None = "r",
+    ) -> "LanguageModel":
+        """
+        LanguageModel sobre los arrays que escribió save_arrays.
+
+        Con mmap_mode="r" los arrays quedan mapeados en memoria y de solo
+        lectura: no se copian al heap y todos los procesos que abren los
+        mismos archivos comparten sus páginas a través del sistema operativo.
+
+        :param vocabulary: el Vocabulary con el que se guardaron los arrays
+        :param start_log_prob: el start_log_prob del modelo original
+        """
+        directory = Path(directory)
+        model = cls.__new__(cls)
+        model.unk_log_prob = unk_log_prob
+        model.START_TOKEN = START_TOKEN
+        model.start_log_prob = start_log_prob
+        model.vocab = set(vocabulary)
+        model.attach_arrays(
+            vocabulary,
+            np.load(directory / BIGRAM_KEYS_FILENAME, mmap_mode=mmap_mode),
+            np.load(directory / BIGRAM_VALUES_FILENAME, mmap_mode=mmap_mode),
+        )
+        return model
+
+    def _frozen_arrays(self):
+        return (self._bigram_keys, self._bigram_values)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes de los arrays de bigramas (0 si aún no hay vocabulario)."""
+        if self.vocabulary is None:
+            return 0
+        return self._bigram_keys.nbytes + self._bigram_values.nbytes
+
+    def _iter_bigram_rows(self):
+        """(prev, {curr: log_p}) desde los diccionarios o, si ya se liberaron, desde los arrays."""
+        if self.vocabulary is None:
+            yield from self.bigram_log_probs.items()
+            return
+
+        words = self.vocabulary.words
+        prev_ids, curr_ids = np.divmod(self._bigram_keys[:-1] - 1, self._stride)
+        values = self._bigram_values[:-1]
+        bounds = np.flatnonzero(np.diff(prev_ids)) + 1
+        for rows in np.split(np.arange(len(prev_ids)), bounds):
+            if len(rows):
+                yield words[prev_ids[rows[0]]], {
+                    words[c]: v
+                    for c, v in zip(
+                        curr_ids[rows].tolist(),
+                        values[rows].tolist(),
+                        strict=True,
+                    )
+                }
+
+    def transition_log_prob_ids(self, prev_id: int, curr_id: int) -> float:
+        """get_transition_log_prob por IDs del vocabulario compartido."""
+        if prev_id == START_ID:
+            return self.start_log_prob
+        key = prev_id * self._stride + curr_id + 1
+        pos = self._bigram_keys.searchsorted(key)
+        if self._bigram_keys[pos] == key:
+            return float(self._bigram_values[pos])
+        return self.unk_log_prob
+
+    def transition_block(self, prev_ids, curr_ids):
+        """
+        Matriz (len(prev_ids), len(curr_ids)) de log P(curr | prev) por ID.
+
+        Equivale a get_transition_log_prob para cada par, con una sola
+        búsqueda binaria vectorizada sobre las claves de bigrama.
+        """
+        prev_ids = np.asarray(prev_ids, dtype=np.int64)
+        flat = prev_ids[:, None] * self._stride + (np.asarray(curr_ids, dtype=np.int64) + 1)
+        pos = self._bigram_keys.searchsorted(flat)
+        block = np.where(
+            self._bigram_keys[pos] == flat,
+            self._bigram_values[pos],
+            self.unk_log_prob,
+        )
+        if START_ID in prev_ids:
+            block[prev_ids == START_ID] = self.start_log_prob
+        return block
 
 if __name__ == "__main__":
-    main()
-    main()
+    parser = argparse.ArgumentParser(
+        description="Construye la matriz de transición desde un dump de Wikipedia o un corpus de texto.",
+    )
+    parser.add_argument("source", nargs="?", help="archivo o directorio (por defecto, el dump del idioma)")
+    parser.add_argument("--locale", default="es")
+    parser.add_argument("-o", "--output", help="por defecto data/P_matrix_transicion[.locale].json")
+    args = parser.parse_args()
+    main(args.locale, args.source, args.output)
@@ -0,0 +1,335 @@
+"""
+Registro de idiomas: un proceso sirve varios idiomas con modelos compartidos.
+
+Cada idioma (locale) se compila una vez en un directorio de artefactos:
+
+- language.json: las palabras del Vocabulary compartido (primero las del
+  teclado, en su orden de frecuencia), la distribución de teclado y los
+  parámetros del LM.
+- bigram_keys.npy / bigram_values.npy: los arrays de bigramas del LM.
+
+LanguageRegistry carga cada idioma la primera vez que se pide y abre los
+.npy con mmap: no se copian al heap y los procesos (workers) que abren el
+mismo directorio comparten sus páginas a través del sistema operativo.
+Si los idiomas cargados superan memory_budget, se descarta el que lleva más
+tiempo sin usarse.
+"""
+
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import NamedTuple
+
+import ujson as json
+from wordfreq import top_n_list
+
+from hmm_smart_keyboard.keyboard_model import KeyboardModel
+from hmm_smart_keyboard.language_model import LanguageModel, matrix_path
+from hmm_smart_keyboard.viterbi_decoder import ViterbiDecoder
+from hmm_smart_keyboard.vocabulary import Vocabulary
+
+ARTIFACTS_DIR = Path(__file__).resolve().parent / "data" / "languages"
+
+# Memoria máxima de los idiomas cargados, en bytes
+DEFAULT_MEMORY_BUDGET = 512 * 2**20
+
+# Heap aproximado por palabra del vocabulario (KeyboardModel + Vocabulary,
+# medido con tracemalloc); los arrays mapeados se cuentan por su tamaño
+HEAP_BYTES_PER_WORD = 256
+
+# Cambia si cambia el formato de los artefactos; load_language rechaza los viejos
+ARTIFACT_VERSION = 1
+
+METADATA_FILENAME = "language.json"
+
+
+@dataclass(frozen=True)
+class LanguageSpec:
+    """
+    De dónde salen los modelos de un idioma.
+
+    - wordfreq_lang: idioma de top_n_list para el vocabulario del teclado.
+    - layout: distribución de teclado por defecto (ver keyboard_layouts.LAYOUTS).
+    - matrix: matriz de transición JSON (language_model.main); None usa
+      language_model.matrix_path(locale).
+    """
+
+    wordfreq_lang: str
+    layout: str
+    vocab_size: int = 20000
+    matrix: str | None = None
+
+
+# Idiomas conocidos. El teclado ABNT2 (pt-BR) tiene la ç donde el español
+# tiene la ñ, así que qwerty_es es la geometría más cercana
+LANGUAGES: dict[str, LanguageSpec] = {
+    "es": LanguageSpec("es", "qwerty_es"),
+    "en": LanguageSpec("en", "qwerty_us"),
+    "pt": LanguageSpec("pt", "qwerty_es"),
+}
+
+
+def register_language(locale: str, spec: LanguageSpec) -> None:
+    """Registra (o reemplaza) un idioma."""
+    LANGUAGES[locale] = spec
+
+
+class LanguageBundle(NamedTuple):
+    """Modelos cargados de un idioma."""
+
+    locale: str
+    keyboard_model: KeyboardModel
+    language_model: LanguageModel
+    vocabulary: Vocabulary
+    decoder: ViterbiDecoder
+    nbytes: int  # Estimación: heap del teclado + arrays mapeados del LM
+
+
+def compile_language(
+    locale: str,
+    root: Path | str = ARTIFACTS_DIR,
+    spec: LanguageSpec | None = None,
+    language_model: LanguageModel | None = None,
+) -> Path:
+    """
+    Compila los artefactos de `locale` en root/locale.
+
+    Cada compilación se escribe en su propio directorio de versión
+    (root/.locale.v<ns>) y root/locale es un symlink que se cambia con
+    os.replace, que es atómico: quien lee el registro ve la versión
+    anterior completa o la nueva completa, nunca un idioma a medio escribir
+    ni ausente. La versión reemplazada se conserva hasta la siguiente
+    compilación, para los lectores que todavía la estén cargando.
+
+    :param spec: si es None, se usa LANGUAGES[locale]
+    :param language_model: LM ya cargado (se le adjunta el vocabulario);
+                           si es None se lee la matriz del spec
+    :return: el directorio del idioma
+    """
+    spec = _resolve_spec(locale, spec)
+    if language_model is None:
+        language_model = LanguageModel(spec.matrix or matrix_path(locale))
+
+    keyboard_words = top_n_list(spec.wordfreq_lang, spec.vocab_size)
+    vocabulary = Vocabulary.build(keyboard_words, language_model.vocab)
+    language_model.attach_vocabulary(vocabulary)
+
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    target = root / locale
+    tmp = Path(tempfile.mkdtemp(prefix=f".{locale}.tmp.", dir=root))
+    try:
+        language_model.save_arrays(tmp)
+        metadata = {
+            "version": ARTIFACT_VERSION,
+            "locale": locale,
+            "layout": spec.layout,
+            "keyboard_words": vocabulary.coverage["keyboard_words"],
+            "start_log_prob": language_model.start_log_prob,
+            "unk_log_prob": language_model.unk_log_prob,
+            "words": vocabulary.words[1:],
+        }
+        with (tmp / METADATA_FILENAME).open("w", encoding="utf-8") as f:
+            json.dump(metadata, f, ensure_ascii=False)
+
+        version = tmp.rename(root / f".{locale}.v{time.time_ns()}")
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    _publish(target, version)
+    return target
+
+
+def _publish(target: Path, version: Path) -> None:
+    """Apunta el symlink `target` a `version` y borra las versiones viejas."""
+    if target.exists() and not target.is_symlink():
+        # Artefactos de antes de los symlinks: se apartan como una versión
+        # más (esta migración, solo la primera vez, no es atómica)
+        target.rename(target.with_name(f".{target.name}.v0"))
+    previous = target.resolve() if target.is_symlink() else None
+
+    link = version.with_name(f"{version.name}.link")
+    link.symlink_to(version.name)
+    link.replace(target)  # os.replace: atómico
+
+    for old in target.parent.glob(f".{target.name}.v*"):
+        if old.is_dir() and old not in (version, previous):
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def load_language(directory: Path | str, mmap_mode: str | None = "r") -> LanguageBundle:
+    """
+    Abre los artefactos que escribió compile_language.
+
+    :raises ValueError: si los artefactos son de otra ARTIFACT_VERSION
+    """
+    # Resolver el symlink una vez: todos los archivos salen de la misma versión
+    directory = Path(directory).resolve()
+    with (directory / METADATA_FILENAME).open("r", encoding="utf-8") as f:
+        metadata = json.load(f)
+    if metadata["version"] != ARTIFACT_VERSION:
+        msg = (
+            f"Artefactos de {directory} en versión {metadata['version']}, "
+            f"se esperaba {ARTIFACT_VERSION}"
+        )
+        raise ValueError(msg)
+
+    words = metadata["words"]
+    vocabulary = Vocabulary(words)
+    lm = LanguageModel.from_arrays(
+        directory,
+        vocabulary,
+        start_log_prob=metadata["start_log_prob"],
+        unk_log_prob=metadata["unk_log_prob"],
+        mmap_mode=mmap_mode,
+    )
+    # Las palabras del teclado son el principio del vocabulario, en su orden
+    km = KeyboardModel(words[:metadata["keyboard_words"]], layout=metadata["layout"])
+    km.attach_vocabulary(vocabulary)
+    # El registro comparte el bundle entre hilos: los modelos quedan de solo lectura
+    lm.freeze()
+    km.freeze()
+
+    return LanguageBundle(
+        metadata["locale"],
+        km,
+        lm,
+        vocabulary,
+        ViterbiDecoder(language_model=lm, keyboard_model=km),
+        lm.nbytes + HEAP_BYTES_PER_WORD * len(vocabulary),
+    )
+
+
+def _resolve_spec(locale, spec):
+    if spec is not None:
+        return spec
+    if locale not in LANGUAGES:
+        msg = f"Idioma desconocido: {locale!r}"
+        raise KeyError(msg)
+    return LANGUAGES[locale]
+
+
+class LanguageRegistry:
+    """
+    Modelos por idioma, cargados bajo demanda y descartados por LRU.
+
+    Es seguro entre hilos. Cargar (o compilar) un idioma se hace fuera del
+    lock del registro, con un lock por idioma: los aciertos de los demás
+    idiomas no esperan, y dos peticiones del mismo idioma frío lo cargan una
+    sola vez. Un idioma descartado sigue siendo válido para quien ya tenía
+    su LanguageBundle; solo deja de estar en el registro.
+    """
+
+    def __init__(
+        self,
+        root: Path | str = ARTIFACTS_DIR,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+        *,
+        compile_missing: bool = True,
+    ):
+        """
+        :param root: directorio con un subdirectorio de artefactos por idioma
+        :param memory_budget: bytes (estimados) que pueden ocupar los idiomas
+                              cargados; siempre queda al menos uno
+        :param compile_missing: compilar desde LANGUAGES los idiomas sin artefactos
+        """
+        self.root = Path(root)
+        self.memory_budget = memory_budget
+        self.compile_missing = compile_missing
+        self._loaded: OrderedDict[str, LanguageBundle] = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: dict[str, threading.Lock] = {}  # idioma -> lock de su carga
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def __contains__(self, locale):
+        return locale in self._loaded
+
+    def __len__(self):
+        return len(self._loaded)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(bundle.nbytes for bundle in self._loaded.values())
+
+    def get(self, locale: str) -> LanguageBundle:
+        """
+        Modelos de `locale`, cargándolos (o compilándolos) si hace falta.
+
+        :raises KeyError: si no hay artefactos y el idioma no está en LANGUAGES
+        """
+        with self._lock:
+            bundle = self._hit(locale)
+            if bundle is not None:
+                return bundle
+            loading = self._loading.setdefault(locale, threading.Lock())
+
+        with loading:
+            # Mientras esperábamos, otro hilo pudo haberlo cargado
+            with self._lock:
+                bundle = self._hit(locale)
+            if bundle is not None:
+                return bundle
+
+            try:
+                bundle = self._load(locale)
+            except BaseException:
+                with self._lock:
+                    self._loading.pop(locale, None)
+                raise
+
+            # En la misma sección: quien llegue después ya lo encuentra cargado
+            with self._lock:
+                self._loaded[locale] = bundle
+                self._loading.pop(locale, None)
+                self.loads += 1
+                self._evict()
+            return bundle
+
+    def _hit(self, locale):
+        bundle = self._loaded.get(locale)
+        if bundle is not None:
+            self._loaded.move_to_end(locale)
+            self.hits += 1
+        return bundle
+
+    def _load(self, locale):
+        directory = self.root / locale
+        if not (directory / METADATA_FILENAME).exists():
+            if not self.compile_missing:
+                msg = f"No hay artefactos para el idioma {locale!r} en {self.root}"
+                raise KeyError(msg)
+            compile_language(locale, self.root)
+        return load_language(directory)
+
+    def decoder(self, locale: str) -> ViterbiDecoder:
+        """ViterbiDecoder de `locale` (ver get)."""
+        return self.get(locale).decoder
+
+    def evict(self, locale: str) -> bool:
+        """Descarta `locale` del registro; False si no estaba cargado."""
+        with self._lock:
+            return self._loaded.pop(locale, None) is not None
+
+    def _evict(self):
+        while len(self._loaded) > 1 and self.nbytes > self.memory_budget:
+            self._loaded.popitem(last=False)
+            self.evictions += 1
+
+    def report(self) -> dict:
+        """Resumen de uso, como CandidateCache.report."""
+        requests = self.hits + self.loads
+        return {
+            "loaded": list(self._loaded),
+            "bytes": self.nbytes,
+            "memory_budget": self.memory_budget,
+            "hits": self.hits,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / requests if requests else 0.0,
+        }
@@ -0,0 +1,242 @@
+"""
+Decodificación con espacios ocultos: palabras unidas o partidas.
+
+ViterbiDecoder confía en los espacios del usuario, así que "laimagen" o
+"ban dera" no tienen arreglo. Aquí cada trozo de texto sin puntuación se
+convierte en un retículo (lattice): sus letras sin espacios, y nodos que
+cubren rangos [inicio, fin) de esas letras. Cada nodo tiene su lista de
+candidatos con su emisión, y un camino del inicio al final del texto es
+una forma de separar las palabras; Viterbi elige el mejor camino y el mejor
+candidato de cada nodo a la vez.
+
+Para que el costo quede cerca del Viterbi por palabras, no se generan
+todos los rangos posibles, solo:
+
+- cada palabra tal como se tecleó;
+- la unión de dos palabras vecinas, si alguna no está en el vocabulario
+  (espacio de más);
+- cada corte de una palabra fuera del vocabulario en dos, si alguna de las
+  dos partes es una palabra del vocabulario (espacio que faltó).
+
+Cada espacio agregado o quitado cuesta space_penalty. Las listas de
+candidatos se calculan una vez por texto de rango.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from hmm_smart_keyboard.segmentation import split_segments
+from hmm_smart_keyboard.utils.text_processing import UPPER, apply_casing
+from hmm_smart_keyboard.viterbi_decoder import DecodeResult
+
+# Costo (en log-probabilidad) de cada espacio que se agrega o se quita
+DEFAULT_SPACE_PENALTY = 4.0
+
+# Emisión mínima de los candidatos de un rango que une o parte palabras.
+# Las emisiones de cadenas largas son permisivas ("vacenadz" -> "vacantes"),
+# así que por defecto solo se aceptan uniones y cortes exactos (salvo tildes).
+DEFAULT_MIN_SPAN_EMISSION = 0.0
+
+
+class LatticeNode(NamedTuple):
+    """Rango [start, end) de letras con sus candidatos."""
+
+    start: int
+    end: int
+    token: int  # Índice de la primera palabra tecleada que cubre
+    exact: bool  # True si el rango es exactamente una palabra tecleada
+    first: bool  # True si empieza donde empieza la palabra tecleada
+    words: list[str]
+    ids: np.ndarray | None
+    emissions: np.ndarray
+    penalty: float
+
+
+class LatticeDecoder:
+    """Corrige errores de teclado y de espacios sobre un ViterbiDecoder."""
+
+    def __init__(
+        self,
+        decoder,
+        space_penalty=DEFAULT_SPACE_PENALTY,
+        min_span_emission=DEFAULT_MIN_SPAN_EMISSION,
+    ):
+        """
+        :param decoder: ViterbiDecoder ya construido; se usan sus modelos,
+                        sus pesos alpha/beta y su compuerta de confianza
+        :param space_penalty: costo de cada espacio agregado o quitado
+        :param min_span_emission: emisión mínima de un candidato que une o
+                                  parte palabras
+        """
+        self.decoder = decoder
+        self.space_penalty = space_penalty
+        self.min_span_emission = min_span_emission
+
+    def solve(self, sentence_dirty, layout=None):
+        """
+        Como ViterbiDecoder.solve, pero las palabras se pueden unir o partir.
+
+        :return: DecodeResult (sin auditoría). La puntuación se conserva; cada
+                 tramo entre signos se reescribe con espacios simples.
+        """
+        segments = split_segments(sentence_dirty)
+        if not segments:
+            return DecodeResult(sentence_dirty, 0.0, audit_data=None)
+
+        parts = []
+        corrected_words = []
+        best_score = 0.0
+        last_end = 0
+        for tokens in segments:
+            words, score = self._solve_segment(tokens, layout)
+            parts.append(sentence_dirty[last_end:tokens[0].start])
+            parts.append(" ".join(words))
+            last_end = tokens[-1].end
+            corrected_words.extend(word.lower() for word in words)
+            best_score += score
+        parts.append(sentence_dirty[last_end:])
+
+        return DecodeResult(
+            "".join(parts),
+            best_score,
+            corrected_words=corrected_words,
+        )
+
+    def _solve_segment(self, tokens, layout):
+        """Mejor separación y corrección de un tramo de palabras."""
+        nodes = self._build_nodes(tokens, layout)
+        path, score = self._viterbi(nodes, sum(len(token.text) for token in tokens))
+        return [self._render(tokens, nodes[n], j) for n, j in path], score
+
+    def _build_nodes(self, tokens, layout):
+        """Rangos candidatos del retículo, en coordenadas de letras sin espacios."""
+        texts = [token.text.lower() for token in tokens]
+        letters = "".join(texts)
+        offsets = np.cumsum([0] + [len(t) for t in texts]).tolist()
+        vocabulary = getattr(self.decoder.lm, "vocabulary", None)
+        known = self.decoder.km.vocabulary
+        # (texto del rango, exacto, texto anterior) -> (palabras, ids, emisiones)
+        # o None; el anterior cuenta porque la compuerta de confianza depende de él
+        columns = {}
+        nodes = []
+
+        def add(start, end, token, prev_text, n_spaces):
+            exact = start == offsets[token] and end == offsets[token + 1]
+            key = (letters[start:end], exact, prev_text)
+            if key not in columns:
+                scored, _ = self.decoder.candidate_column(prev_text, key[0], layout)
+                if not exact:
+                    scored = [
+                        (w, e) for w, e in scored
+                        if e >= self.min_span_emission and w in known
+                    ]
+                words = [w for w, _ in scored]
+                columns[key] = (
+                    words,
+                    vocabulary.encode(words) if vocabulary is not None else None,
+                    np.array([e for _, e in scored], dtype=np.float64),
+                ) if words else None
+            column = columns[key]
+            if column is None:
+                return False
+            nodes.append(LatticeNode(
+                start,
+                end,
+                token,
+                exact,
+                start == offsets[token],
+                *column,
+                n_spaces * self.space_penalty,
+            ))
+            return True
+
+        prev_text = self.decoder.START_TOKEN
+        for k, text in enumerate(texts):
+            start, end = offsets[k], offsets[k + 1]
+            add(start, end, k, prev_text, 0)
+
+            # Espacio de más: unir con la palabra siguiente
+            if k + 1 < len(texts) and not (text in known and texts[k + 1] in known):
+                add(start, offsets[k + 2], k, prev_text, 1)
+
+            # Espacio que faltó: partir la palabra en dos
+            if text not in known:
+                for cut in range(1, len(text)):
+                    left, right = text[:cut], text[cut:]
+                    if (left in known or right in known) and add(start, start + cut, k, prev_text, 1):
+                        add(start + cut, end, k, left, 0)
+            prev_text = text
+
+        return nodes
+
+    def _viterbi(self, nodes, n_chars):
+        """
+        Mejor camino por el retículo.
+
+        :return: ([(nodo, candidato), ...], puntaje)
+        """
+        decoder = self.decoder
+        order = sorted(range(len(nodes)), key=lambda n: (nodes[n].end, nodes[n].start))
+        ending_at = {}
+        scores = [None] * len(nodes)
+        back = [None] * len(nodes)
+
+        for n in order:
+            node = nodes[n]
+            local = decoder.beta * node.emissions - node.penalty
+            if node.start == 0:
+                scores[n] = local
+            else:
+                best = np.full(len(node.words), -np.inf)
+                best_from = np.zeros((len(node.words), 2), dtype=np.int64)
+                for m in ending_at.get(node.start, ()):
+                    total = scores[m][:, None] + decoder.alpha * self._transitions(nodes[m], node)
+                    arg = total.argmax(axis=0)
+                    candidate = total[arg, np.arange(len(node.words))]
+                    better = candidate > best
+                    best[better] = candidate[better]
+                    best_from[better, 0] = m
+                    best_from[better, 1] = arg[better]
+                if not np.isfinite(best).any():
+                    continue  # Nadie termina donde empieza este nodo
+                scores[n] = best + local
+                back[n] = best_from
+            ending_at.setdefault(node.end, []).append(n)
+
+        finals = [n for n in ending_at.get(n_chars, ()) if scores[n] is not None]
+        n = max(finals, key=lambda f: scores[f].max())
+        j = int(scores[n].argmax())
+        best_score = float(scores[n][j])
+
+        path = [(n, j)]
+        while back[n] is not None:
+            n, j = (int(x) for x in back[n][j])
+            path.append((n, j))
+        path.reverse()
+        return path, best_score
+
+    def _transitions(self, prev_node, node):
+        """Matriz (candidatos de prev_node x candidatos de node) de log P(actual | prev)."""
+        if node.ids is not None:
+            return self.decoder.lm.transition_block(prev_node.ids, node.ids)
+        return np.array(
+            [
+                [self.decoder.lm.get_transition_log_prob(p, c) for c in node.words]
+                for p in prev_node.words
+            ],
+            dtype=np.float64,
+        )
+
+    @staticmethod
+    def _render(tokens, node, j):
+        """Palabra ganadora con las mayúsculas de la palabra tecleada."""
+        word = node.words[j]
+        token = tokens[node.token]
+        if node.exact:
+            return apply_casing(token, word)
+        if token.casing == UPPER:
+            return word.upper()
+        if node.first and token.text[:1].isupper():
+            return word[:1].upper() + word[1:]
+        return word
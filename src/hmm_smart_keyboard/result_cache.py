@@ -0,0 +1,134 @@
+"""
+Caché en memoria de resultados del decodificador.
+
+El tráfico de mensajería repite muchas frases cortas ("ok gracias",
+"buenos días") y muchos comienzos de frase. ViterbiDecoder usa dos cachés
+de esta clase (ver ViterbiDecoder.result_cache y column_cache):
+
+- Frases: palabras normalizadas -> palabras corregidas y puntaje.
+- Columnas: (palabra anterior, palabra) -> columna de candidatos puntuada,
+  que es lo caro de decodificar. Dos frases que empiezan igual comparten
+  las columnas de ese prefijo (y cualquier par repetido más adelante).
+
+Cada caché está acotada por entradas y por bytes (estimados), descarta la
+entrada usada hace más tiempo (LRU) y, si tiene ttl, las que caducan.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MAX_BYTES = 64 * 2**20
+
+
+def approx_nbytes(value) -> int:
+    """Tamaño aproximado de `value` y de lo que contiene (str, números, tuplas, listas, dicts)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        size += sum(approx_nbytes(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(approx_nbytes(k) + approx_nbytes(v) for k, v in value.items())
+    return size
+
+
+class ResultCache:
+    """LRU con TTL opcional, acotada por entradas y bytes, con contadores de uso."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: float | None = None,
+    ):
+        """
+        :param max_entries: entradas máximas
+        :param max_bytes: bytes máximos (según approx_nbytes de clave y valor)
+        :param ttl: segundos de vida de cada entrada (None => sin caducidad)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.nbytes = 0
+        self._entries: OrderedDict = OrderedDict()  # clave -> (valor, bytes, caduca)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """Valor de `key` o None si no está (o caducó)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, nbytes, expires = entry
+            if expires is not None and time.monotonic() >= expires:
+                del self._entries[key]
+                self.nbytes -= nbytes
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value) -> None:
+        """Guarda `value`; si no cabe ni con la caché vacía, no se guarda."""
+        nbytes = approx_nbytes(key) + approx_nbytes(value)
+        if nbytes > self.max_bytes:
+            return
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            self._entries[key] = (value, nbytes, expires)
+            self.nbytes += nbytes
+
+            while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Vacía la caché (p. ej. si cambian los modelos); conserva los contadores."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def report(self) -> dict:
+        """Resumen de aciertos, como CandidateCache.report."""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def __getstate__(self):
+        # El lock no se puede serializar (solve_document manda el
+        # decodificador a otros procesos)
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
@@ -0,0 +1,103 @@
+"""
+Segmentación y decodificación por trozos de documentos largos.
+
+Un documento no se decodifica como una única cadena de palabras: se corta en
+los límites de frase y en la puntuación, cada segmento se decodifica por
+separado (en paralelo entre procesos) y el resultado se reconstruye sobre el
+texto original, conservando mayúsculas, puntuación y espacios.
+"""
+
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from hmm_smart_keyboard.utils.text_processing import TOKENIZER, WORD, Token
+
+# Segmentos que cada proceso recibe de una vez
+DEFAULT_CHUNKSIZE = 16
+
+
+def split_segments(text: str) -> list[list[Token]]:
+    """
+    Agrupa las palabras de `text` en segmentos sin puntuación entre ellas.
+
+    Cualquier token que no sea palabra (puntuación, número o salto de línea)
+    corta el contexto. Cada segmento es una frase o cláusula que se puede
+    decodificar sola.
+    """
+    segments: list[list[Token]] = []
+    current: list[Token] = []
+
+    for token in TOKENIZER.tokenize(text):
+        if token.kind == WORD:
+            current.append(token)
+        elif current:
+            segments.append(current)
+            current = []
+
+    if current:
+        segments.append(current)
+    return segments
+
+
+# --- Decodificación en procesos ---
+
+_worker_decoder = None
+
+
+def _init_worker(decoder) -> None:
+    """Recibe el decodificador una sola vez por proceso."""
+    global _worker_decoder  # noqa: PLW0603
+    _worker_decoder = decoder
+
+
+def _decode_segment(args) -> list[str]:
+    words, layout = args
+    return _decode_words(_worker_decoder, words, layout)
+
+
+def _decode_words(decoder, words, layout) -> list[str]:
+    result = decoder.solve(" ".join(words), layout=layout, audit=False)
+    return result.corrected_words
+
+
+def decode_document(
+    decoder,
+    text: str,
+    layout=None,
+    max_workers: int | None = None,
+    executor: Executor | None = None,
+) -> str:
+    """
+    Corrige un documento completo segmento a segmento.
+
+    :param decoder: ViterbiDecoder ya construido
+    :param layout: distribución de teclado de esta petición
+    :param max_workers: procesos a usar (None => os.cpu_count()); con 1 se
+                        decodifica en el proceso actual
+    :param executor: executor propio (p. ej. uno ya inicializado y reutilizado
+                     entre documentos); debe tener el decodificador cargado
+                     con _init_worker
+    :return: texto corregido con la puntuación, espacios y mayúsculas originales
+    """
+    segments = split_segments(text)
+    if not segments:
+        return text
+
+    tasks = [([token.text.lower() for token in segment], layout) for segment in segments]
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+
+    if executor is not None:
+        decoded = list(executor.map(_decode_segment, tasks, chunksize=DEFAULT_CHUNKSIZE))
+    elif workers <= 1:
+        decoded = [_decode_words(decoder, words, layout) for words, layout in tasks]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(decoder,),
+        ) as pool:
+            decoded = list(pool.map(_decode_segment, tasks, chunksize=DEFAULT_CHUNKSIZE))
+
+    tokens = [token for segment in segments for token in segment]
+    corrected = [word for words in decoded for word in words]
+    return TOKENIZER.rebuild(text, tokens, corrected)
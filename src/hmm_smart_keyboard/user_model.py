@@ -0,0 +1,511 @@
+"""
+Diccionario personal y bigramas del usuario sobre los modelos base.
+
+El vocabulario y los bigramas del LM se construyen una vez y no cambian, así
+que los nombres o la jerga del usuario siempre se "corrigen". UserModel
+guarda solo lo propio de cada usuario: conteos de palabras y de bigramas de
+las correcciones que aceptó. UserKeyboardModel y UserLanguageModel envuelven
+los modelos base (que no se modifican) y mezclan esos conteos al consultar:
+
+- Teclado: las palabras del usuario entran como candidatos extra de su
+  bucket (primera letra, longitud).
+- LM: P(actual | anterior) = (1 - weight) * P_base + weight * P_usuario, con
+  P_usuario suavizada hacia la frecuencia de cada palabra del usuario.
+
+Cada actualización es O(1): sube unos contadores y agrega una línea a un
+log que solo crece. Cada compact_every actualizaciones el log se pliega en
+una instantánea nueva (generación + 1) y se empieza otro log; una caída a
+mitad de la compactación deja la generación anterior intacta.
+"""
+
+import math
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import ujson as json
+
+from hmm_smart_keyboard.constants import START_TOKEN
+from hmm_smart_keyboard.vocabulary import UNKNOWN_ID
+
+# Peso de los bigramas del usuario frente a los del LM base
+DEFAULT_USER_WEIGHT = 0.3
+
+# Conteos "virtuales" con los que P_usuario(actual | anterior) se apoya en la
+# frecuencia de la palabra cuando hay pocos bigramas de `anterior`
+DEFAULT_USER_SMOOTHING = 2.0
+
+# Actualizaciones entre compactaciones del log
+DEFAULT_COMPACT_EVERY = 1000
+
+# Bigramas nuevos que UserLanguageModel acumula en un dict antes de
+# fundirlos en su array ordenado
+RECENT_LIMIT = 64
+
+# Clave entera de un bigrama por IDs: prev_id * KEY_STRIDE + curr_id
+KEY_STRIDE = 1 << 32
+
+SNAPSHOT_NAME = "snapshot.json"
+
+
+class UserModel:
+    """Conteos de palabras y bigramas de un usuario, con persistencia opcional."""
+
+    def __init__(self, path=None, compact_every=DEFAULT_COMPACT_EVERY):
+        """
+        :param path: directorio donde persistir (None => solo en memoria)
+        :param compact_every: actualizaciones del log antes de compactarlo
+        """
+        self.unigrams: Counter = Counter()
+        self.bigrams: dict[str, Counter] = {}  # anterior -> Counter(actual)
+        self.prev_totals: Counter = Counter()  # anterior -> total de sus bigramas
+        self.total = 0
+
+        # Palabras en orden de llegada (para IDs estables en UserVocabulary)
+        self.words: list[str] = []
+        # Funciones (anterior, palabra, conteo) que se llaman en cada
+        # actualización; así los overlays mantienen sus índices en O(1)
+        self.listeners: list = []
+
+        self.path = None if path is None else Path(path)
+        self.compact_every = compact_every
+        self.generation = 0
+        self.pending = 0  # Actualizaciones en el log desde la última compactación
+        self._log = None
+
+        if self.path is not None:
+            self._load()
+
+    def __contains__(self, word):
+        return word in self.unigrams
+
+    def __len__(self):
+        return len(self.words)
+
+    def add_word(self, word: str) -> None:
+        """Agrega una palabra al diccionario personal (sin contexto)."""
+        word = word.strip().lower()
+        if word:
+            self._apply("", word)
+            self._append("", word)
+
+    def observe(self, prev_word: str, word: str) -> None:
+        """Registra que el usuario escribió `word` después de `prev_word`."""
+        word = word.strip().lower()
+        if not word:
+            return
+        prev_word = prev_word if prev_word == START_TOKEN else prev_word.strip().lower()
+        self._apply(prev_word, word)
+        self._append(prev_word, word)
+
+    def accept(self, words) -> None:
+        """Registra una frase aceptada por el usuario, palabra por palabra."""
+        prev = START_TOKEN
+        for word in words:
+            if word.strip():  # Huecos de un split(" ") no cortan el contexto
+                self.observe(prev, word)
+                prev = word
+
+    def _apply(self, prev_word, word, count=1):
+        if word not in self.unigrams:
+            self.words.append(word)
+        self.unigrams[word] += count
+        self.total += count
+        if prev_word:
+            following = self.bigrams.get(prev_word)
+            if following is None:
+                following = self.bigrams[prev_word] = Counter()
+            following[word] += count
+            self.prev_totals[prev_word] += count
+        for listener in self.listeners:
+            listener(prev_word, word, count)
+
+    # --- Persistencia ---
+
+    def _log_path(self, generation):
+        return self.path / f"updates.{generation}.log"
+
+    def _append(self, prev_word, word):
+        if self.path is None:
+            return
+        if self._log is None:
+            self._log = self._log_path(self.generation).open("a", encoding="utf-8")
+        self._log.write(f"{prev_word}\t{word}\n")
+        self._log.flush()
+        self.pending += 1
+        if self.pending >= self.compact_every:
+            self.compact()
+
+    def _load(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        snapshot = self.path / SNAPSHOT_NAME
+        if snapshot.exists():
+            with snapshot.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.generation = data["generation"]
+            for word, count in data["unigrams"].items():
+                self._apply("", word, count)
+            for prev_word, following in data["bigrams"].items():
+                self.bigrams[prev_word] = Counter(following)
+                self.prev_totals[prev_word] = sum(following.values())
+
+        # Logs de otras generaciones: restos de una compactación interrumpida
+        for stale in self.path.glob("updates.*.log"):
+            if stale != self._log_path(self.generation):
+                stale.unlink()
+
+        log = self._log_path(self.generation)
+        if log.exists():
+            with log.open("r", encoding="utf-8") as f:
+                for line in f:
+                    prev_word, sep, word = line.rstrip("\n").partition("\t")
+                    if sep:  # Una línea cortada por una caída se descarta
+                        self._apply(prev_word, word)
+                        self.pending += 1
+
+    def compact(self) -> None:
+        """Pliega el log en una instantánea nueva y empieza un log vacío."""
+        if self.path is None:
+            return
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+        old_generation = self.generation
+        data = {
+            "generation": old_generation + 1,
+            "unigrams": dict(self.unigrams),
+            "bigrams": {prev: dict(following) for prev, following in self.bigrams.items()},
+        }
+        tmp = self.path / f"{SNAPSHOT_NAME}.tmp"
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        tmp.replace(self.path / SNAPSHOT_NAME)
+
+        self.generation = old_generation + 1
+        self.pending = 0
+        self._log_path(old_generation).unlink(missing_ok=True)
+
+    def close(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def __getstate__(self):
+        # El archivo abierto no viaja a otros procesos; se reabre al escribir
+        state = self.__dict__.copy()
+        state["_log"] = None
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class UserVocabulary:
+    """
+    Vocabulario compartido + palabras del usuario, sin modificar el base.
+
+    Las palabras del usuario que el base no tiene reciben IDs a partir de
+    len(base), en el orden en que se aprendieron.
+    """
+
+    def __init__(self, base, user: UserModel):
+        self.base = base
+        self.user = user
+        self.extra_ids: dict[str, int] = {}
+        self.extra_words: list[str] = []
+        self._synced = 0  # Palabras de user.words ya revisadas
+
+    def _sync(self):
+        """Asigna ID a las palabras que el usuario aprendió desde la última vez."""
+        words = self.user.words
+        if self._synced == len(words):
+            return
+        for word in words[self._synced:]:
+            if word not in self.base:
+                self.extra_ids[word] = len(self.base) + len(self.extra_words)
+                self.extra_words.append(word)
+        self._synced = len(words)
+
+    @property
+    def words(self):
+        self._sync()
+        return self.base.words + self.extra_words
+
+    def __len__(self):
+        self._sync()
+        return len(self.base) + len(self.extra_words)
+
+    def __contains__(self, word):
+        return word in self.base or word in self.user
+
+    def id(self, word: str) -> int:
+        word_id = self.base.ids.get(word)
+        if word_id is not None:
+            return word_id
+        self._sync()
+        return self.extra_ids.get(word, UNKNOWN_ID)
+
+    def encode(self, words):
+        self._sync()
+        get = self.base.ids.get
+        extra = self.extra_ids.get
+        return np.array(
+            [get(w, extra(w, UNKNOWN_ID)) for w in words],
+            dtype=np.int64,
+        )
+
+    def word(self, word_id: int) -> str | None:
+        """Palabra de un ID (None para UNKNOWN_ID)."""
+        if word_id < 0:
+            return None
+        if word_id < len(self.base):
+            return self.base.words[word_id]
+        return self.extra_words[word_id - len(self.base)]
+
+
+class UserLanguageModel:
+    """
+    LanguageModel base + bigramas del usuario, mezclados al consultar.
+
+    Con vocabulario compartido, los conteos del usuario se guardan además
+    por ID (arrays de unigramas y de totales por palabra anterior, y los
+    bigramas como claves enteras ordenadas) para que transition_block sea
+    una búsqueda vectorizada, como en el LM base. Los bigramas nuevos
+    esperan en un dict pequeño hasta que se funden con el array.
+    """
+
+    def __init__(
+        self,
+        base,
+        user: UserModel,
+        weight=DEFAULT_USER_WEIGHT,
+        smoothing=DEFAULT_USER_SMOOTHING,
+    ):
+        self.base = base
+        self.user = user
+        self.weight = weight
+        self.smoothing = smoothing
+        self.vocabulary = None
+        if base.vocabulary is None:
+            return
+
+        self.vocabulary = UserVocabulary(base.vocabulary, user)
+        size = len(self.vocabulary) + 1
+        self._unigrams = np.zeros(size)
+        self._prev_totals = np.zeros(size)
+        self._keys = np.array([np.iinfo(np.int64).max], dtype=np.int64)  # Centinela
+        self._counts = np.zeros(1)
+        self._recent: dict[int, float] = {}
+        self._recent_arrays = None
+
+        for word, count in user.unigrams.items():
+            self._count_word(word, count)
+        for prev_word, following in user.bigrams.items():
+            for word, count in following.items():
+                self._count_bigram(prev_word, word, count)
+        self._merge()
+        user.listeners.append(self._on_update)
+
+    def __getattr__(self, name):
+        # El resto (unk_log_prob, start_log_prob, vocab...) es del base;
+        # "base" y los dunder fallan normal (pickle los busca antes de __init__)
+        if name == "base" or name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.base, name)
+
+    # --- Índices por ID ---
+
+    def _on_update(self, prev_word, word, count):
+        self._count_word(word, count)
+        if prev_word:
+            self._count_bigram(prev_word, word, count)
+            if len(self._recent) > RECENT_LIMIT:
+                self._merge()
+
+    def _count_word(self, word, count):
+        word_id = self.vocabulary.id(word)
+        if word_id + 1 >= len(self._unigrams):  # La última celda queda libre para -1
+            size = max(2 * len(self._unigrams), word_id + 2)
+            self._unigrams = np.resize(self._unigrams, size)
+            self._unigrams[word_id:] = 0
+            self._prev_totals = np.resize(self._prev_totals, size)
+            self._prev_totals[word_id:] = 0
+        self._unigrams[word_id] += count
+
+    def _count_bigram(self, prev_word, word, count):
+        prev_id = self.vocabulary.id(prev_word)
+        if prev_id == UNKNOWN_ID:
+            return  # Solo puede ser anterior una palabra que el usuario escribió
+        self._prev_totals[prev_id] += count
+        key = prev_id * KEY_STRIDE + self.vocabulary.id(word)
+        self._recent[key] = self._recent.get(key, 0) + count
+        self._recent_arrays = None
+
+    def _merge(self):
+        """Funde los bigramas recientes en el array ordenado."""
+        if not self._recent:
+            return
+        keys = np.concatenate([self._keys[:-1], np.fromiter(self._recent, dtype=np.int64)])
+        counts = np.concatenate([self._counts[:-1], np.fromiter(self._recent.values(), dtype=np.float64)])
+        keys, inverse = np.unique(keys, return_inverse=True)
+        self._keys = np.append(keys, np.iinfo(np.int64).max)
+        self._counts = np.append(np.bincount(inverse, weights=counts), 0.0)
+        self._recent = {}
+        self._recent_arrays = None
+
+    @staticmethod
+    def _lookup(keys, counts, flat):
+        pos = keys.searchsorted(flat)
+        return np.where(keys[pos] == flat, counts[pos], 0.0)
+
+    def _bigram_counts(self, flat):
+        found = self._lookup(self._keys, self._counts, flat)
+        if self._recent:
+            if self._recent_arrays is None:
+                order = sorted(self._recent)
+                self._recent_arrays = (
+                    np.array([*order, np.iinfo(np.int64).max], dtype=np.int64),
+                    np.array([*(self._recent[k] for k in order), 0.0]),
+                )
+            found += self._lookup(*self._recent_arrays, flat)
+        return found
+
+    # --- Consultas ---
+
+    def _user_prob(self, prev_word, word):
+        """P_usuario(word | prev_word), suavizada con la frecuencia de word."""
+        unigram = self.user.unigrams.get(word, 0) / self.user.total
+        following = self.user.bigrams.get(prev_word)
+        bigram = 0 if following is None else following.get(word, 0)
+        return (bigram + self.smoothing * unigram) / (
+            self.user.prev_totals.get(prev_word, 0) + self.smoothing
+        )
+
+    def get_transition_log_prob(self, prev_word: str, curr_word: str) -> float:
+        base = self.base.get_transition_log_prob(prev_word, curr_word)
+        if not self.user.total:
+            return base
+
+        prev_word = prev_word.strip()
+        if prev_word != START_TOKEN:
+            prev_word = prev_word.lower()
+        user = self._user_prob(prev_word, curr_word.strip().lower())
+        mixed = (1 - self.weight) * math.exp(base) + self.weight * user
+        return math.log(mixed)
+
+    def transition_block(self, prev_ids, curr_ids):
+        """Como LanguageModel.transition_block, con los IDs de UserVocabulary."""
+        prev_ids = np.asarray(prev_ids, dtype=np.int64)
+        curr_ids = np.asarray(curr_ids, dtype=np.int64)
+        n_base = len(self.vocabulary.base)
+        block = self.base.transition_block(
+            np.where(prev_ids < n_base, prev_ids, UNKNOWN_ID),
+            np.where(curr_ids < n_base, curr_ids, UNKNOWN_ID),
+        )
+        if not self.user.total:
+            return block
+
+        # Los IDs desconocidos (-1) leen la última celda, que siempre es 0
+        prev_totals = self._prev_totals[prev_ids]
+        user_probs = np.empty(block.shape)
+        user_probs[:] = self._unigrams[curr_ids] * (self.smoothing / self.user.total)
+
+        # Solo las filas cuya palabra anterior tiene bigramas del usuario
+        rows = np.flatnonzero(prev_totals)
+        if len(rows):
+            flat = prev_ids[rows, None] * KEY_STRIDE + curr_ids[None, :]
+            user_probs[rows] += self._bigram_counts(flat)
+        user_probs /= (prev_totals + self.smoothing)[:, None]
+
+        with np.errstate(divide="ignore"):
+            return np.log((1 - self.weight) * np.exp(block) + self.weight * user_probs)
+
+
+class _UnionVocabulary:
+    """`in` sobre el vocabulario del teclado y el del usuario, sin copiarlos."""
+
+    def __init__(self, base, user):
+        self.base = base
+        self.user = user
+
+    def __contains__(self, word):
+        return word in self.base or word in self.user
+
+    def __iter__(self):
+        yield from self.base
+        yield from (w for w in self.user.words if w not in self.base)
+
+    def __len__(self):
+        return len(self.base) + sum(1 for w in self.user.words if w not in self.base)
+
+
+class UserKeyboardModel:
+    """KeyboardModel base + palabras del usuario como candidatos extra."""
+
+    def __init__(self, base, user: UserModel):
+        self.base = base
+        self.user = user
+        self.vocabulary = _UnionVocabulary(base.vocabulary, user)
+
+        # (primera letra, longitud) -> palabras del usuario que el base no tiene
+        self.buckets: dict[tuple[str, int], list[str]] = {}
+        for word in user.words:
+            self._on_update("", word, 0)
+        user.listeners.append(self._on_update)
+
+    def __getattr__(self, name):
+        if name == "base" or name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.base, name)
+
+    def _on_update(self, _prev_word, word, _count):
+        if not word or word in self.base.vocabulary:
+            return
+        bucket = self.buckets.setdefault((word[0], len(word)), [])
+        if word not in bucket:
+            bucket.append(word)
+
+    def get_scored_candidates(self, dirty_word, limit=20, layout=None, use_cache=True):
+        """
+        Candidatos del base y, además, las palabras del usuario de los mismos
+        buckets (misma primera letra, longitud L-1..L+1) que el base no trae.
+        """
+        scored = self.base.get_scored_candidates(dirty_word, limit, layout, use_cache)
+        dirty_word = dirty_word.strip().lower()
+        if not dirty_word or not self.buckets:
+            return scored
+
+        first, length = dirty_word[0], len(dirty_word)
+        extra = [
+            word
+            for size in (length, length + 1, length - 1)
+            for word in self.buckets.get((first, size), ())
+        ]
+        if not extra:
+            return scored
+
+        present = {word for word, _ in scored}
+        return scored + [
+            (word, self.base.get_emission_log_prob(dirty_word, word, layout=layout))
+            for word in extra
+            if word not in present
+        ]
+
+    def get_candidates(self, dirty_word, limit=20, layout=None):
+        return [w for w, _ in self.get_scored_candidates(dirty_word, limit, layout)]
+
+
+def personalize(keyboard_model, language_model, user: UserModel, weight=DEFAULT_USER_WEIGHT):
+    """
+    Envuelve ambos modelos base con los datos de `user`.
+
+    :return: (UserKeyboardModel, UserLanguageModel), listos para ViterbiDecoder
+    """
+    return (
+        UserKeyboardModel(keyboard_model, user),
+        UserLanguageModel(language_model, user, weight),
+    )
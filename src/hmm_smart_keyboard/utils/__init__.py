@@ -1,14 +1,33 @@
 """Utility modules for HMM Smart Keyboard."""
 
-from .probability import log_probability, normalize_probabilities
-from .text_processing import normalize_text, tokenize
-from .validation import validate_matrix, validate_probabilities
+from .distance import pairwise_distances
+from .probability import (
+    log_probability,
+    log_sum_exp,
+    normalize_probabilities,
+    segment_log_sum_exp,
+)
+from .text_processing import TOKENIZER, Token, Tokenizer, normalize_text, tokenize
+from .validation import (
+    CSRMatrix,
+    validate_csr_stochastic,
+    validate_matrix,
+    validate_probabilities,
+)
 
 __all__ = [
+    "TOKENIZER",
+    "CSRMatrix",
+    "Token",
+    "Tokenizer",
     "log_probability",
+    "log_sum_exp",
     "normalize_probabilities",
     "normalize_text",
+    "pairwise_distances",
+    "segment_log_sum_exp",
     "tokenize",
+    "validate_csr_stochastic",
     "validate_matrix",
     "validate_probabilities",
 ]
@@ -40,6 +40,27 @@ def manhattan_distance(
     return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
 
 
+def pairwise_distances(
+    points_a: npt.ArrayLike,
+    points_b: npt.ArrayLike | None = None,
+) -> npt.NDArray[np.float64]:
+    """
+    Euclidean distances between two sets of points by broadcasting.
+
+    Args:
+        points_a: (n, d) array of points
+        points_b: (m, d) array of points; defaults to points_a
+
+    Returns:
+        (n, m) matrix where element [i, j] is the distance from a[i] to b[j]
+
+    """
+    points_a = np.asarray(points_a, dtype=np.float64)
+    points_b = points_a if points_b is None else np.asarray(points_b, dtype=np.float64)
+    diff = points_a[:, None, :] - points_b[None, :, :]
+    return np.sqrt(np.einsum("ijk,ijk->ij", diff, diff))
+
+
 def get_nearby_keys(
     key_position: tuple[float, float],
     keyboard_layout: dict[str, tuple[float, float]],
@@ -57,15 +78,16 @@ def get_nearby_keys(
         List of (key, distance) tuples for nearby keys
 
     """
-    nearby = []
-    for key, pos in keyboard_layout.items():
-        dist = euclidean_distance(key_position, pos)
-        if dist <= max_distance:
-            nearby.append((key, dist))
+    if not keyboard_layout:
+        return []
+
+    keys = list(keyboard_layout)
+    distances = pairwise_distances([key_position], list(keyboard_layout.values()))[0]
 
-    # Sort by distance
-    nearby.sort(key=lambda x: x[1])
-    return nearby
+    # Stable sort by distance, ties keep the layout order
+    nearby = np.flatnonzero(distances <= max_distance)
+    nearby = nearby[np.argsort(distances[nearby], kind="stable")]
+    return [(keys[i], float(distances[i])) for i in nearby]
 
 
 def calculate_distance_matrix(
@@ -82,15 +104,4 @@ def calculate_distance_matrix(
 
     """
     keys = sorted(keyboard_layout.keys())
-    n = len(keys)
-    distance_matrix = np.zeros((n, n))
-
-    for i, key1 in enumerate(keys):
-        for j, key2 in enumerate(keys):
-            if i != j:
-                distance_matrix[i, j] = euclidean_distance(
-                    keyboard_layout[key1],
-                    keyboard_layout[key2],
-                )
-
-    return distance_matrix
+    return pairwise_distances([keyboard_layout[key] for key in keys])
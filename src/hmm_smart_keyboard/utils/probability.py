@@ -3,6 +3,9 @@
 import numpy as np
 import numpy.typing as npt
 
+# Rows per block in the CSR helpers: bounds the temporaries on huge matrices
+DEFAULT_CHUNK_ROWS = 1 << 16
+
 
 def log_probability(prob: float) -> float:
     """
@@ -90,3 +93,103 @@ def exp_normalize(
 
     exp_probs = np.exp(log_probs - max_log)
     return exp_probs / np.sum(exp_probs)
+
+
+def log_sum_exp(
+    log_probs: npt.NDArray[np.float64],
+    axis: int | None = None,
+) -> npt.NDArray[np.float64] | float:
+    """
+    Batched log-sum-exp: log(sum(exp(log_probs))) along an axis.
+
+    Vectorized counterpart of add_log_probabilities. Slices that are all
+    negative infinity reduce to negative infinity instead of NaN.
+
+    Args:
+        log_probs: Array of log probabilities
+        axis: Axis to reduce (None reduces over all elements)
+
+    Returns:
+        Log of the summed probabilities, with `axis` removed
+
+    """
+    log_probs = np.asarray(log_probs, dtype=np.float64)
+    max_log = np.max(log_probs, axis=axis, keepdims=True)
+    max_log = np.where(np.isfinite(max_log), max_log, 0.0)
+    with np.errstate(divide="ignore"):
+        summed = np.log(np.sum(np.exp(log_probs - max_log), axis=axis, keepdims=True))
+    result = summed + max_log
+    if axis is None:
+        return float(result.reshape(()))
+    return np.squeeze(result, axis=axis)
+
+
+def segment_reduce(
+    ufunc: np.ufunc,
+    values: npt.NDArray[np.float64],
+    indptr: npt.NDArray[np.int64],
+    empty: float,
+) -> npt.NDArray[np.float64]:
+    """
+    Reduce each CSR row (values[indptr[i]:indptr[i + 1]]) with a ufunc.
+
+    Like ufunc.reduceat, but empty rows get `empty` instead of the next
+    row's first element.
+
+    Args:
+        ufunc: Binary ufunc to reduce with (np.add, np.maximum, ...)
+        values: Flat row values, with indptr[0] == 0
+        indptr: Row boundaries, length n_rows + 1
+        empty: Result for rows without values
+
+    Returns:
+        One reduced value per row
+
+    """
+    starts = indptr[:-1]
+    nonempty = starts < indptr[1:]
+    out = np.full(len(starts), empty, dtype=np.float64)
+    if nonempty.any():
+        out[nonempty] = ufunc.reduceat(values, starts[nonempty])
+    return out
+
+
+def segment_log_sum_exp(
+    log_probs: npt.NDArray[np.float64],
+    indptr: npt.NDArray[np.int64],
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> npt.NDArray[np.float64]:
+    """
+    Row-wise log-sum-exp of a CSR matrix of log probabilities.
+
+    Works block by block over `chunk_rows` rows, so memory-mapped inputs
+    are read once and the temporaries never exceed one block. Empty rows
+    reduce to negative infinity.
+
+    Args:
+        log_probs: CSR data array (log probabilities)
+        indptr: CSR row boundaries, length n_rows + 1
+        chunk_rows: Rows per block
+
+    Returns:
+        log(sum(exp(row))) for each row
+
+    """
+    indptr = np.asarray(indptr, dtype=np.int64)
+    n_rows = len(indptr) - 1
+    result = np.empty(n_rows, dtype=np.float64)
+
+    for start in range(0, n_rows, chunk_rows):
+        stop = min(start + chunk_rows, n_rows)
+        offset = indptr[start]
+        local = indptr[start:stop + 1] - offset
+        values = np.asarray(log_probs[offset:indptr[stop]], dtype=np.float64)
+
+        max_log = segment_reduce(np.maximum, values, local, -np.inf)
+        max_log[~np.isfinite(max_log)] = 0.0
+        shifted = values - np.repeat(max_log, np.diff(local))
+        np.exp(shifted, out=shifted)
+        with np.errstate(divide="ignore"):
+            result[start:stop] = np.log(segment_reduce(np.add, shifted, local, 0.0)) + max_log
+
+    return result
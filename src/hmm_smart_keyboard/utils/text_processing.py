@@ -1,6 +1,33 @@
 """Text processing utilities for HMM Smart Keyboard."""
 
 import re
+import unicodedata
+from typing import NamedTuple
+
+# Compiled once at import time; tokenize() is called on every request
+_WHITESPACE_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"\b\w+\b")
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+# One pass over the text: every match is a token, whitespace is skipped
+_TOKEN_RE = re.compile(
+    r"(?P<word>[^\W\d_]+)"
+    r"|(?P<number>\d+(?:[.,]\d+)*)"
+    r"|(?P<break>\r?\n)"
+    r"|(?P<punct>[^\w\s]|_)",
+)
+
+WORD = "word"
+NUMBER = "number"
+BREAK = "break"
+PUNCT = "punct"
+
+LOWER = "lower"
+UPPER = "upper"
+TITLE = "title"
+MIXED = "mixed"
+
+ACCENTED_CHARS = frozenset("áéíóúüÁÉÍÓÚÜ")
 
 
 def normalize_text(
@@ -19,7 +46,7 @@ def normalize_text(
 
     """
     # Remove extra whitespace
-    text = re.sub(r"\s+", " ", text.strip())
+    text = _WHITESPACE_RE.sub(" ", text.strip())
 
     if lowercase:
         text = text.lower()
@@ -44,7 +71,7 @@ def tokenize(
     """
     if by_word:
         # Split by whitespace and punctuation
-        tokens = re.findall(r"\b\w+\b", text.lower())
+        tokens = _WORD_RE.findall(text.lower())
     else:
         # Split into individual characters (excluding whitespace)
         tokens = [char for char in text if not char.isspace()]
@@ -63,7 +90,7 @@ def remove_punctuation(text: str) -> str:
         Text with punctuation removed
 
     """
-    return re.sub(r"[^\w\s]", "", text)
+    return _PUNCTUATION_RE.sub("", text)
 
 
 def get_character_set(text: str) -> set[str]:
@@ -78,3 +105,166 @@ def get_character_set(text: str) -> set[str]:
 
     """
     return {char.lower() for char in text if char.isalpha()}
+
+
+class Token(NamedTuple):
+    """
+    A token and its position in the original string.
+
+    Attributes:
+        text: Token text exactly as typed
+        start: Offset of the first character in the original string
+        end: Offset one past the last character
+        kind: WORD, NUMBER, BREAK (line break) or PUNCT
+        casing: LOWER, UPPER, TITLE or MIXED for words, None otherwise
+        has_accent: Whether the word contains an accented vowel
+
+    """
+
+    text: str
+    start: int
+    end: int
+    kind: str
+    casing: str | None = None
+    has_accent: bool = False
+
+
+def get_casing(word: str) -> str:
+    """
+    Classify how a word is capitalized.
+
+    Args:
+        word: Word to classify
+
+    Returns:
+        LOWER, UPPER (more than one letter, all caps), TITLE or MIXED
+
+    """
+    if word.islower():
+        return LOWER
+    if word.isupper():
+        return UPPER if len(word) > 1 else TITLE
+    if word[0].isupper() and word[1:].islower():
+        return TITLE
+    return MIXED
+
+
+def strip_accents(text: str) -> str:
+    """
+    Remove accents from vowels while keeping ñ.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Text without acute accents or diaeresis
+
+    """
+    decomposed = unicodedata.normalize("NFD", text)
+    stripped = decomposed.replace("\u0301", "").replace("\u0308", "")
+    return unicodedata.normalize("NFC", stripped)
+
+
+def apply_casing(original: Token, corrected: str) -> str:
+    """
+    Give a corrected (lowercase) word the capitalization of the original token.
+
+    Args:
+        original: Word token as typed
+        corrected: Corrected word
+
+    Returns:
+        The corrected word with the original casing; the original text itself
+        when the correction only differs in case, or in the accents of a word
+        typed with accents
+
+    """
+    typed = original.text.lower()
+    if corrected == typed or (
+        original.has_accent and strip_accents(corrected) == strip_accents(typed)
+    ):
+        return original.text
+    if original.casing == UPPER:
+        return corrected.upper()
+    if original.casing == TITLE:
+        return corrected[:1].upper() + corrected[1:]
+    return corrected
+
+
+class Tokenizer:
+    """
+    Reusable tokenizer that keeps offsets into the original string.
+
+    A single regex pass produces word, number, line-break and punctuation
+    tokens with their casing/accent metadata, so callers can correct only
+    the word spans and rebuild the text around them.
+    """
+
+    def tokenize(self, text: str) -> list[Token]:
+        """
+        Split text into tokens with offsets and metadata.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Tokens in order of appearance (whitespace is not a token)
+
+        """
+        tokens = []
+        append = tokens.append
+        unaccented = ACCENTED_CHARS.isdisjoint
+        for match in _TOKEN_RE.finditer(text):
+            kind = match.lastgroup
+            value = match.group()
+            start, end = match.span()
+            if kind == WORD:
+                # Most words are lowercase: skip the get_casing call
+                casing = LOWER if value.islower() else get_casing(value)
+                append(Token(value, start, end, WORD, casing, not unaccented(value)))
+            else:
+                append(Token(value, start, end, kind))
+        return tokens
+
+    def words(self, text: str) -> list[Token]:
+        """
+        Return only the word tokens of a text.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Word tokens in order of appearance
+
+        """
+        return [token for token in self.tokenize(text) if token.kind == WORD]
+
+    @staticmethod
+    def rebuild(
+        text: str,
+        words: list[Token],
+        corrected: list[str],
+    ) -> str:
+        """
+        Replace word spans with their corrections and keep everything else.
+
+        Args:
+            text: Original text
+            words: Word tokens of `text`, in order
+            corrected: Corrected (lowercase) word for each token
+
+        Returns:
+            Text with original punctuation, whitespace and casing
+
+        """
+        parts = []
+        last_end = 0
+        for token, word in zip(words, corrected, strict=True):
+            parts.append(text[last_end:token.start])
+            parts.append(apply_casing(token, word))
+            last_end = token.end
+        parts.append(text[last_end:])
+        return "".join(parts)
+
+
+TOKENIZER = Tokenizer()
@@ -1,10 +1,33 @@
 """Validation utilities for HMM parameters."""
 
+from typing import NamedTuple
+
 import numpy as np
 import numpy.typing as npt
 
+from .probability import DEFAULT_CHUNK_ROWS, segment_reduce
+
 MATRIX_DIMENSION = 2
 
+# Elements per block when scanning flat arrays (memory-mapped ones included)
+DEFAULT_CHUNK_SIZE = 1 << 22
+
+
+class CSRMatrix(NamedTuple):
+    """
+    Compressed sparse row matrix as plain arrays.
+
+    Row i holds data[indptr[i]:indptr[i + 1]] at columns
+    indices[indptr[i]:indptr[i + 1]]. The arrays may be memory-mapped;
+    scipy.sparse CSR matrices have the same attributes and are accepted
+    wherever a CSRMatrix is.
+    """
+
+    data: npt.NDArray[np.float64]
+    indices: npt.NDArray[np.int64]
+    indptr: npt.NDArray[np.int64]
+    shape: tuple[int, int]
+
 
 def validate_matrix(
     matrix: npt.NDArray[np.float64],
@@ -38,32 +61,46 @@ def validate_probabilities(
     probs: npt.NDArray[np.float64] | list[float],
     name: str = "Probabilities",
     allow_zero: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
 ) -> None:
     """
     Validate that values represent valid probabilities.
 
+    Arrays are not copied: the values are scanned block by block with one
+    min/max pass per block, so memory-mapped arrays can be validated too.
+
     Args:
         probs: Probability values to validate
         name: Name for error messages
         allow_zero: Whether to allow zero probabilities
+        chunk_size: Elements per block
 
     Raises:
         ValueError: If probabilities are invalid
 
     """
-    probs = np.array(probs)
+    flat = np.asarray(probs).reshape(-1)
 
-    if np.any(probs < 0):
-        msg = f"{name} cannot contain negative values"
-        raise ValueError(msg)
+    for start in range(0, len(flat), chunk_size):
+        block = flat[start:start + chunk_size]
+        low = block.min()
+        high = block.max()
 
-    if not allow_zero and np.any(probs == 0):
-        msg = f"{name} cannot contain zero values"
-        raise ValueError(msg)
+        if np.isnan(low):
+            msg = f"{name} cannot contain NaN values"
+            raise ValueError(msg)
 
-    if np.any(probs > 1):
-        msg = f"{name} cannot contain values greater than 1"
-        raise ValueError(msg)
+        if low < 0:
+            msg = f"{name} cannot contain negative values"
+            raise ValueError(msg)
+
+        if not allow_zero and low == 0:
+            msg = f"{name} cannot contain zero values"
+            raise ValueError(msg)
+
+        if high > 1:
+            msg = f"{name} cannot contain values greater than 1"
+            raise ValueError(msg)
 
 
 def validate_stochastic_matrix(
@@ -99,6 +136,63 @@ def validate_stochastic_matrix(
         )
 
 
+def validate_csr_stochastic(
+    matrix: CSRMatrix,
+    tolerance: float = 1e-6,
+    name: str = "Matrix",
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> None:
+    """
+    Validate a row-stochastic CSR matrix without densifying it.
+
+    Checks the CSR structure, that every stored value is a probability
+    and that every row sums to 1. Rows are processed in blocks of
+    `chunk_rows`, so memory-mapped matrices are read once and never
+    copied whole.
+
+    Args:
+        matrix: CSRMatrix or scipy.sparse CSR matrix
+        tolerance: Allowed deviation of each row sum from 1
+        name: Name of the matrix for error messages
+        chunk_rows: Rows per block
+
+    Raises:
+        ValueError: If the structure, a value or a row sum is invalid
+
+    """
+    data, indices, indptr = matrix.data, matrix.indices, matrix.indptr
+    n_rows, n_cols = matrix.shape
+
+    if n_rows == 0 or n_cols == 0:
+        msg = f"{name} cannot be empty"
+        raise ValueError(msg)
+
+    if len(indptr) != n_rows + 1 or indptr[0] != 0 or indptr[-1] != len(data) or len(indices) != len(data):
+        msg = f"{name} has an inconsistent CSR structure"
+        raise ValueError(msg)
+
+    for start in range(0, n_rows, chunk_rows):
+        stop = min(start + chunk_rows, n_rows)
+        bounds = np.asarray(indptr[start:stop + 1], dtype=np.int64)
+        if np.any(bounds[1:] < bounds[:-1]):
+            msg = f"{name} has decreasing row pointers near row {start}"
+            raise ValueError(msg)
+
+        values = data[bounds[0]:bounds[-1]]
+        columns = indices[bounds[0]:bounds[-1]]
+        if len(columns) and (columns.min() < 0 or columns.max() >= n_cols):
+            msg = f"{name} has column indices outside [0, {n_cols})"
+            raise ValueError(msg)
+        validate_probabilities(values, name)
+
+        sums = segment_reduce(np.add, values, bounds - bounds[0], 0.0)
+        bad = np.flatnonzero(np.abs(sums - 1.0) > tolerance)
+        if len(bad):
+            row = start + int(bad[0])
+            msg = f"{name} is not stochastic: row {row} sums to {sums[bad[0]]:.6g}"
+            raise ValueError(msg)
+
+
 def validate_dimensions_match(
     arr1: npt.NDArray[np.float64],
     arr2: npt.NDArray[np.float64],
@@ -1,6 +1,131 @@
 import math
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
 
 from hmm_smart_keyboard.constants import START_TOKEN
+from hmm_smart_keyboard.instrumentation import active, instrument
+from hmm_smart_keyboard.segmentation import decode_document
+from hmm_smart_keyboard.utils.probability import exp_normalize, log_sum_exp
+from hmm_smart_keyboard.utils.text_processing import TOKENIZER
+
+
+class DecodeResult:
+    """
+    Resultado de solve.
+
+    audit_data no se calcula durante la decodificación: se genera la primera
+    vez que se lee, a partir de los puntajes que guardó el paso hacia
+    adelante (None si se decodificó con audit=False).
+    """
+
+    __slots__ = (
+        "_audit_builder",
+        "_audit_data",
+        "best_score",
+        "confidences",
+        "corrected_text",
+        "corrected_words",
+        "posteriors",
+        "skipped_tokens",
+        "trellis_nbytes",
+    )
+
+    def __init__(
+        self,
+        corrected_text,
+        best_score,
+        *,
+        audit_builder=None,
+        audit_data=None,
+        trellis_nbytes=0,
+        corrected_words=(),
+        posteriors=None,
+        confidences=None,
+    ):
+        self.corrected_text = corrected_text
+        self.corrected_words = corrected_words  # Una palabra en minúsculas por posición
+        self.best_score = best_score
+
+        # Solo con solve(..., posteriors=True): [(candidato, P(candidato | frase))]
+        # por posición, y P(palabra elegida | frase) de cada posición
+        self.posteriors = posteriors
+        self.confidences = confidences
+        self.trellis_nbytes = trellis_nbytes  # Memoria del trellis en bytes
+        self.skipped_tokens = 0  # Palabras que la compuerta fijó sin decodificar
+        self._audit_builder = audit_builder
+        self._audit_data = audit_data
+
+    @property
+    def audit_data(self):
+        if self._audit_builder is not None:
+            builder, self._audit_builder = self._audit_builder, None
+            self._audit_data = builder()
+        return self._audit_data
+
+    def __repr__(self):
+        return (
+            f"DecodeResult(corrected_text={self.corrected_text!r}, "
+            f"best_score={self.best_score!r})"
+        )
+
+
+class Trellis:
+    """
+    Trellis de Viterbi en arrays preasignados de tamaño (T, K), con
+    T = posiciones de la frase y K = máximo de candidatos por posición.
+
+    - candidates[t]: palabras candidatas de la posición t
+    - ids[t]: sus IDs en el vocabulario compartido (None si no hay uno)
+    - sizes[t]: cuántas columnas de la fila t son válidas
+    - emissions[t, j]: log P(evidencia_t | candidates[t][j])
+    - scores[t, j]: mejor log-probabilidad acumulada que termina en j
+    - backpointers[t, j]: índice del candidato de t-1 en ese camino
+    - transitions[t, i, j]: log P(j | i) entre t-1 y t (solo con auditoría)
+    """
+
+    __slots__ = (
+        "backpointers",
+        "candidates",
+        "emissions",
+        "ids",
+        "scores",
+        "sizes",
+        "transitions",
+    )
+
+    def __init__(self, columns, keep_transitions, vocabulary=None):
+        n_steps = len(columns)
+        width = max(len(column) for column in columns)
+
+        self.candidates = [[word for word, _ in column] for column in columns]
+        self.ids = (
+            [vocabulary.encode(candidates) for candidates in self.candidates]
+            if vocabulary is not None
+            else None
+        )
+        self.sizes = np.array([len(column) for column in columns], dtype=np.int32)
+        self.emissions = np.zeros((n_steps, width), dtype=np.float32)
+        self.scores = np.full((n_steps, width), -np.inf, dtype=np.float32)
+        self.backpointers = np.zeros((n_steps, width), dtype=np.int32)
+        self.transitions = (
+            np.zeros((n_steps, width, width), dtype=np.float32)
+            if keep_transitions
+            else None
+        )
+
+        for t, column in enumerate(columns):
+            self.emissions[t, :len(column)] = [emission for _, emission in column]
+
+    @property
+    def nbytes(self):
+        arrays = [self.sizes, self.emissions, self.scores, self.backpointers]
+        if self.transitions is not None:
+            arrays.append(self.transitions)
+        return sum(a.nbytes for a in arrays)
 
 
 class ViterbiDecoder:
@@ -17,177 +142,650 @@ class ViterbiDecoder:
         self.alpha = 0.5  # Peso del Language Model
         self.beta = 2.0   # Peso del Keyboard Model
 
-    def solve(self, sentence_dirty):
+        # Candidatos por palabra que entran al trellis
+        self.candidate_limit = 20
+
+        # Compuerta de confianza: una palabra del vocabulario muy frecuente y
+        # bien respaldada por la palabra anterior no pasa por la generación
+        # de candidatos; queda fija como columna de un solo candidato.
+        self.skip_max_rank = 1000      # Rango de frecuencia máximo (None = sin compuerta)
+        self.skip_min_context = -6.0   # log P(palabra | anterior) mínimo
+
+        # Contadores acumulados de la compuerta (ver gate_report); el lock
+        # los protege cuando varios hilos decodifican a la vez (solve_many)
+        self.tokens_seen = 0
+        self.tokens_skipped = 0
+        self._lock = threading.Lock()
+
+        # HMM de letras (char_hmm.CharHMM) opcional: propone, además de los
+        # candidatos del diccionario, la palabra corregida letra a letra, para
+        # nombres y términos que el vocabulario no tiene
+        self.char_model = None
+
+        # Cachés opcionales (result_cache.ResultCache). result_cache guarda
+        # frases enteras ya corregidas (solo con audit=False); column_cache,
+        # las columnas de candidatos por (palabra anterior, palabra). Las
+        # claves llevan cache_config(), así que cambiar pesos o parámetros
+        # de los modelos no sirve resultados viejos
+        self.result_cache = None
+        self.column_cache = None
+
+    def solve(self, sentence_dirty, layout=None, audit=True, posteriors=False):
         """
         Ejecuta el algoritmo de Viterbi para encontrar la mejor corrección.
 
         :param sentence_dirty: String con errores, ej: "el gsto come"
-        :return: Dict con texto corregido y datos de auditoría
+        :param layout: distribución de teclado de esta petición (None => la del modelo)
+        :param audit: si es False no se guarda nada para la auditoría
+                      (audit_data queda en None); camino rápido para lotes
+        :param posteriors: además, correr forward-backward sobre el mismo
+                           trellis y llenar posteriors y confidences
+        :return: DecodeResult con texto corregido y datos de auditoría (perezosos).
+                 Solo se corrigen las palabras: puntuación, espacios y
+                 mayúsculas del texto original se conservan.
         """
-        words = sentence_dirty.strip().lower().split()
+        tokens = TOKENIZER.words(sentence_dirty)
+        words = [token.text.lower() for token in tokens]
 
         if not words:
-            return {"corrected_text": "", "audit_data": []}
+            return DecodeResult(sentence_dirty, 0.0, audit_data=[])
+
+        render = partial(TOKENIZER.rebuild, sentence_dirty, tokens)
+        key = None
+        if self.result_cache is not None and not audit:
+            # Clave normalizada: mayúsculas y puntuación se reponen con render
+            key = (tuple(words), self.km.resolve_layout(layout).name, posteriors, self.cache_config())
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                return self._cached_result(cached, render)
+
+        columns, skipped = self._gated_columns(words, layout)
+        result = self._decode(
+            words,
+            columns,
+            audit,
+            render=render,
+            posteriors=posteriors,
+        )
+        result.skipped_tokens = skipped
+
+        if key is not None:
+            self.result_cache.put(key, (
+                tuple(result.corrected_words),
+                result.best_score,
+                skipped,
+                result.posteriors,
+                result.confidences,
+            ))
+        return result
+
+    @staticmethod
+    def _cached_result(cached, render):
+        """DecodeResult de una frase que ya estaba en result_cache."""
+        corrected_words, best_score, skipped, posteriors, confidences = cached
+        result = DecodeResult(
+            render(list(corrected_words)),
+            best_score,
+            corrected_words=list(corrected_words),
+            posteriors=posteriors,
+            confidences=confidences,
+        )
+        result.skipped_tokens = skipped
+        return result
+
+    def solve_document(self, text, layout=None, max_workers=None):
+        """
+        Corrige un documento largo.
 
-        # Caso especial: Una sola palabra
-        if len(words) == 1:
-            return self._solve_single_word(words[0])
+        Lo corta en frases y puntuación, decodifica cada segmento por separado
+        (en paralelo entre procesos) y devuelve el texto con su puntuación,
+        espacios y mayúsculas originales. Ver segmentation.decode_document.
+        """
+        return decode_document(self, text, layout, max_workers)
+
+    def solve_many(
+        self,
+        sentences,
+        layout=None,
+        *,
+        audit=False,
+        posteriors=False,
+        max_workers=None,
+        executor: Executor | None = None,
+    ):
+        """
+        Corrige muchas frases en un pool de hilos, en el mismo orden.
+
+        Todos los hilos leen los mismos modelos sin copiarlos ni
+        serializarlos, y cada solve guarda su estado en variables locales.
+        Los modelos y los pesos no deben cambiar mientras dura el lote;
+        para garantizarlo, quien comparte el decodificador puede llamar
+        antes a freeze(). En el Python sin GIL (3.13t) los hilos corren en
+        paralelo; con GIL el resultado es el mismo, con el paralelismo que
+        dejen las partes de NumPy que lo sueltan.
+
+        :param sentences: frases a corregir
+        :param layout: distribución de teclado de todas las frases
+        :param audit: igual que en solve (por defecto el camino rápido)
+        :param posteriors: igual que en solve
+        :param max_workers: hilos a usar (None => os.cpu_count()); con 1 se
+                            decodifica en el hilo actual
+        :param executor: executor propio reutilizado entre lotes
+        :return: lista de DecodeResult, una por frase
+        """
+        solve = partial(self.solve, layout=layout, audit=audit, posteriors=posteriors)
+
+        metrics = active()
+        if metrics is not None:
+            # El ContextVar no pasa a los hilos del pool: cada tarea mide
+            # en sus propias métricas y se suman aquí, en orden
+            def solve_measured(sentence):
+                with instrument() as task_metrics:
+                    return solve(sentence), task_metrics
+
+            results = []
+            for result, task_metrics in self._map(solve_measured, sentences, max_workers, executor):
+                metrics.merge(task_metrics)
+                results.append(result)
+            return results
+
+        return list(self._map(solve, sentences, max_workers, executor))
+
+    @staticmethod
+    def _map(func, items, max_workers, executor):
+        if executor is not None:
+            return executor.map(func, items)
+        if max_workers == 1:
+            return map(func, items)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(func, items))
+
+    def freeze(self):
+        """
+        Congela el KeyboardModel y el LanguageModel (ver frozen.Freezable).
 
-        # PASO 1: Preparar estructuras de Viterbi
-        # viterbi[t][word] = (score, backpointer)
-        # t = índice de tiempo (posición en la frase)
-        # word = candidato en ese paso
-        # score = log-probabilidad acumulada hasta ese punto
-        # backpointer = palabra del paso anterior que llevó a este camino
+        Es irreversible: después ya no se pueden cambiar sus parámetros
+        (evaluation.apply_config, set_layout, set_unigram_prior...). Con
+        modelos de usuario (user_model) se congela el modelo base; la capa
+        del usuario sigue aprendiendo.
+        """
+        for model in (self.km, self.lm):
+            freeze = getattr(model, "freeze", None)
+            if freeze is not None:
+                freeze()
+        return self
+
+    def __getstate__(self):
+        # El lock no se puede serializar (solve_document manda el
+        # decodificador a otros procesos)
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def solve_touch(self, touch_words, layout=None, audit=True):
+        """
+        Igual que solve, pero la evidencia son coordenadas de pantalla.
 
-        viterbi = [{}]  # Lista de diccionarios
+        :param touch_words: una secuencia de toques (x, y) por palabra,
+                            ej: [[(0.4, 1.1), (8.6, 0.9)], [...]]
+        :param layout: distribución de teclado de esta petición (None => la del modelo)
+        :param audit: igual que en solve
+        :return: DecodeResult con texto corregido y datos de auditoría (perezosos)
+        """
+        touches = [
+            np.asarray(word, dtype=np.float64).reshape(-1, 2)
+            for word in touch_words
+            if len(word) > 0
+        ]
+
+        if not touches:
+            return DecodeResult("", 0.0, audit_data=[])
+
+        # Para la auditoría mostramos la tecla más cercana a cada toque
+        labels = [self.km.snap_touches(t, layout=layout) for t in touches]
+        columns = [
+            self.km.get_touch_scored_candidates(t, layout=layout)
+            for t in touches
+        ]
+        return self._decode(labels, columns, audit)
+
+    def gate_report(self):
+        """Fracción de palabras que la compuerta de confianza dejó sin decodificar."""
+        return {
+            "tokens": self.tokens_seen,
+            "skipped": self.tokens_skipped,
+            "skip_rate": (
+                self.tokens_skipped / self.tokens_seen if self.tokens_seen else 0.0
+            ),
+        }
 
-        # PASO 2: Inicialización (t=0, primera palabra)
-        first_word_dirty = words[0]
-        first_candidates = self.km.get_candidates(first_word_dirty)
+    def _gated_columns(self, words, layout=None):
+        """
+        Columnas de candidatos de una frase, pasando antes por la compuerta.
 
-        for candidate in first_candidates:
-            # Transición: desde START hacia la primera palabra
+        :return: (columnas, cantidad de palabras fijadas sin decodificar)
+        """
+        metrics = active()
+        if metrics is not None:
+            start = time.perf_counter()
+
+        columns = []
+        skipped = 0
+        prev = self.START_TOKEN
+        for word in words:
+            column, confident = self.candidate_column(prev, word, layout)
+            columns.append(column)
+            skipped += confident
+            prev = word
+
+        with self._lock:
+            self.tokens_seen += len(words)
+            self.tokens_skipped += skipped
+
+        if metrics is not None:
+            # "candidates" incluye el tiempo de "emission" (se mide dentro)
+            metrics.add_time("candidates", time.perf_counter() - start)
+            metrics.count("words", len(words))
+            metrics.count("candidates", sum(len(column) for column in columns))
+            metrics.count("gate_skipped", skipped)
+        return columns, skipped
+
+    def candidate_column(self, prev_word, word, layout=None):
+        """
+        Candidatos puntuados de `word`, o solo `word` si la compuerta la fija.
+
+        :return: ([(candidato, log P(word | candidato))], True si se fijó)
+        """
+        if self.column_cache is None:
+            return self._candidate_column(prev_word, word, layout)
+
+        key = (prev_word, word, self.km.resolve_layout(layout).name, self.cache_config())
+        cached = self.column_cache.get(key)
+        if cached is None:
+            cached = self._candidate_column(prev_word, word, layout)
+            self.column_cache.put(key, cached)
+        return cached
 
-            # Emisión: ¿Qué tan probable es que escribiera esto?
-            emission = self.km.get_emission_log_prob(first_word_dirty, candidate)
+    def cache_config(self):
+        """
+        Lo que, además de las palabras, decide un resultado cacheado.
 
-            # Score combinado (ponderado)
-            score = self.beta * emission
+        Pesos y compuerta del decodificador, parámetros de los modelos (con
+        la revisión del KeyboardModel, que cambia con set_layout y
+        set_unigram_prior) y, con modelos de usuario, cuántas observaciones
+        lleva el usuario.
+        """
+        km, lm = self.km, self.lm
+        user = getattr(km, "user", None)
+        if user is None:
+            user = getattr(lm, "user", None)
+        return (
+            self.alpha,
+            self.beta,
+            self.candidate_limit,
+            self.skip_max_rank,
+            self.skip_min_context,
+            id(self.char_model),
+            getattr(lm, "unk_log_prob", None),
+            getattr(lm, "start_log_prob", None),
+            getattr(lm, "weight", None),
+            getattr(lm, "smoothing", None),
+            getattr(km, "revision", None),
+            getattr(km, "prior_weight", None),
+            getattr(km, "band", None),
+            None if user is None else user.total,
+        )
+
+    def _candidate_column(self, prev_word, word, layout=None):
+        if self._is_confident(prev_word, word):
+            return [(word, self.km.get_emission_log_prob(word, word, layout=layout))], True
+        return self._score_candidates(word, layout), False
+
+    def _is_confident(self, prev_word, word):
+        """
+        True si `word` está en el vocabulario, es frecuente y el contexto la respalda.
 
-            viterbi[0][candidate] = (score, self.START_TOKEN)
+        En la primera palabra solo cuenta la frecuencia: la probabilidad
+        inicial del LM es uniforme y no aporta evidencia.
+        """
+        if self.skip_max_rank is None:
+            return False
+        rank = self.km.rank.get(word)
+        if rank is None or rank >= self.skip_max_rank:
+            return False
+        if prev_word == self.START_TOKEN:
+            return True
+        return self.lm.get_transition_log_prob(prev_word, word) >= self.skip_min_context
+
+    def _score_candidates(self, word_dirty, layout=None):
+        """Lista [(candidato, log P(dirty | candidato))] para una palabra."""
+        scored = self.km.get_scored_candidates(
+            word_dirty,
+            limit=self.candidate_limit,
+            layout=layout,
+        )
+        if self.char_model is None:
+            return scored
+
+        # El candidato fuera de vocabulario compite con el LM en unk_log_prob,
+        # así que solo gana si ninguna palabra del diccionario explica las teclas
+        spelled, _ = self.char_model.viterbi(word_dirty)
+        if any(word == spelled for word, _ in scored):
+            return scored
+        emission = self.km.get_emission_log_prob(word_dirty, spelled, layout=layout)
+        return [*scored, (spelled, emission)]
+
+    def _decode(self, words, columns, audit=True, render=" ".join, posteriors=False):
+        """
+        Viterbi sobre columnas de candidatos ya puntuados por el modelo de teclado.
+
+        :param words: evidencia de cada posición (se usa en la auditoría)
+        :param columns: columns[t] = [(candidato, emisión), ...]
+        :param audit: guardar las transiciones para la auditoría perezosa
+        :param render: arma corrected_text a partir de las palabras ganadoras
+        :param posteriors: calcular P(candidato | frase) con forward-backward
+        """
+        # Caso especial: Una sola palabra
+        if len(words) == 1:
+            return self._solve_single_word(words[0], columns[0], audit, render, posteriors)
+
+        metrics = active()
+        transition_matrix = self._transition_matrix
+        if metrics is not None:
+            start = time.perf_counter()
+            transition_matrix = metrics.timed("transitions", transition_matrix)
+
+        # PASO 1: Preparar estructuras de Viterbi (ver Trellis)
+        trellis = Trellis(
+            columns,
+            keep_transitions=audit,
+            vocabulary=getattr(self.lm, "vocabulary", None),
+        )
+        scores = trellis.scores
+        sizes = trellis.sizes
+        # Transiciones ya ponderadas por alpha, para reusarlas en forward-backward
+        weighted = [None] if posteriors else None
+
+        # PASO 2: Inicialización (t=0, primera palabra)
+        # Emisión: ¿Qué tan probable es que escribiera esto? (score ponderado)
+        scores[0, :sizes[0]] = self.beta * trellis.emissions[0, :sizes[0]]
 
         # PASO 3: Recursión (resto de las palabras)
         for t in range(1, len(words)):
-            viterbi.append({})
-            current_word_dirty = words[t]
-            current_candidates = self.km.get_candidates(current_word_dirty)
-
-            for current_candidate in current_candidates:
-                # Calcular emisión para esta palabra
-                emission = self.km.get_emission_log_prob(
-                    current_word_dirty,
-                    current_candidate,
-                )
-
-                # Encontrar el mejor camino previo
-                max_score = -math.inf
-                best_prev = None
-
-                # Iteramos sobre TODOS los candidatos del paso anterior
-                for prev_candidate in viterbi[t-1]:
-                    prev_score, _ = viterbi[t-1][prev_candidate]
-
-                    # Transición: ¿Qué tan común es esta secuencia?
-                    transition = self.lm.get_transition_log_prob(
-                        prev_candidate,
-                        current_candidate,
-                    )
-
-                    # Score acumulado hasta este punto
-                    total_score = prev_score + (self.alpha * transition) + (self.beta * emission)
-
-                    # ¿Es este el mejor camino hasta ahora?
-                    if total_score > max_score:
-                        max_score = total_score
-                        best_prev = prev_candidate
-
-                # Guardamos el mejor resultado
-                viterbi[t][current_candidate] = (max_score, best_prev)
+            n_prev, n_cur = sizes[t - 1], sizes[t]
+
+            # Transición: ¿Qué tan común es cada secuencia? (prev x actual)
+            transition = transition_matrix(trellis, t)
+            if audit:
+                trellis.transitions[t, :n_prev, :n_cur] = transition
+
+            # Score acumulado de todos los caminos (prev -> actual) a la vez
+            transition = self.alpha * transition
+            if posteriors:
+                weighted.append(transition)
+            total = (
+                scores[t - 1, :n_prev, None].astype(np.float64)
+                + transition
+                + self.beta * trellis.emissions[t, None, :n_cur]
+            )
+
+            # Para cada candidato actual, el mejor camino previo
+            best_prev = total.argmax(axis=0)
+            trellis.backpointers[t, :n_cur] = best_prev
+            scores[t, :n_cur] = total[best_prev, np.arange(n_cur)]
 
         # PASO 4: Backtracking - Reconstruir el camino ganador
-        # Encontramos el estado final con mayor score
-        last_step = viterbi[-1]
-        best_final_word = max(last_step, key=lambda w: last_step[w][0])
-        best_score = last_step[best_final_word][0]
+        path = self._backtrack(trellis)
+        corrected_words = [
+            trellis.candidates[t][j] for t, j in enumerate(path)
+        ]
+        best_score = float(scores[-1, path[-1]])
+
+        if metrics is not None:
+            # "viterbi" incluye el tiempo de "transitions"
+            metrics.add_time("viterbi", time.perf_counter() - start)
+            metrics.count("trellis_cells", int(sizes[:-1] @ sizes[1:]))
+
+        marginals = None
+        if posteriors:
+            if metrics is not None:
+                start = time.perf_counter()
+            marginals = self._forward_backward(trellis, weighted)
+            if metrics is not None:
+                metrics.add_time("posteriors", time.perf_counter() - start)
+
+        # PASO 5: Los datos de auditoría para la UI se generan al leerlos
+        return self._make_result(
+            corrected_words,
+            best_score,
+            audit and partial(
+                self._generate_audit_data,
+                words,
+                trellis,
+                path,
+            ),
+            render,
+            trellis.nbytes,
+            posteriors=None if marginals is None else [
+                list(zip(trellis.candidates[t], probs.tolist(), strict=True))
+                for t, probs in enumerate(marginals)
+            ],
+            confidences=None if marginals is None else [
+                float(probs[j]) for probs, j in zip(marginals, path, strict=True)
+            ],
+        )
+
+    def _forward_backward(self, trellis, weighted):
+        """
+        P(candidato | frase) en cada posición, sobre el mismo trellis de Viterbi.
 
-        # Reconstruimos el camino hacia atrás
-        corrected_words = [best_final_word]
-        backpointer = last_step[best_final_word][1]
+        Es la suma (log-sum-exp) donde Viterbi toma el máximo, con los mismos
+        puntajes ponderados alpha * transición + beta * emisión: las
+        probabilidades son las de esa distribución log-lineal.
 
-        for t in range(len(words) - 2, -1, -1):
-            corrected_words.insert(0, backpointer)
-            backpointer = viterbi[t][backpointer][1]
+        :param weighted: weighted[t] = alpha * transiciones entre t-1 y t
+        :return: un array por posición con la probabilidad de cada candidato
+        """
+        sizes = trellis.sizes
+        n_steps = len(sizes)
+        emissions = [
+            self.beta * trellis.emissions[t, :sizes[t]].astype(np.float64)
+            for t in range(n_steps)
+        ]
+
+        forward = [emissions[0]]
+        for t in range(1, n_steps):
+            step = forward[-1][:, None] + weighted[t]
+            forward.append(log_sum_exp(step, axis=0) + emissions[t])
+
+        backward = [np.zeros(sizes[-1])]
+        for t in range(n_steps - 1, 0, -1):
+            step = weighted[t] + (emissions[t] + backward[-1])[None, :]
+            backward.append(log_sum_exp(step, axis=1))
+        backward.reverse()
+
+        log_total = log_sum_exp(forward[-1])
+        return [
+            np.exp(f + b - log_total)
+            for f, b in zip(forward, backward, strict=True)
+        ]
+
+    def _transition_matrix(self, trellis, t):
+        """
+        Matriz (candidatos de t-1 x candidatos de t) de log P(actual | prev).
 
-        # PASO 5: Generar datos de auditoría para la UI
-        audit_data = self._generate_audit_data(words, viterbi, corrected_words)
+        Con vocabulario compartido es un solo bloque indexado por IDs; si no,
+        una consulta al LM por cada par de palabras.
+        """
+        if trellis.ids is not None:
+            return self.lm.transition_block(trellis.ids[t - 1], trellis.ids[t])
+        return np.array(
+            [
+                [self.lm.get_transition_log_prob(prev, cur) for cur in trellis.candidates[t]]
+                for prev in trellis.candidates[t - 1]
+            ],
+            dtype=np.float64,
+        )
+
+    @staticmethod
+    def _make_result(
+        corrected_words,
+        best_score,
+        audit_builder,
+        render=" ".join,
+        trellis_nbytes=0,
+        *,
+        posteriors=None,
+        confidences=None,
+    ):
+        """Empaqueta el resultado; sin constructor de auditoría, audit_data es None."""
+        metrics = active()
+        if audit_builder and metrics is not None:
+            audit_builder = metrics.timed("audit", audit_builder)
+        return DecodeResult(
+            render(corrected_words),
+            best_score,
+            audit_builder=audit_builder or None,
+            trellis_nbytes=trellis_nbytes,
+            corrected_words=corrected_words,
+            posteriors=posteriors,
+            confidences=confidences,
+        )
+
+    @staticmethod
+    def _backtrack(trellis):
+        """Índices del camino ganador, rellenados de atrás hacia adelante."""
+        n_steps = len(trellis.sizes)
+        path = np.empty(n_steps, dtype=np.int32)
 
-        return {
-            "corrected_text": " ".join(corrected_words),
-            "best_score": best_score,
-            "audit_data": audit_data,
-        }
+        # Encontramos el estado final con mayor score
+        path[-1] = trellis.scores[-1, :trellis.sizes[-1]].argmax()
 
-    def _solve_single_word(self, word_dirty):
+        # Reconstruimos el camino hacia atrás
+        for t in range(n_steps - 1, 0, -1):
+            path[t - 1] = trellis.backpointers[t, path[t]]
+
+        return path.tolist()
+
+    def _solve_single_word(
+        self,
+        word_dirty,
+        column,
+        audit=True,
+        render=" ".join,
+        posteriors=False,
+    ):
         """Caso especial optimizado para una sola palabra."""
-        candidates = self.km.get_candidates(word_dirty)
-
         best_word = word_dirty
         best_score = -math.inf
-        ranking = []
+        scored = []
+        totals = []
 
-        for candidate in candidates:
-            emission = self.km.get_emission_log_prob(word_dirty, candidate)
+        for candidate, emission in column:
             transition = self.lm.get_transition_log_prob(self.START_TOKEN, candidate)
             total = (self.alpha * transition) + (self.beta * emission)
 
-            ranking.append({
-                "palabra": candidate,
-                "ctx": float(transition),
-                "kbd": float(emission),
-                "total": float(total),
-            })
-
+            if audit:
+                scored.append((candidate, transition, emission, total))
+            if posteriors:
+                totals.append(total)
 
             if total > best_score:
                 best_score = total
                 best_word = candidate
 
+        return self._make_result(
+            [best_word],
+            best_score,
+            audit and partial(
+                self._single_word_audit,
+                word_dirty,
+                best_word,
+                scored,
+            ),
+            render,
+            **(self._single_word_posteriors(column, totals, best_word) if posteriors else {}),
+        )
+
+    @staticmethod
+    def _single_word_posteriors(column, totals, best_word):
+        """Con una sola palabra, la posterior es el softmax de los puntajes."""
+        probs = exp_normalize(np.array(totals)).tolist()
+        candidates = [candidate for candidate, _ in column]
+        return {
+            "posteriors": [list(zip(candidates, probs, strict=True))],
+            "confidences": [probs[candidates.index(best_word)]],
+        }
+
+    @staticmethod
+    def _single_word_audit(word_dirty, best_word, scored):
+        """Auditoría del caso de una sola palabra a partir de sus puntajes."""
+        ranking = [
+            {
+                "palabra": candidate,
+                "ctx": float(transition),
+                "kbd": float(emission),
+                "total": float(total),
+            }
+            for candidate, transition, emission, total in scored
+        ]
+
         # Ordenar por score total descendente
         ranking.sort(key=lambda x: x["total"], reverse=True)
 
         return {
-            "corrected_text": best_word,
-            "best_score": best_score,
-            "audit_data": {
-                "input_original": word_dirty,
-                "ganador": best_word,
-                "ranking": ranking[:5],  # Top 5
-            },
+            "input_original": word_dirty,
+            "ganador": best_word,
+            "ranking": ranking[:5],  # Top 5
         }
 
-    def _generate_audit_data(self, dirty_words, viterbi, corrected_words):
+    def _generate_audit_data(self, dirty_words, trellis, path):
         """
         Genera los datos para la tabla de auditoría de la UI.
         Ahora devuelve una entrada por cada palabra de la frase, con su ranking.
+
+        Lee emisiones, scores y transiciones de los arrays del trellis; solo
+        la primera palabra consulta el LM (transición desde <START>).
         """
         audit_per_word = []
 
-        for t in range(len(dirty_words)):
-            dirty = dirty_words[t]
-            corrected = corrected_words[t]
-            step = viterbi[t]
-            prev_word = corrected_words[t - 1] if t > 0 else self.START_TOKEN
-
-            ranking = []
-            for candidate, (score_total, _) in step.items():
-                emission = self.km.get_emission_log_prob(dirty, candidate)
-                transition = self.lm.get_transition_log_prob(prev_word, candidate)
-
-                ranking.append({
-                    "palabra": candidate,
-                    "ctx": float(round(transition, 2)),
-                    "kbd": float(round(emission, 2)),
-                    "total": float(round(score_total, 2)),
-                })
-
-            ranking.sort(key=lambda x: x["total"], reverse=True)
+        for t, dirty in enumerate(dirty_words):
+            size = trellis.sizes[t]
+            candidates = trellis.candidates[t]
+
+            if t > 0:
+                # Transiciones desde el ganador anterior
+                transitions = trellis.transitions[t, path[t - 1], :size].tolist()
+            else:
+                transitions = [
+                    self.lm.get_transition_log_prob(self.START_TOKEN, candidate)
+                    for candidate in candidates
+                ]
+
+            # Top 5 por palabra, ordenado por score total descendente
+            order = np.argsort(-trellis.scores[t, :size], kind="stable")[:5]
+            emissions = trellis.emissions[t]
+            scores = trellis.scores[t]
+
+            ranking = [
+                {
+                    "palabra": candidates[j],
+                    "ctx": round(float(transitions[j]), 2),
+                    "kbd": round(float(emissions[j]), 2),
+                    "total": round(float(scores[j]), 2),
+                }
+                for j in order
+            ]
 
             audit_per_word.append({
                 "index": t,
                 "input_original": dirty,
-                "ganador": corrected,
-                "ranking": ranking[:5],  # top 5 por palabra
+                "ganador": candidates[path[t]],
+                "ranking": ranking,
             })
 
         return audit_per_word
@@ -208,14 +806,22 @@ if __name__ == "__main__":
             return -10.0
 
     class MockKM:
-        def get_candidates(self, word):
+        rank = {}  # noqa: RUF012
+
+        def get_candidates(self, word, **_kwargs):
             if word == "dl":
                 return ["el", "al"]
             if word == "gato":
                 return ["gato", "pato"]
             return [word]
 
-        def get_emission_log_prob(self, dirty, intended):
+        def get_scored_candidates(self, word, **_kwargs):
+            return [
+                (c, self.get_emission_log_prob(word, c))
+                for c in self.get_candidates(word)
+            ]
+
+        def get_emission_log_prob(self, dirty, intended, **_kwargs):
             if dirty == intended:
                 return 0.0
             if dirty == "dl" and intended == "el":
@@ -231,6 +837,6 @@ if __name__ == "__main__":
     result = decoder.solve("dl gato")
     print("=== RESULTADO ===")
     print("Texto original: dl gato")
-    print(f"Corrección: {result['corrected_text']}")
-    print(f"Score: {result['best_score']}")
-    print(f"Auditoría: {result['audit_data']}")
+    print(f"Corrección: {result.corrected_text}")
+    print(f"Score: {result.best_score}")
+    print(f"Auditoría: {result.audit_data}")
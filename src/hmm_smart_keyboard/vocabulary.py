@@ -0,0 +1,107 @@
+"""
+Vocabulario compartido con IDs enteros.
+
+KeyboardModel saca sus candidatos de wordfreq y LanguageModel sus bigramas
+de Wikipedia, así que cada uno tenía su propio conjunto de cadenas y el
+decodificador cruzaba ambos con hashing de strings por cada par
+(anterior, actual). Vocabulary asigna un ID entero a cada palabra de los
+dos modelos; el LM guarda sus bigramas indexados por esos IDs y el
+decodificador consulta bloques de transiciones con indexación entera.
+
+El ID 0 es siempre START_TOKEN y UNKNOWN_ID (-1) marca una palabra que no
+está en el vocabulario.
+"""
+
+from collections.abc import Iterable
+
+import numpy as np
+import numpy.typing as npt
+
+from hmm_smart_keyboard.constants import START_TOKEN
+
+START_ID = 0
+UNKNOWN_ID = -1
+
+
+class Vocabulary:
+    """Palabras <-> IDs enteros, en orden de inserción."""
+
+    def __init__(self, words: Iterable[str] = ()):
+        self.words: list[str] = [START_TOKEN]
+        self.ids: dict[str, int] = {START_TOKEN: START_ID}
+        self.coverage: dict[str, float] = {}
+        for word in words:
+            self.add(word)
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        return word in self.ids
+
+    def __iter__(self):
+        """Palabras reales (sin START_TOKEN), en orden de ID."""
+        return iter(self.words[1:])
+
+    def add(self, word: str) -> int:
+        """ID de `word`, agregándola al final si es nueva."""
+        word_id = self.ids.get(word)
+        if word_id is None:
+            word_id = len(self.words)
+            self.ids[word] = word_id
+            self.words.append(word)
+        return word_id
+
+    def id(self, word: str) -> int:
+        return self.ids.get(word, UNKNOWN_ID)
+
+    def encode(self, words: Iterable[str]) -> npt.NDArray[np.int64]:
+        """IDs de una secuencia de palabras (UNKNOWN_ID para las desconocidas)."""
+        get = self.ids.get
+        return np.array([get(w, UNKNOWN_ID) for w in words], dtype=np.int64)
+
+    @classmethod
+    def build(
+        cls,
+        keyboard_words: Iterable[str],
+        lm_words: Iterable[str],
+    ) -> "Vocabulary":
+        """
+        Une los vocabularios de ambos modelos y calcula su cobertura.
+
+        Las palabras del teclado van primero, en su orden de frecuencia;
+        después las que solo conoce el LM, en orden alfabético (para que los
+        IDs sean los mismos en cada ejecución).
+        """
+        keyboard = list(dict.fromkeys(keyboard_words))
+        keyboard_set = set(keyboard)
+        lm_set = set(lm_words) - {START_TOKEN}
+        shared = keyboard_set & lm_set
+
+        vocab = cls(keyboard)
+        for word in sorted(lm_set - keyboard_set):
+            vocab.add(word)
+
+        vocab.coverage = {
+            "keyboard_words": len(keyboard_set),
+            "lm_words": len(lm_set),
+            "shared_words": len(shared),
+            "total_words": len(vocab) - 1,
+            # Fracción de candidatos del teclado que el LM conoce
+            "keyboard_coverage": len(shared) / len(keyboard_set) if keyboard_set else 0.0,
+            # Fracción de palabras del LM que el teclado puede proponer
+            "lm_coverage": len(shared) / len(lm_set) if lm_set else 0.0,
+        }
+        return vocab
+
+
+def align_vocabularies(keyboard_model, language_model) -> Vocabulary:
+    """
+    Construye el vocabulario compartido y lo adjunta a ambos modelos.
+
+    :return: el Vocabulary, con sus estadísticas en `coverage`
+    """
+    vocab = Vocabulary.build(keyboard_model.rank, language_model.vocab)
+    language_model.attach_vocabulary(vocab)
+    keyboard_model.attach_vocabulary(vocab)
+    return vocab